@@ -23,6 +23,7 @@ class InterviewState(BaseModel):
     skills_covered: List[str] = []
     current_difficulty: str = "medium"
     transcript: List[dict] = [] 
+    interviewer_turns: int = 0
 
 class InterviewConfig(BaseModel):
     candidate_name: str
@@ -73,6 +73,44 @@ Candidate Answer:
 {answer}
 """
 
+INTERVIEW_BATCH_EVALUATION_PROMPT = """
+You are a strict AI technical interview evaluator.
+
+Evaluate each candidate answer objectively and independently of the others.
+
+Do NOT be generous.
+Do NOT be overly harsh.
+Base evaluation strictly on correctness and depth.
+
+Return ONLY valid JSON.
+No explanation.
+No markdown.
+
+Scoring (0-10 scale):
+
+- technical_accuracy
+- depth_of_explanation
+- clarity
+- confidence_level
+
+Return format (one entry per item, same index):
+
+{{
+  "evaluations": [
+    {{
+      "index": number,
+      "technical_accuracy": number,
+      "depth_of_explanation": number,
+      "clarity": number,
+      "confidence_level": number
+    }}
+  ]
+}}
+
+Items:
+{items}
+"""
+
 FINAL_FEEDBACK_REPORT_PROMPT = """
 You are a professional hiring evaluation system.
 
@@ -100,9 +138,46 @@ Generate:
 4. Hiring Recommendation: (Provide a clear, proper recommendation on whether to hire them for the role and why, ending with one of: Strong Hire, Hire, Consider, or Reject)
 """
 
+CONVERSATION_SUMMARY_PROMPT = """
+You keep the running notes of an ongoing technical interview for the interviewer.
+
+CURRENT NOTES:
+{summary}
+
+NEW EXCHANGES:
+{turns}
+
+Rewrite the notes so they also cover the new exchanges. Keep:
+- Questions already asked and topics/skills already covered
+- Key facts, claims, technologies and examples from the candidate's answers
+- Apparent strengths and weak spots
+- Anything the candidate asked or requested
+
+Use at most {max_words} words of plain text. Do not add a preamble.
+"""
+
 STAGE_INSTRUCTIONS = {
     "introduction": "Enthusiastically welcome the candidate by name to the Interveuu AI Interview for their job role. Introduce yourself representing Interveuu. Do NOT ask them to introduce themselves or talk about their background yet. Simply explain the format and ask if they are ready to begin.",
     "warmup": "Ask a broad question like 'Tell me about yourself' or ask about their relevant background. Keep it light.",
     "core": "Ask specific technical questions related to the required skills and job description. Challenge their assumptions. Test depth of knowledge. Mix in 1-2 behavioral questions.",
     "wrapup": "Ask if they have any questions for you. Then thank them and close the interview."
 }
+
+# Interviewer lines that recur across interviews, split the way the voice pipeline splits sentences.
+# Their audio is pre-rendered into the TTS phrase cache when TTS_PREWARM is enabled.
+STOCK_PHRASES = [
+    "Thank you for your time.",
+    "The interview is now concluded.",
+    "We are just getting started and haven't completed the interview yet.",
+    "If you end the interview now, it will negatively affect your evaluation.",
+    "Are you sure you want to conclude?",
+    "Are you ready to begin?",
+    "Tell me about yourself.",
+    "Great, let's move on.",
+    "Let's move on to the next question.",
+    "Thank you for sharing that.",
+    "That's a great question.",
+    "Could you elaborate on that?",
+    "Can you give me a specific example?",
+    "Do you have any questions for me?",
+]
@@ -0,0 +1,78 @@
+"""
+Binary Audio Frames
+===================
+
+Wire format for interview audio on ``/ws/interview/{session_id}``.
+
+Audio travels as binary WebSocket messages instead of base64 inside JSON;
+control messages (transcripts, text chunks, reports) stay JSON. Every
+binary message is a fixed 12-byte big-endian header followed by the raw
+audio bytes:
+
+    offset  size  field
+    0       1     version      (FRAME_VERSION)
+    1       1     type         (FRAME_AUDIO_IN / FRAME_AUDIO_OUT / FRAME_AUDIO_CHUNK)
+    2       2     flags        (FLAG_FINAL marks the last frame of a sentence/utterance)
+    4       4     seq          frame sequence number, per direction and connection
+    8       4     sentence_id  sentence (server -> client) or utterance (client -> server)
+
+Binary output is negotiated with
+``{"type": "client_config", "payload": {"binary_audio": true}}``; clients
+that do not opt in keep the base64 JSON messages.
+"""
+
+import struct
+from typing import Tuple
+
+FRAME_VERSION = 1
+
+# Message types
+FRAME_AUDIO_IN = 0x01      # Candidate audio (client -> server), one complete utterance
+FRAME_AUDIO_OUT = 0x02     # Whole-sentence TTS audio (server -> client)
+FRAME_AUDIO_CHUNK = 0x03   # Streamed TTS chunk (server -> client)
+
+# Flags
+FLAG_FINAL = 0x0001
+
+_HEADER = struct.Struct("!BBHII")
+HEADER_SIZE = _HEADER.size
+
+
+class FrameError(ValueError):
+    """Raised when a binary message is not a valid audio frame."""
+
+
+def encode_frame(frame_type: int, seq: int, sentence_id: int, payload: bytes = b"", flags: int = 0) -> bytes:
+    """Build a binary frame from a header and raw audio bytes."""
+    return _HEADER.pack(FRAME_VERSION, frame_type, flags, seq & 0xFFFFFFFF, sentence_id & 0xFFFFFFFF) + payload
+
+
+def decode_frame(data: bytes) -> Tuple[int, int, int, int, memoryview]:
+    """
+    Split a binary frame into its header fields and payload.
+
+    Returns:
+        (frame_type, flags, seq, sentence_id, payload); the payload is a
+        zero-copy view of ``data``
+
+    Raises:
+        FrameError: If the frame is truncated or has an unknown version
+    """
+    if len(data) < HEADER_SIZE:
+        raise FrameError(f"Frame too short ({len(data)} bytes)")
+    version, frame_type, flags, seq, sentence_id = _HEADER.unpack_from(data)
+    if version != FRAME_VERSION:
+        raise FrameError(f"Unsupported frame version {version}")
+    return frame_type, flags, seq, sentence_id, memoryview(data)[HEADER_SIZE:]
+
+
+class FrameSequencer:
+    """Hands out per-connection sequence numbers for outgoing frames."""
+
+    def __init__(self):
+        self._next = 0
+
+    def next(self) -> int:
+        seq = self._next
+        self._next = (self._next + 1) & 0xFFFFFFFF
+        return seq
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
 from fastapi.responses import FileResponse
 from typing import Optional
-import shutil
+import asyncio
+import time
 import uuid
 import os
 from pathlib import Path
@@ -9,16 +10,115 @@ from datetime import datetime
 
 from database.connection import get_database
 from database.job_posting_crud import get_job_posting_by_id, create_job_cv_file, add_cv_to_job
-from cv_screener.cv_parser import parse_cv_file
-from cv_screener.cv_extractor import extract_cv_information
+from cv_screener.parse_service import parse_cv_bytes
 from database.crud import create_interview_cv
 from database.ranking_crud import create_candidate_ranking
+from cv_screener.gemini_screener import GeminiCVScreener, get_shared_screener
 
 # Import the new service
 from services.interview_service import InterviewService, InterviewServiceContext
 
 router = APIRouter(prefix="/interview", tags=["Interview"])
 
+# Background work started by /start-interview (held so the tasks are not garbage collected)
+_background_tasks = set()
+
+
+def _spawn(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def _write_file(path: Path, content: bytes):
+    with path.open("wb") as buffer:
+        buffer.write(content)
+
+
+async def _parse_cv_text(file_content: bytes, filename: str) -> str:
+    # Parse text from CV (process pool, off the event loop)
+    try:
+        return await parse_cv_bytes(file_content, filename)
+    except Exception as e:
+        print(f"Failed to parse CV text: {e}")
+        return ""
+
+
+async def _store_cv_file(db, job_id: str, filename: str, file_content: bytes) -> Optional[str]:
+    try:
+        cv_file_id = await create_job_cv_file(db, job_id, filename, file_content, len(file_content))
+        await add_cv_to_job(db, job_id, cv_file_id)
+        return cv_file_id
+    except Exception as e:
+        print(f"Failed to store CV in database: {e}")
+        return None
+
+
+async def _screen_cv_profile(job_desc: str, cv_text: str, file_name: str) -> dict:
+    """Structured CV profile and master scores from one Gemini call on the raw CV text."""
+    try:
+        screener = get_shared_screener()
+    except Exception as e:
+        print(f"Failed CV profile screening: {e}")
+        return {"profile": {}, "scores": GeminiCVScreener.master_scores({}), "error": str(e)}
+    result = await screener.screen_cv_master_profile(
+        job_description=job_desc,
+        cv_content=cv_text,
+        file_name=file_name
+    )
+    if result.get("error"):
+        print(f"Failed structured extraction: {result['error']}")
+    return result
+
+
+async def background_cv_scoring(db, job_id: str, candidate_id: str, candidate_name: str, email: str, scores: dict, cv_text: str):
+    try:
+        job_rec = await get_job_posting_by_id(db, job_id)
+        recruiter_id = job_rec.get("recruiter_id", "") if job_rec else ""
+        
+        await create_candidate_ranking(
+            db=db,
+            job_posting_id=job_id,
+            recruiter_id=recruiter_id,
+            candidate_name=candidate_name,
+            rank=999, # Will be calculated on dashboard query
+            score=0, # final score calculated after interview
+            candidate_id=candidate_id,
+            email=email,
+            cv_score=scores["overall_cv_score"],
+            cv_technical_score=scores["technical_score"],
+            cv_experience_score=scores["experience_score"],
+            cv_project_score=scores["project_score"],
+            cv_education_score=scores["education_score"],
+            interview_score=0,
+            technical_score=0,
+            communication_score=0,
+            confidence_score=0,
+            facial_recognition_score=0,
+            completion=10, # Interview started
+            interview_status="In Progress",
+            cv_data={"text": cv_text[:500], "full_analysis": scores},
+            evaluation_details={"background_screening": scores}
+        )
+    except Exception as e:
+        print(f"Background CV scoring failed: {e}")
+
+
+async def prepare_cv_profile(db, service: InterviewService, session_id: str, job_id: str, candidate_id: str, candidate_name: str, email: str, job_desc: str, cv_text: str, file_name: str):
+    """
+    Runs after /start-interview has responded: one Gemini call extracts the
+    structured CV and scores it, then the profile is swapped into the session
+    (the greeting does not need it) and the scores go to the candidate ranking.
+    """
+    started = time.perf_counter()
+    result = await _screen_cv_profile(job_desc, cv_text, file_name)
+    if not result.get("error"):
+        await service.update_cv_profile(session_id, result["profile"])
+    print(f"[START] session={session_id} cv profile ready in {(time.perf_counter() - started) * 1000:.0f}ms")
+    await background_cv_scoring(db, job_id, candidate_id, candidate_name, email, result["scores"], cv_text)
+
+
 @router.post("/start-interview/{job_id}")
 async def start_interview(
     job_id: str,
@@ -31,11 +131,16 @@ async def start_interview(
 ):
     """
     Start a new interview by:
-    1. Parsing the CV into structured JSON
-    2. Fetching the Job Description
-    3. Initializing the Interview Service state
+    1. Fetching the Job Description
+    2. Saving, parsing and storing the CV concurrently
+    3. Initializing the Interview Service state and returning the session id
+
+    Structured CV extraction and scoring (one Gemini call) continue in the background, and the
+    greeting is streamed over the WebSocket when the client sends start_interview.
     """
     try:
+        started = time.perf_counter()
+
         # 1. Fetch Job Description
         job = await get_job_posting_by_id(db, job_id)
         if not job:
@@ -45,7 +150,7 @@ async def start_interview(
         required_skills = job.get("skills", [])
         extra_instructions = job.get("extra_instructions", "Keep the interview conversational and focused on the job description.")
 
-        # 2. Save and Parse CV
+        # 2. Save, Parse and Store CV
         session_id = str(uuid.uuid4())
         
         if not cv_file.filename.lower().endswith('.pdf'):
@@ -58,52 +163,14 @@ async def start_interview(
         safe_filename = f"{session_id}_{timestamp}_{cv_file.filename}"
         file_path = upload_dir / safe_filename
         
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(cv_file.file, buffer)
-            
-        # Parse text from CV
-        try:
-            cv_text = parse_cv_file(str(file_path))
-        except Exception as e:
-            print(f"Failed to parse CV text: {e}")
-            cv_text = ""
-            
-        # Parse structured CV info required by the LLM
-        cv_json = {}
-        try:
-            # We use an internal function or groq to structure the CV
-            raw_json_str = extract_cv_information(cv_text) 
-            import json
-            if isinstance(raw_json_str, str):
-                # Attempt to parse json structure out of the string
-                import re
-                json_match = re.search(r"\{.*\}", raw_json_str, re.DOTALL)
-                if json_match:
-                    cv_json = json.loads(json_match.group(0))
-                else:
-                    cv_json = {"summary": cv_text[:1000]}
-            else:
-                cv_json = raw_json_str
-        except Exception as e:
-            print(f"Failed structured extraction: {e}")
-            cv_json = {"summary": cv_text[:1000]}
+        file_content = await cv_file.read()
 
-        # Store CV in Database
-        try:
-            with open(file_path, "rb") as f:
-                file_content = f.read()
-            
-            cv_file_id = await create_job_cv_file(
-                db, 
-                job_id, 
-                cv_file.filename, 
-                file_content, 
-                len(file_content)
-            )
-            await add_cv_to_job(db, job_id, cv_file_id)
-        except Exception as e:
-            print(f"Failed to store CV in database: {e}")
-            cv_file_id = None
+        # The disk copy, text extraction and the job_cv_files insert are independent
+        _, cv_text, cv_file_id = await asyncio.gather(
+            asyncio.to_thread(_write_file, file_path, file_content),
+            _parse_cv_text(file_content, cv_file.filename),
+            _store_cv_file(db, job_id, cv_file.filename, file_content),
+        )
 
         # Store Candidate Info
         cv_data = {
@@ -121,83 +188,36 @@ async def start_interview(
         candidate_obj_id = await create_interview_cv(db, session_id, cv_data)
         
         # 3. Create context and initialize session
+        # The raw text stands in for the structured CV until background extraction replaces it
         context = InterviewServiceContext(
             candidate_name=candidate_name,
-            candidate_cv_json=cv_json,
+            candidate_cv_json={"summary": cv_text[:1000]},
             job_description=job_description,
             required_skills=required_skills,
             recruiter_extra_instructions=extra_instructions
         )
         
-        # Instantiate service and create session
-        # We need a global instance or pass it in. For FastAPI we might create it per request
-        # but to keep state we need a singleton. So we import it from main.
+        # The service is a process-wide singleton so sessions stay in memory between turns
         from main import get_interview_service
         service = get_interview_service()
         
         new_session_id = await service.initialize_session(context, job_id, str(candidate_obj_id))
-        
-        import asyncio
-        from cv_screener.gemini_screener import GeminiCVScreener
-        
-        async def background_cv_scoring(job_id: str, candidate_id: str, candidate_name: str, email: str, job_desc: str, cv_data: dict, cv_text: str):
-            try:
-                screener = GeminiCVScreener()
-                result = await screener.screen_cv_master(
-                    job_description=job_desc,
-                    cv_content=str(cv_data),
-                    file_name=safe_filename
-                )
-                
-                job_rec = await get_job_posting_by_id(db, job_id)
-                recruiter_id = job_rec.get("recruiter_id", "") if job_rec else ""
-                
-                await create_candidate_ranking(
-                    db=db,
-                    job_posting_id=job_id,
-                    recruiter_id=recruiter_id,
-                    candidate_name=candidate_name,
-                    rank=999, # Will be calculated on dashboard query
-                    score=0, # final score calculated after interview
-                    candidate_id=candidate_id,
-                    email=email,
-                    cv_score=result["overall_cv_score"],
-                    cv_technical_score=result["technical_score"],
-                    cv_experience_score=result["experience_score"],
-                    cv_project_score=result["project_score"],
-                    cv_education_score=result["education_score"],
-                    interview_score=0,
-                    technical_score=0,
-                    communication_score=0,
-                    confidence_score=0,
-                    facial_recognition_score=0,
-                    completion=10, # Interview started
-                    interview_status="In Progress",
-                    cv_data={"text": cv_text[:500], "full_analysis": result},
-                    evaluation_details={"background_screening": result}
-                )
-            except Exception as e:
-                print(f"Background CV scoring failed: {e}")
-
-        # Fire and forget background CV scoring
-        asyncio.create_task(
-            background_cv_scoring(job_id, str(candidate_obj_id), candidate_name, email_address, job_description, cv_json, cv_text)
-        )
 
-        
-        # Get the first question asynchronously
-        # We process 'INIT' to trigger the greeting behavior
-        full_response = ""
-        async for chunk in service.process_input(new_session_id, "INIT"):
-            full_response += chunk
-            
+        _spawn(prepare_cv_profile(
+            db, service, new_session_id, job_id, str(candidate_obj_id), candidate_name,
+            email_address, job_description, cv_text, safe_filename
+        ))
+
+        print(f"[START] session={new_session_id} ready in {(time.perf_counter() - started) * 1000:.0f}ms")
+
         return {
             "success": True,
             "message": "Interview sequence initiated",
             "session_id": new_session_id,
             "candidate_name": candidate_name,
             "job_title": job.get("title", job.get("interview_field", "General Position")),
-            "question": full_response,
+            # Streamed over /ws/interview/{session_id} once the client sends start_interview
+            "question": "",
             "total_questions": 5, # Can be dynamic later
             "current_question": 1
         }
@@ -384,7 +404,7 @@ async def submit_answer(
         "success": True,
         "feedback": "Processed.",
         "score": 0, # Could be evaluated in real-time or mocked
-        "current_question": len([x for x in session.transcript if x["role"] == "interviewer"]),
+        "current_question": session.interviewer_turns,
         "total_questions": 5,
         "is_complete": is_complete,
         "next_question": full_response
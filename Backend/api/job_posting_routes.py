@@ -324,6 +324,15 @@ async def update_job(
     if not success:
         raise HTTPException(status_code=500, detail="Failed to update job posting")
     
+    # Expire Gemini contexts cached for the previous JD text
+    old_description = job.get("job_description")
+    if old_description and update_fields.get("job_description", old_description) != old_description:
+        try:
+            from cv_screener.gemini_screener import get_shared_screener
+            await get_shared_screener().invalidate_jd_context(old_description)
+        except Exception as e:
+            print(f"[WARNING] Failed to invalidate JD context cache for job {job_id}: {e}")
+    
     updated_job = await get_job_posting_by_id(db, job_id)
     
     return {
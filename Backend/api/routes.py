@@ -2,13 +2,17 @@
 API Routes for CV Screening with MongoDB Integration
 """
 
+import logging
 import os
+import asyncio
 from typing import List, Optional
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request
 from pydantic import BaseModel
 
-from cv_screener.gemini_screener import GeminiCVScreener
-from cv_screener.cv_parser import parse_cv_file
+from cv_screener.gemini_screener import get_shared_screener
+from cv_screener.cache import default_parse_cache
+from cv_screener.cv_parser import detect_format
+from cv_screener.parse_service import parse_cv_bytes, parse_many
 from database.connection import get_database
 from database import crud
 from database.job_posting_crud import create_job_cv_file, create_job_posting
@@ -18,6 +22,8 @@ from api.job_posting_routes import router as job_posting_router
 from api.ranking_routes import router as ranking_router
 from api.interview_routes import router as new_interview_router
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # Include routes
@@ -26,7 +32,13 @@ router.include_router(ranking_router)
 router.include_router(new_interview_router)
 
 # Initialize the Gemini screener
-screener = GeminiCVScreener()
+screener = get_shared_screener()
+
+# Maximum number of CVs screened in parallel by /screen-cvs-batch
+CV_SCREENING_CONCURRENCY = max(1, int(os.getenv("CV_SCREENING_CONCURRENCY", "8")))
+
+# Screen several CVs per Gemini request in /screen-cvs-batch (falls back to single calls on failure)
+CV_SCREENING_PACKED = os.getenv("CV_SCREENING_PACKED", "true").lower() in {"1", "true", "yes", "y", "on"}
 
 # Import activity logger
 from services.activity_logger import log_activity
@@ -85,14 +97,7 @@ async def upload_job_description(
         try:
             jd_content = content.decode("utf-8")
         except UnicodeDecodeError:
-            temp_path = f"temp_{jd_file.filename}"
-            with open(temp_path, "wb") as f:
-                f.write(content)
-            try:
-                jd_content = parse_cv_file(temp_path)
-            finally:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+            jd_content = await parse_cv_bytes(content, jd_file.filename)
     elif jd_text:
         jd_content = jd_text
     else:
@@ -156,16 +161,19 @@ async def upload_cvs(
     uploaded_cv_ids = []
     uploaded_files = []
     
-    for file in files:
-        content = await file.read()
-        temp_path = f"temp_{file.filename}"
+    contents = [await file.read() for file in files]
+    parsed_documents = await parse_many(
+        [(content, file.filename) for file, content in zip(files, contents)],
+        with_metadata=True
+    )
+    
+    for file, content, parsed_document in zip(files, contents, parsed_documents):
+        if isinstance(parsed_document, BaseException):
+            print(f"Error parsing {file.filename}: {str(parsed_document)}")
+            continue
+        parsed_content = parsed_document["text"]
         
         try:
-            with open(temp_path, "wb") as f:
-                f.write(content)
-            
-            parsed_content = parse_cv_file(temp_path)
-            
             # Store in database
             cv_id = await crud.create_cv(
                 db,
@@ -178,15 +186,15 @@ async def upload_cvs(
             uploaded_files.append({
                 "id": cv_id,
                 "file_name": file.filename,
-                "size": len(content)
+                "size": len(content),
+                # Long documents are cut to the parse budget before screening
+                "truncated": parsed_document["truncated"],
+                "truncated_by": parsed_document["truncated_by"]
             })
             
         except Exception as e:
-            print(f"Error parsing {file.filename}: {str(e)}")
+            print(f"Error storing {file.filename}: {str(e)}")
             continue
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
     
     return {
         "message": f"Successfully uploaded {len(uploaded_cv_ids)} CVs",
@@ -234,11 +242,13 @@ async def delete_cv_endpoint(cv_id: str, db=Depends(get_database)):
 async def screen_cvs(
     jd_id: Optional[str] = Form(None),
     cv_ids: Optional[List[str]] = Form(None),
+    use_cache: bool = Form(True),
     db=Depends(get_database)
 ):
     """
     Screen CVs against a job description.
     If no parameters provided, uses active JD and recent CVs.
+    Set use_cache=false to bypass cached screening results.
     """
     # Get job description
     if jd_id:
@@ -278,7 +288,8 @@ async def screen_cvs(
             screening_result = await screener.screen_cv(
                 job_description=jd["content"],
                 cv_content=cv["content"],
-                file_name=cv["file_name"]
+                file_name=cv["file_name"],
+                use_cache=use_cache
             )
             
             # Store result in database
@@ -379,39 +390,29 @@ async def screen_single_cv(
     
     # Parse CV
     content = await cv_file.read()
-    temp_path = f"temp_{cv_file.filename}"
+    parsed_content = await parse_cv_bytes(content, cv_file.filename)
     
-    try:
-        with open(temp_path, "wb") as f:
-            f.write(content)
-        
-        parsed_content = parse_cv_file(temp_path)
-        
-        # Store CV
-        cv_id = await crud.create_cv(
-            db,
-            file_name=cv_file.filename,
-            content=parsed_content,
-            file_size=len(content)
-        )
-        
-        # Screen CV
-        result = await screener.screen_cv(
-            job_description=job_content,
-            cv_content=parsed_content,
-            file_name=cv_file.filename
-        )
-        
-        # Store result
-        result_id = await crud.create_screening_result(db, jd_id, cv_id, result)
-        result["id"] = result_id
-        result["cv_id"] = cv_id
-        
-        return result
-        
-    finally:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+    # Store CV
+    cv_id = await crud.create_cv(
+        db,
+        file_name=cv_file.filename,
+        content=parsed_content,
+        file_size=len(content)
+    )
+    
+    # Screen CV
+    result = await screener.screen_cv(
+        job_description=job_content,
+        cv_content=parsed_content,
+        file_name=cv_file.filename
+    )
+    
+    # Store result
+    result_id = await crud.create_screening_result(db, jd_id, cv_id, result)
+    result["id"] = result_id
+    result["cv_id"] = cv_id
+    
+    return result
 
 
 # ==================== Statistics & Management ====================
@@ -420,6 +421,9 @@ async def screen_single_cv(
 async def get_statistics(db=Depends(get_database)):
     """Get system statistics."""
     stats = await crud.get_statistics(db)
+    stats["screening_cache"] = screener.cache.stats()
+    stats["jd_context_cache"] = screener.context_cache.stats()
+    stats["parse_cache"] = default_parse_cache.stats()
     return stats
 
 
@@ -863,20 +867,10 @@ async def candidate_analyze_resume(
         if not content:
             raise HTTPException(status_code=400, detail="Uploaded file is empty")
         
-        temp_path = f"temp_{file.filename}"
+        cv_content = await parse_cv_bytes(content, file.filename)
         
-        try:
-            with open(temp_path, "wb") as f:
-                f.write(content)
-            
-            cv_content = parse_cv_file(temp_path)
-            
-            if not cv_content or not cv_content.strip():
-                raise HTTPException(status_code=400, detail="Could not parse CV content from file")
-            
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        if not cv_content or not cv_content.strip():
+            raise HTTPException(status_code=400, detail="Could not parse CV content from file")
         
         # Screen CV using the detailed candidate analysis prompt
         analysis_result = await screener.screen_cv_candidate(
@@ -1021,6 +1015,7 @@ class CVScreeningRequest(BaseModel):
     cvFiles: List[str]  # List of base64 encoded CV files
     jobDescription: str
     weightages: dict  # {"professional_experience": 20, "projects_achievements": 15, ...}
+    useCache: bool = True  # Set to False to force fresh AI screening
 
 
 @router.post("/screen-cvs-batch")
@@ -1035,17 +1030,14 @@ async def screen_cvs_batch(
     1. Accepts base64 encoded CV files from the frontend
     2. Creates a Job Posting reference for the ranking system
     3. Stores original CV files (Reference Pattern)
-    4. Screens each CV using weighted criteria via AI
+    4. Screens the CVs concurrently (bounded by CV_SCREENING_CONCURRENCY) using weighted criteria via AI
     5. Computes final scores from weightages
-    6. Stores detailed screening results and candidate rankings
+    6. Stores detailed screening results and, once every CV is done, candidate rankings
     7. Returns all candidates ranked by weighted score
     """
     import base64
-    import tempfile
-    import os
-    from cv_screener import parse_cv_file
+    import json
     from bson import ObjectId
-    from datetime import datetime
     
     if not request.cvFiles or len(request.cvFiles) == 0:
         raise HTTPException(status_code=400, detail="No CV files provided")
@@ -1084,34 +1076,44 @@ async def screen_cvs_batch(
     # Create screening batch
     batch_id = await crud.create_screening_batch(db, jd_id, [])
     
-    results = []
-    result_ids = []
-    cv_file_ids = []
+    total = len(request.cvFiles)
+    semaphore = asyncio.Semaphore(CV_SCREENING_CONCURRENCY)
+    logger.info(f"Screening {total} CVs with concurrency {CV_SCREENING_CONCURRENCY} (packed={CV_SCREENING_PACKED})")
     
-    for idx, cv_base64 in enumerate(request.cvFiles):
-        try:
-            print(f"[INFO] Processing CV {idx + 1}/{len(request.cvFiles)}")
-            
-            # Decode base64
-            if "," in cv_base64:
-                cv_base64_clean = cv_base64.split(",")[1]
-            else:
-                cv_base64_clean = cv_base64
-            
-            cv_bytes = base64.b64decode(cv_base64_clean)
-            print(f"[INFO] Decoded CV bytes: {len(cv_bytes)} bytes")
-            
-            # Create temp file with PDF extension
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                temp_file.write(cv_bytes)
-                temp_path = temp_file.name
-            
+    def error_outcome(idx: int, error: Exception, cv_file_id: Optional[str] = None) -> dict:
+        print(f"[ERROR] Error screening CV {idx + 1}: {str(error)}")
+        return {
+            "index": idx,
+            "result": {
+                "candidate_name": f"Candidate {idx + 1}",
+                "candidate_id": f"CAN-{idx + 1:04d}",
+                "email": "",
+                "overall_score": 0,
+                "score": 0,
+                "recommendation": "Error",
+                "summary": f"Error: {str(error)}"
+            },
+            "result_id": None,
+            "cv_file_id": cv_file_id,
+            "cv_content": None,
+        }
+    
+    async def prepare_cv(idx: int, cv_base64: str) -> dict:
+        """Decode, store and parse one CV. Never raises: failures are reported per CV."""
+        cv_file_id_ref = None
+        async with semaphore:
             try:
-                file_name = f"CV_{idx + 1}.pdf"
-                print(f"[INFO] Created temp file: {temp_path}")
-
+                # Decode base64
+                if "," in cv_base64:
+                    cv_base64_clean = cv_base64.split(",")[1]
+                else:
+                    cv_base64_clean = cv_base64
+                
+                cv_bytes = base64.b64decode(cv_base64_clean)
+                # Name the file after its actual content (base64 payloads carry no extension)
+                file_name = f"CV_{idx + 1}{detect_format(cv_bytes) or '.pdf'}"
+                
                 # 3. Store ORIGINAL FILE (Reference Pattern)
-                print(f"[INFO] Storing CV file with Reference Pattern...")
                 cv_file_id_ref = await create_job_cv_file(
                     db,
                     job_posting_id=job_posting_id,
@@ -1119,115 +1121,151 @@ async def screen_cvs_batch(
                     file_content=cv_base64_clean,
                     file_size=len(cv_bytes)
                 )
-                cv_file_ids.append(cv_file_id_ref)
-                print(f"[INFO] Stored CV file with ID: {cv_file_id_ref}")
-
-                # Parse CV content for screening
-                print(f"[INFO] Parsing CV content...")
-                cv_content = parse_cv_file(temp_path)
-                print(f"[INFO] Parsed CV content: {len(cv_content)} chars")
+                
+                # Parse CV content for screening (process pool, off the event loop)
+                cv_content = await parse_cv_bytes(cv_bytes, file_name)
                 
                 # Store CV Metadata/Text in cvs collection
-                print(f"[INFO] Saving CV metadata...")
                 cv_id = await crud.create_cv(
                     db,
                     file_name=file_name,
                     content=cv_content,
                     file_size=len(cv_bytes)
                 )
-                print(f"[INFO] Saved CV with ID: {cv_id}")
-                
-                # 4. Screen the CV with weighted criteria
-                print(f"[INFO] Screening CV with weighted criteria...")
+                return {
+                    "index": idx,
+                    "file_name": file_name,
+                    "cv_id": cv_id,
+                    "cv_file_id": cv_file_id_ref,
+                    "cv_content": cv_content,
+                }
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                return error_outcome(idx, e, cv_file_id_ref)
+    
+    async def store_result(prepared: dict, screening_result: dict) -> dict:
+        """Persist one screening result. Never raises."""
+        idx = prepared["index"]
+        try:
+            result_id = await crud.create_screening_result(
+                db,
+                jd_id,
+                prepared["cv_id"],
+                screening_result
+            )
+            screening_result["id"] = result_id
+            screening_result["cv_id"] = prepared["cv_id"]
+            screening_result["candidate_id"] = f"CAN-{idx + 1:04d}"
+            print(f"[INFO] ✅ CV {idx + 1} screened: overall_score={screening_result.get('overall_score', 'N/A')}")
+            return {
+                "index": idx,
+                "result": screening_result,
+                "result_id": result_id,
+                "cv_file_id": prepared["cv_file_id"],
+                "cv_content": prepared["cv_content"],
+            }
+        except Exception as e:
+            return error_outcome(idx, e, prepared["cv_file_id"])
+    
+    async def screen_single(prepared: dict) -> dict:
+        async with semaphore:
+            try:
                 screening_result = await screener.screen_cv_weighted(
                     job_description=request.jobDescription,
-                    cv_content=cv_content,
-                    file_name=file_name,
-                    weightages=request.weightages
+                    cv_content=prepared["cv_content"],
+                    file_name=prepared["file_name"],
+                    weightages=request.weightages,
+                    use_cache=request.useCache
                 )
-                print(f"[INFO] Screening result: overall_score={screening_result.get('overall_score', 'N/A')}")
-                
-                # Store detailed screening result
-                print(f"[INFO] Creating screening result record...")
-                result_id = await crud.create_screening_result(
-                    db,
-                    jd_id,
-                    cv_id,
-                    screening_result
-                )
-                result_ids.append(result_id)
-                print(f"[INFO] Created screening result with ID: {result_id}")
-                
-                # Extract candidate info
-                candidate_name = screening_result.get("candidate_name", f"Candidate {idx + 1}")
-                candidate_email = screening_result.get("email", "")
-                candidate_id = f"CAN-{idx + 1:04d}"
-                
-                # Ensure validation of score 
-                raw_score = screening_result.get("overall_score", 0)
-                try:
-                    if isinstance(raw_score, str):
-                        import re
-                        match = re.search(r'\d+(\.\d+)?', raw_score)
-                        overall_score = float(match.group()) if match else 0.0
-                    else:
-                        overall_score = float(raw_score)
-                except Exception:
-                    overall_score = 0.0
-                
-                print(f"[INFO] Creating candidate ranking: {candidate_name}, score: {overall_score}")
-                
-                # Sanitize evaluation details
-                import json
-                evaluation_details_safe = json.loads(json.dumps(screening_result, default=str))
-
-                try:
-                    ranking_id = await create_candidate_ranking(
-                        db,
-                        job_posting_id=job_posting_id,
-                        recruiter_id=request.recruiterId,
-                        candidate_name=candidate_name,
-                        rank=idx + 1,  # Temporary rank, will reorder below
-                        score=overall_score,
-                        candidate_id=candidate_id,
-                        email=candidate_email,
-                        cv_score=overall_score,
-                        completion=100,
-                        interview_status="Shortlisted" if overall_score >= 80 else "Pending",
-                        cv_data={"text": cv_content[:500] + "...", "file_id": cv_file_id_ref},
-                        evaluation_details=evaluation_details_safe
-                    )
-                    print(f"[INFO] ✅ Created ranking with ID: {ranking_id}")
-                except Exception as ranking_error:
-                    print(f"[ERROR] Failed to create ranking: {str(ranking_error)}")
-                    import traceback
-                    traceback.print_exc()
-                
-                # Add to results for response
-                screening_result["id"] = result_id
-                screening_result["cv_id"] = cv_id
-                screening_result["candidate_id"] = candidate_id
-                results.append(screening_result)
-                print(f"[INFO] ✅ CV {idx + 1} processed successfully")
-                
-            finally:
-                # Clean up temp file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                    
+            except Exception as e:
+                return error_outcome(prepared["index"], e, prepared["cv_file_id"])
+        return await store_result(prepared, screening_result)
+    
+    # gather() preserves input order, so everything below is independent of completion order
+    prepared_cvs = await asyncio.gather(
+        *(prepare_cv(idx, cv_base64) for idx, cv_base64 in enumerate(request.cvFiles))
+    )
+    parsed = [p for p in prepared_cvs if "cv_id" in p]
+    
+    # 4. Screen the CVs with weighted criteria
+    if CV_SCREENING_PACKED and len(parsed) > 1:
+        # Several CVs per request against a single JD copy
+        try:
+            packed_results = await screener.screen_cvs_weighted_packed(
+                job_description=request.jobDescription,
+                cvs=[
+                    {"cv_id": p["cv_id"], "cv_content": p["cv_content"], "file_name": p["file_name"]}
+                    for p in parsed
+                ],
+                weightages=request.weightages,
+                use_cache=request.useCache,
+                max_concurrency=CV_SCREENING_CONCURRENCY
+            )
         except Exception as e:
-            print(f"[ERROR] Error screening CV {idx + 1}: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            results.append({
-                "candidate_name": f"Candidate {idx + 1}",
-                "candidate_id": f"CAN-{idx + 1:04d}",
-                "email": "",
-                "overall_score": 0,
-                "score": 0,
-                "recommendation": "Error",
-                "summary": f"Error: {str(e)}"
-            })
+            logger.error(f"Packed screening failed: {e}")
+            packed_results = {}
+        
+        async def store_packed(prepared: dict) -> dict:
+            screening_result = packed_results.get(prepared["cv_id"])
+            if screening_result is None:
+                return error_outcome(prepared["index"], RuntimeError("No screening result returned"), prepared["cv_file_id"])
+            return await store_result(prepared, screening_result)
+        
+        screened = await asyncio.gather(*(store_packed(p) for p in parsed))
+    else:
+        screened = await asyncio.gather(*(screen_single(p) for p in parsed))
+    
+    screened_by_index = {o["index"]: o for o in screened}
+    outcomes = [
+        screened_by_index.get(p["index"], p) if "cv_id" in p else p
+        for p in prepared_cvs
+    ]
+    
+    result_ids = [o["result_id"] for o in outcomes if o["result_id"]]
+    cv_file_ids = [o["cv_file_id"] for o in outcomes if o["cv_file_id"]]
+    
+    # Sort results by weighted score descending; ties keep upload order
+    def get_score(r):
+        raw = r.get("overall_score", r.get("score", 0))
+        try:
+            if isinstance(raw, str):
+                match = re.search(r'\d+(\.\d+)?', raw)
+                return float(match.group()) if match else 0.0
+            return float(raw) if raw else 0.0
+        except (ValueError, TypeError):
+            return 0.0
+    
+    ranked = sorted(outcomes, key=lambda o: (-get_score(o["result"]), o["index"]))
+    
+    # 5. Finalize rankings now that every score is known
+    async def store_ranking(rank: int, outcome: dict):
+        screening_result = outcome["result"]
+        overall_score = get_score(screening_result)
+        candidate_name = screening_result.get("candidate_name", f"Candidate {outcome['index'] + 1}")
+        try:
+            # Sanitize evaluation details
+            evaluation_details_safe = json.loads(json.dumps(screening_result, default=str))
+            await create_candidate_ranking(
+                db,
+                job_posting_id=job_posting_id,
+                recruiter_id=request.recruiterId,
+                candidate_name=candidate_name,
+                rank=rank,
+                score=overall_score,
+                candidate_id=screening_result["candidate_id"],
+                email=screening_result.get("email", ""),
+                cv_score=overall_score,
+                completion=100,
+                interview_status="Shortlisted" if overall_score >= 80 else "Pending",
+                cv_data={"text": outcome["cv_content"][:500] + "...", "file_id": outcome["cv_file_id"]},
+                evaluation_details=evaluation_details_safe
+            )
+        except Exception as ranking_error:
+            print(f"[ERROR] Failed to create ranking for {candidate_name}: {str(ranking_error)}")
+    
+    successful = [o for o in ranked if o["result_id"]]
+    await asyncio.gather(*(store_ranking(rank, o) for rank, o in enumerate(successful, start=1)))
     
     # Post-processing: update batch, job posting, and format results
     try:
@@ -1246,31 +1284,16 @@ async def screen_cvs_batch(
     except Exception as e:
         print(f"[WARNING] Failed to update job posting cv_file_ids: {e}")
     
-    # Sort results by weighted score descending
-    def get_score(r):
-        try:
-            s = r.get("overall_score", r.get("score", 0))
-            return float(s) if s else 0.0
-        except (ValueError, TypeError):
-            return 0.0
-    
-    results.sort(key=get_score, reverse=True)
-    
     # Format for frontend ranking table (minimal details)
     formatted_results = []
-    for idx, result in enumerate(results):
-        try:
-            raw = result.get("overall_score", result.get("score", 0))
-            score_val = round(float(raw), 2) if raw else 0.0
-        except (ValueError, TypeError):
-            score_val = 0.0
-            
+    for idx, outcome in enumerate(ranked):
+        result = outcome["result"]
         formatted_results.append({
             "rank": idx + 1,
-            "candidate_id": result.get("candidate_id", f"CAN-{idx + 1:04d}"),
-            "candidate_name": result.get("candidate_name", f"Candidate {idx + 1}"),
+            "candidate_id": result.get("candidate_id", f"CAN-{outcome['index'] + 1:04d}"),
+            "candidate_name": result.get("candidate_name", f"Candidate {outcome['index'] + 1}"),
             "email": result.get("email", ""),
-            "score": score_val,
+            "score": round(get_score(result), 2),
         })
     
     return {
@@ -1278,7 +1301,6 @@ async def screen_cvs_batch(
         "batch_id": batch_id,
         "job_description_id": jd_id,
         "job_posting_id": job_posting_id,
-        "total_screened": len(results),
+        "total_screened": len(outcomes),
         "results": formatted_results
     }
-
@@ -35,6 +35,7 @@ from database.superuser_crud import (
     delete_superuser_by_id,
 )
 from services.activity_logger import log_activity
+from services.latency_tracer import default_tracer
 
 router = APIRouter(prefix="/superuser", tags=["Superuser"])
 
@@ -105,6 +106,25 @@ async def dashboard_stats(
     return stats
 
 
+# ==================== Interview Latency ====================
+
+@router.get("/latency/stats")
+async def interview_latency_stats(
+    session_id: Optional[str] = Query(None),
+    recent: int = Query(0, ge=0, le=500),
+    _user=Depends(require_superuser),
+):
+    """
+    Voice interview turn latency for this worker: p50/p95/p99 and histograms
+    of time-to-first-token and time-to-first-audio, plus per-span breakdowns.
+    Pass ``recent`` to include the latest raw turn traces.
+    """
+    stats = default_tracer.stats(session_id)
+    if recent:
+        stats["recent_turns"] = default_tracer.recent(session_id, limit=recent)
+    return stats
+
+
 # ==================== Activity Logs ====================
 
 @router.get("/activity-logs")
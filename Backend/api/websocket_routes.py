@@ -3,88 +3,137 @@ import json
 import asyncio
 from typing import Dict
 import uuid
-import re
 
 from database.connection import get_database
 from services.interview_service import InterviewService
+from services.tts_pipeline import TTSPipeline
+from services.sentence_segmenter import SentenceSegmenter
+from services.latency_tracer import current_turn, default_tracer, span
+from services.stt_service import STT_DEFAULT_SAMPLE_RATE, STT_SAMPLE_RATES
+from api.audio_frames import (
+    FLAG_FINAL, FRAME_AUDIO_CHUNK, FRAME_AUDIO_IN, FRAME_AUDIO_OUT,
+    FrameError, FrameSequencer, decode_frame, encode_frame,
+)
 
 router = APIRouter(prefix="/ws", tags=["Interview WebSockets"])
 
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
+        self.frame_sequencers: Dict[str, FrameSequencer] = {}
 
     async def connect(self, websocket: WebSocket, session_id: str):
         await websocket.accept()
         self.active_connections[session_id] = websocket
+        self.frame_sequencers[session_id] = FrameSequencer()
 
     def disconnect(self, session_id: str):
         if session_id in self.active_connections:
             del self.active_connections[session_id]
+        self.frame_sequencers.pop(session_id, None)
 
     async def send_json(self, session_id: str, message: dict):
         if session_id in self.active_connections:
             await self.active_connections[session_id].send_json(message)
 
+    async def send_frame(self, session_id: str, frame_type: int, sentence_id: int, payload: bytes = b"", flags: int = 0):
+        """Send raw audio as a binary frame (see api.audio_frames)."""
+        if session_id in self.active_connections:
+            seq = self.frame_sequencers[session_id].next()
+            await self.active_connections[session_id].send_bytes(
+                encode_frame(frame_type, seq, sentence_id, payload, flags)
+            )
+
 manager = ConnectionManager()
 
-async def tts_worker(session_id: str, queue: asyncio.Queue, tts_service, web_manager: ConnectionManager):
+async def process_llm_and_tts(
+    session_id: str,
+    input_text: str,
+    service: InterviewService,
+    web_manager: ConnectionManager,
+    audio_streaming: bool = False,
+    binary_audio: bool = False
+):
     import base64
-    try:
-        while True:
-            text = await queue.get()
-            if text is None:  # Sentinel
-                queue.task_done()
-                break
-                
-            try:
-                tts_bytes = await tts_service.generate_speech(text)
-                if tts_bytes:
-                    b64 = base64.b64encode(tts_bytes).decode('utf-8')
-                    await web_manager.send_json(session_id, {
-                        "type": "audio_output",
-                        "payload": b64,
-                        "text": text
-                    })
-            except asyncio.CancelledError:
-                queue.task_done()
-                break
-            except Exception as e:
-                print(f"TTS Worker Error: {e}")
-            finally:
-                queue.task_done()
-    except asyncio.CancelledError:
-        pass
-
-async def process_llm_and_tts(session_id: str, input_text: str, service: InterviewService, web_manager: ConnectionManager):
-    queue = asyncio.Queue()
-    worker_task = asyncio.create_task(tts_worker(session_id, queue, service.tts_service, web_manager))
     
-    buffer = ""
+    # Whole-sentence clients get one audio_output per sentence, assembled from the stream
+    sentence_audio: Dict[int, bytearray] = {}
+    
+    async def send_chunk(seq: int, text: str, index: int, chunk: bytes):
+        if not audio_streaming:
+            sentence_audio.setdefault(seq, bytearray()).extend(chunk)
+            return
+        if binary_audio:
+            if index == 0:
+                # Sentence text travels as JSON; the audio follows as binary frames
+                await web_manager.send_json(session_id, {"type": "audio_sentence", "seq": seq, "text": text})
+            await web_manager.send_frame(session_id, FRAME_AUDIO_CHUNK, seq, chunk)
+            return
+        message = {
+            "type": "audio_chunk",
+            "payload": base64.b64encode(chunk).decode('utf-8'),
+            "seq": seq,
+            "index": index
+        }
+        if index == 0:
+            message["text"] = text
+        await web_manager.send_json(session_id, message)
+    
+    async def end_sentence(seq: int, text: str, chunk_count: int):
+        if audio_streaming:
+            if binary_audio:
+                await web_manager.send_frame(session_id, FRAME_AUDIO_CHUNK, seq, flags=FLAG_FINAL)
+                return
+            await web_manager.send_json(session_id, {
+                "type": "audio_chunk_end",
+                "seq": seq,
+                "chunks": chunk_count,
+                "text": text
+            })
+            return
+        tts_bytes = bytes(sentence_audio.pop(seq, b""))
+        if binary_audio:
+            await web_manager.send_json(session_id, {"type": "audio_sentence", "seq": seq, "text": text})
+            await web_manager.send_frame(session_id, FRAME_AUDIO_OUT, seq, tts_bytes, FLAG_FINAL)
+            return
+        await web_manager.send_json(session_id, {
+            "type": "audio_output",
+            "payload": base64.b64encode(tts_bytes).decode('utf-8'),
+            "text": text,
+            "seq": seq
+        })
+    
+    # Started by websocket_endpoint when the candidate's input arrived
+    turn = current_turn()
+    
+    # Sentences are synthesized concurrently but sent in order
+    pipeline = TTSPipeline(
+        service.tts_service.stream_speech,
+        send_chunk,
+        end_sentence,
+        label=f"session={session_id} streaming={audio_streaming} binary={binary_audio}"
+    )
+    
+    segmenter = SentenceSegmenter()
     try:
         async for chunk in service.process_input(session_id, input_text):
             await web_manager.send_json(session_id, {"type": "text_chunk", "payload": chunk})
-            buffer += chunk
             
-            # Extract sentences safely (. ? ! optionally with quotes/spaces)
-            match = re.search(r'(.*?[\.\!\?]+)(?:\s+|$)', buffer)
-            while match:
-                sentence = match.group(1).strip()
-                buffer = buffer[match.end():]
-                if len(sentence) > 3:
-                    queue.put_nowait(sentence)
-                match = re.search(r'(.*?[\.\!\?]+)(?:\s+|$)', buffer)
+            # Only the newly streamed text is scanned for sentence boundaries
+            for sentence in segmenter.feed(chunk):
+                pipeline.submit(sentence)
                 
-        if buffer.strip():
-            queue.put_nowait(buffer.strip())
+        for sentence in segmenter.flush():
+            pipeline.submit(sentence)
+        
+        await pipeline.finish()
+        default_tracer.finish_turn(turn)
             
-    except asyncio.CancelledError:
-        worker_task.cancel()
+    except BaseException as e:
+        # Interrupt (cancellation) or failure: drop every sentence still being synthesized
+        pipeline.cancel()
+        default_tracer.finish_turn(turn, "interrupted" if isinstance(e, asyncio.CancelledError) else "error")
         raise
-    finally:
-        queue.put_nowait(None)
-        
-    await queue.join()
     
     # Notify Frontend that the AI is fully done generating this response
     await web_manager.send_json(session_id, {
@@ -116,25 +165,67 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     
     current_generation_task = None
     
+    # Negotiated through a client_config message; old clients get whole-sentence base64 audio_output
+    client_options = {"audio_streaming": False, "binary_audio": False, "stt_streaming": False, "sample_rate": 16000}
+    
+    # Incremental transcription of the utterance in progress (stt_streaming clients)
+    transcriber = None
+    
+    async def send_partial(text: str):
+        await manager.send_json(session_id, {"type": "transcription_partial", "payload": text})
+    
     try:
         while True:
-            data = await websocket.receive_text()
+            data = await websocket.receive()
+            if data["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(data.get("code", 1000))
             
             try:
-                message = json.loads(data)
-                msg_type = message.get("type")
-                payload = message.get("payload")
+                audio_bytes = None
+                transcription = None
+                if data.get("bytes") is not None:
+                    # Binary frame: raw candidate audio behind a small header
+                    frame_type, flags, seq, utterance_id, frame_payload = decode_frame(data["bytes"])
+                    if frame_type != FRAME_AUDIO_IN:
+                        continue
+                    msg_type = "audio_data"
+                    payload = None
+                    if client_options["stt_streaming"]:
+                        # 16-bit PCM while the candidate speaks; segments are transcribed on each pause
+                        if transcriber is None:
+                            transcriber = service.stt_service.streaming(client_options["sample_rate"], send_partial)
+                        transcriber.feed(bytes(frame_payload))
+                        if not flags & FLAG_FINAL:
+                            continue
+                        active, transcriber = transcriber, None
+                        # The candidate finished speaking: the turn starts now
+                        default_tracer.start_turn(session_id, "audio_stream")
+                        with span("stt"):
+                            transcription = await active.finish()
+                    else:
+                        audio_bytes = bytes(frame_payload)
+                else:
+                    message = json.loads(data.get("text") or "")
+                    msg_type = message.get("type")
+                    payload = message.get("payload")
                 
                 if msg_type in ["audio_data", "text_data", "start_interview"]:
-                    transcription = ""
-                    
-                    if msg_type == "audio_data":
-                        import base64
-                        audio_bytes = base64.b64decode(payload)
-                        transcription = await service.transcribe_audio(audio_bytes)
+                    if transcription is not None:
+                        # Already transcribed incrementally
+                        pass
+                    elif msg_type == "audio_data":
+                        default_tracer.start_turn(session_id, msg_type)
+                        if audio_bytes is None:
+                            # Base64-in-JSON fallback
+                            import base64
+                            audio_bytes = base64.b64decode(payload)
+                        with span("stt"):
+                            transcription = await service.transcribe_audio(audio_bytes)
                     elif msg_type == "text_data":
+                        default_tracer.start_turn(session_id, msg_type)
                         transcription = payload
                     elif msg_type == "start_interview":
+                        default_tracer.start_turn(session_id, msg_type)
                         transcription = "INIT"
                         await manager.send_json(session_id, {
                             "type": "session_created",
@@ -154,24 +245,63 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                             
                         # Start new async generation task safely without blocking ws listener
                         current_generation_task = asyncio.create_task(
-                            process_llm_and_tts(session_id, transcription, service, manager)
+                            process_llm_and_tts(
+                                session_id, transcription, service, manager,
+                                audio_streaming=client_options["audio_streaming"],
+                                binary_audio=client_options["binary_audio"]
+                            )
                         )
+                
+                elif msg_type == "client_config":
+                    # e.g. {"type": "client_config", "payload": {"audio_streaming": true, "binary_audio": true,
+                    #       "stt_streaming": true, "sample_rate": 16000}}
+                    config = payload if isinstance(payload, dict) else {}
+                    client_options["audio_streaming"] = bool(config.get("audio_streaming", False))
+                    client_options["binary_audio"] = bool(config.get("binary_audio", False))
+                    client_options["stt_streaming"] = bool(config.get("stt_streaming", False))
+                    # An unusable rate would break PCM framing mid-interview, so fall back to the default
+                    requested_rate = config.get("sample_rate", STT_DEFAULT_SAMPLE_RATE)
+                    try:
+                        sample_rate = int(requested_rate)
+                    except (TypeError, ValueError):
+                        sample_rate = None
+                    rejected = {}
+                    if sample_rate not in STT_SAMPLE_RATES:
+                        rejected["sample_rate"] = requested_rate
+                        sample_rate = STT_DEFAULT_SAMPLE_RATE
+                    client_options["sample_rate"] = sample_rate
+                    ack = dict(client_options)
+                    if rejected:
+                        print(f"[STT] session={session_id} rejected client config {rejected}")
+                        ack["rejected"] = rejected
+                    await manager.send_json(session_id, {
+                        "type": "client_config_ack",
+                        "payload": ack
+                    })
                         
                 elif msg_type == "interrupt":
                     # Fast-kill the LLM generation immediately
                     if current_generation_task and not current_generation_task.done():
                         current_generation_task.cancel()
                         
-            except json.JSONDecodeError:
+            except (json.JSONDecodeError, FrameError):
                 pass
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                # A malformed message or frame only loses that message, not the interview
+                print(f"[WARNING] session={session_id} dropped a client message: {e}")
                 
     except WebSocketDisconnect:
-        manager.disconnect(session_id)
-        if current_generation_task and not current_generation_task.done():
-            current_generation_task.cancel()
+        pass
     except Exception as e:
         import traceback
         traceback.print_exc()
+    finally:
         manager.disconnect(session_id)
+        # Score any answers still waiting for a full batch
+        service.evaluations.flush(session_id)
+        if transcriber is not None:
+            transcriber.cancel()
         if current_generation_task and not current_generation_task.done():
             current_generation_task.cancel()
@@ -6,7 +6,15 @@ A comprehensive CV screening system using Google Gemini 2.5 Flash AI.
 
 Main Components:
 - GeminiCVScreener: AI-powered CV screening and ranking
-- parse_cv_file: Extract text from PDF, DOCX, and TXT files
+- get_shared_screener: Process-wide screener sharing one async Gemini client
+- parse_cv_file: Extract text from PDF, DOCX, and TXT files (paths or in-memory bytes)
+- detect_format: Identify a document's format from its magic bytes
+- parse_cv_bytes: Async parsing of uploaded bytes in a process pool
+- parse_cv_document: Budgeted, page-streaming parse with truncation metadata
+- PDF_BACKENDS: Pluggable PDF text backends (see benchmark_backends)
+- ScreeningCache: Content-addressed cache for screening results
+- ParseCache: Extracted CV text keyed by the uploaded file's hash
+- JDContextCache: Gemini cached contexts holding a JD and its instructions
 
 Usage Example:
     from cv_screener import GeminiCVScreener, parse_cv_file
@@ -16,8 +24,11 @@ Usage Example:
     result = await screener.screen_cv(job_description, cv_text, "cv.pdf")
 """
 
-from .gemini_screener import GeminiCVScreener
-from .cv_parser import parse_cv_file
+from .gemini_screener import GeminiCVScreener, get_shared_screener
+from .cv_parser import parse_cv_file, parse_cv_document, detect_format, PDF_BACKENDS, register_pdf_backend
+from .parse_service import parse_cv_bytes, parse_cv_document_bytes, parse_many
+from .cache import ScreeningCache, ParseCache
+from .context_cache import JDContextCache
 
-__all__ = ["GeminiCVScreener", "parse_cv_file"]
+__all__ = ["GeminiCVScreener", "get_shared_screener", "parse_cv_file", "parse_cv_document", "detect_format", "PDF_BACKENDS", "register_pdf_backend", "parse_cv_bytes", "parse_cv_document_bytes", "parse_many", "ScreeningCache", "ParseCache", "JDContextCache"]
 __version__ = "1.0.0"
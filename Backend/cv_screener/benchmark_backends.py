@@ -0,0 +1,197 @@
+"""
+PDF Backend Benchmark
+=====================
+
+Generates a synthetic CV corpus locally with reportlab and measures every
+registered PDF text backend (see ``cv_parser.PDF_BACKENDS``) on it.
+
+Each backend runs in its own spawned process so that peak RSS reflects
+that backend alone. Reported per backend:
+- pages/sec and MB/sec over the whole corpus
+- peak RSS of the worker process and its growth over the loaded corpus
+
+Usage Example:
+    python -m cv_screener.benchmark_backends
+    python -m cv_screener.benchmark_backends --backends pypdf2 pypdfium2 --docs 50 --pages 1 2 4 40
+    python -m cv_screener.benchmark_backends --json results.json
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import random
+import sys
+import time
+from typing import Any, Dict, List, Sequence
+
+from .cv_parser import PDF_BACKENDS
+
+FIRST_NAMES = ["Amal", "Nimal", "Sara", "John", "Priya", "Kasun", "Maria", "Ahmed", "Li", "Fatima"]
+LAST_NAMES = ["Perera", "Silva", "Smith", "Fernando", "Khan", "Garcia", "Chen", "Jayasinghe"]
+SKILLS = [
+    "Python", "FastAPI", "Django", "React", "TypeScript", "MongoDB", "PostgreSQL", "Docker",
+    "Kubernetes", "AWS", "GCP", "Machine Learning", "PyTorch", "TensorFlow", "CI/CD", "Git",
+    "Agile", "REST APIs", "GraphQL", "Redis", "Kafka", "Linux", "Terraform", "Data Analysis",
+]
+ROLES = ["Software Engineer", "Data Scientist", "Backend Developer", "DevOps Engineer", "QA Engineer"]
+COMPANIES = ["Virtusa", "WSO2", "IFS", "Sysco LABS", "99x", "Acme Corp", "Globex", "Initech"]
+BULLETS = [
+    "Designed and shipped {skill} services handling {n}k requests per day",
+    "Led a team of {n} engineers delivering a {skill} migration on schedule",
+    "Reduced infrastructure cost by {n}% by introducing {skill}",
+    "Built dashboards and alerting on top of {skill} for {n} production systems",
+    "Mentored {n} junior developers and ran weekly {skill} workshops",
+]
+
+
+def build_cv_pdf(rng: random.Random, pages: int) -> bytes:
+    """Render one synthetic multi-page CV and return the PDF bytes."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+    for page in range(pages):
+        y = height - 60
+        if page == 0:
+            pdf.setFont("Helvetica-Bold", 18)
+            pdf.drawString(50, y, name)
+            y -= 22
+            pdf.setFont("Helvetica", 11)
+            pdf.drawString(50, y, f"{rng.choice(ROLES)} | {name.split()[0].lower()}@example.com | +94 77 000 0000")
+            y -= 30
+            pdf.setFont("Helvetica-Bold", 13)
+            pdf.drawString(50, y, "Skills")
+            y -= 18
+            pdf.setFont("Helvetica", 10)
+            pdf.drawString(50, y, ", ".join(rng.sample(SKILLS, 10)))
+            y -= 30
+
+        pdf.setFont("Helvetica-Bold", 13)
+        pdf.drawString(50, y, "Experience" if page == 0 else f"Experience (continued, page {page + 1})")
+        y -= 20
+        while y > 80:
+            pdf.setFont("Helvetica-Bold", 11)
+            pdf.drawString(50, y, f"{rng.choice(ROLES)} - {rng.choice(COMPANIES)} ({rng.randint(2012, 2024)})")
+            y -= 16
+            pdf.setFont("Helvetica", 10)
+            for _ in range(4):
+                bullet = rng.choice(BULLETS).format(skill=rng.choice(SKILLS), n=rng.randint(2, 90))
+                pdf.drawString(62, y, f"- {bullet}")
+                y -= 14
+            y -= 10
+        pdf.showPage()
+
+    pdf.save()
+    return buffer.getvalue()
+
+
+def build_corpus(docs: int, page_counts: Sequence[int], seed: int = 7) -> List[bytes]:
+    """Generate ``docs`` CVs cycling through ``page_counts`` pages each."""
+    rng = random.Random(seed)
+    return [build_cv_pdf(rng, page_counts[i % len(page_counts)]) for i in range(docs)]
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_backend(backend: str, corpus: List[bytes], repeat: int, results) -> None:
+    """Worker process: extract every page of the corpus ``repeat`` times."""
+    pages_func = PDF_BACKENDS[backend]
+    baseline_rss = _peak_rss_mb()
+    pages = 0
+    chars = 0
+    try:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for data in corpus:
+                for text in pages_func(data):
+                    pages += 1
+                    chars += len(text)
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        results.put({"backend": backend, "error": str(e)})
+        return
+
+    megabytes = sum(len(data) for data in corpus) * repeat / (1024 * 1024)
+    peak_rss = _peak_rss_mb()
+    results.put({
+        "backend": backend,
+        "pages": pages,
+        "chars": chars,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 1) if elapsed else 0.0,
+        "mb_per_sec": round(megabytes / elapsed, 2) if elapsed else 0.0,
+        "peak_rss_mb": round(peak_rss, 1),
+        "rss_growth_mb": round(peak_rss - baseline_rss, 1),
+    })
+
+
+def benchmark(backends: Sequence[str], corpus: List[bytes], repeat: int = 1) -> List[Dict[str, Any]]:
+    """Run each backend in a fresh process and collect its measurements."""
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    for backend in backends:
+        results = context.Queue()
+        process = context.Process(target=_run_backend, args=(backend, corpus, repeat, results))
+        process.start()
+        process.join()
+        if results.empty():
+            row = {"backend": backend, "error": f"worker exited with code {process.exitcode}"}
+        else:
+            row = results.get()
+        rows.append(row)
+    return rows
+
+
+def print_report(rows: List[Dict[str, Any]], corpus: List[bytes]):
+    total_mb = sum(len(data) for data in corpus) / (1024 * 1024)
+    print(f"\nCorpus: {len(corpus)} PDFs, {total_mb:.2f} MB\n")
+    print(f"{'backend':<12}{'pages/s':>10}{'MB/s':>9}{'peak RSS':>11}{'RSS +':>9}{'chars':>11}")
+    print("-" * 62)
+    for row in rows:
+        if "error" in row:
+            print(f"{row['backend']:<12}  unavailable: {row['error']}")
+            continue
+        print(
+            f"{row['backend']:<12}{row['pages_per_sec']:>10}{row['mb_per_sec']:>9}"
+            f"{row['peak_rss_mb']:>9}MB{row['rss_growth_mb']:>7}MB{row['chars']:>11}"
+        )
+
+
+def main(argv: Sequence[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the PDF text backends on a synthetic CV corpus")
+    parser.add_argument("--backends", nargs="+", default=list(PDF_BACKENDS), help="Backends to measure")
+    parser.add_argument("--docs", type=int, default=30, help="Number of synthetic CVs")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 3, 10], help="Page counts to cycle through")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the corpus per backend")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.backends if name not in PDF_BACKENDS]
+    if unknown:
+        parser.error(f"unknown backend(s): {', '.join(unknown)}")
+
+    print(f"Generating {args.docs} synthetic CVs...")
+    corpus = build_corpus(args.docs, args.pages, args.seed)
+    rows = benchmark(args.backends, corpus, args.repeat)
+    print_report(rows, corpus)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"docs": args.docs, "pages": args.pages, "repeat": args.repeat, "results": rows}, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
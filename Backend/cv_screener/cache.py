@@ -0,0 +1,217 @@
+"""
+Screening Caches
+================
+
+Two-tier (in-process LRU + MongoDB) caches for expensive CV screening work.
+
+Main Components:
+- TieredCache: Generic async cache with an LRU memory tier and a Mongo tier
+- ScreeningCache: Content-addressed cache for Gemini screening results
+- ParseCache: Extracted CV text keyed by the hash of the uploaded bytes
+
+Entries in MongoDB carry an ``expires_at`` timestamp; the TTL index created in
+``database.connection`` lets MongoDB purge them automatically.
+"""
+
+import logging
+import copy
+import hashlib
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def sha256_text(text: str) -> str:
+    """Return the hex SHA-256 digest of a text value."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def sha256_bytes(data: bytes) -> str:
+    """Return the hex SHA-256 digest of raw bytes."""
+    return hashlib.sha256(data or b"").hexdigest()
+
+
+def _default_db_provider():
+    """Resolve the application database lazily so this package stays importable on its own."""
+    try:
+        from database.connection import db_manager
+        return db_manager.db
+    except ImportError:
+        return None
+
+
+class TieredCache:
+    """
+    Async key/value cache with an in-process LRU tier backed by a Mongo collection.
+
+    Attributes:
+        collection_name: Mongo collection holding the persistent tier
+        max_entries: Maximum number of entries kept in memory
+        ttl_seconds: Lifetime of an entry in both tiers
+        enabled: When False every lookup is a miss and nothing is stored
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        max_entries: int = 512,
+        ttl_seconds: int = 30 * 24 * 3600,
+        enabled: bool = True,
+        db_provider: Optional[Callable[[], Any]] = None,
+    ):
+        self.collection_name = collection_name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._db_provider = db_provider or _default_db_provider
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._stats = {"memory_hits": 0, "store_hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+    def _collection(self):
+        db = self._db_provider()
+        return db[self.collection_name] if db is not None else None
+
+    def _remember(self, key: str, value: Any, expires_at: datetime):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return a copy of the cached value, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        now = datetime.utcnow()
+        entry = self._memory.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return copy.deepcopy(value)
+            del self._memory[key]
+
+        collection = self._collection()
+        if collection is not None:
+            try:
+                doc = await collection.find_one({"_id": key})
+                if doc and doc.get("expires_at", now) > now:
+                    self._remember(key, doc["value"], doc["expires_at"])
+                    self._stats["store_hits"] += 1
+                    return copy.deepcopy(doc["value"])
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"{self.collection_name} lookup failed: {e}")
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any, metadata: Optional[Dict[str, Any]] = None):
+        """Store a value in both tiers. Mongo failures are logged, never raised."""
+        if not self.enabled:
+            return
+
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+        self._remember(key, copy.deepcopy(value), expires_at)
+        self._stats["writes"] += 1
+
+        collection = self._collection()
+        if collection is None:
+            return
+        try:
+            doc = {"value": value, "created_at": now, "expires_at": expires_at}
+            if metadata:
+                doc.update(metadata)
+            await collection.replace_one({"_id": key}, doc, upsert=True)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"{self.collection_name} write failed: {e}")
+
+    def clear_memory(self):
+        """Drop the in-process tier (the Mongo tier is left untouched)."""
+        self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for monitoring."""
+        lookups = self._stats["memory_hits"] + self._stats["store_hits"] + self._stats["misses"]
+        hits = self._stats["memory_hits"] + self._stats["store_hits"]
+        return {
+            **self._stats,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "enabled": self.enabled,
+        }
+
+
+class ScreeningCache(TieredCache):
+    """
+    Content-addressed cache for Gemini screening results.
+
+    Keys are derived from (prompt template id/version, model name,
+    SHA-256 of the JD text, SHA-256 of the CV text), so editing a prompt
+    template only requires bumping its version.
+    """
+
+    COLLECTION_NAME = "screening_cache"
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("collection_name", self.COLLECTION_NAME)
+        kwargs.setdefault("max_entries", int(os.getenv("SCREENING_CACHE_MAX_ENTRIES", "1024")))
+        kwargs.setdefault("ttl_seconds", int(os.getenv("SCREENING_CACHE_TTL_SECONDS", str(30 * 24 * 3600))))
+        kwargs.setdefault(
+            "enabled",
+            os.getenv("SCREENING_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "y", "on"},
+        )
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def make_key(template_id: str, template_version: int, model_name: str, job_description: str, cv_content: str) -> str:
+        """Build the cache key for one screening call."""
+        parts = [
+            f"{template_id}:v{template_version}",
+            model_name,
+            sha256_text(job_description),
+            sha256_text(cv_content),
+        ]
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class ParseCache(TieredCache):
+    """
+    Cache of extracted CV text keyed by SHA-256 of the raw file bytes.
+
+    The parser signature (``cv_parser.parser_signature``: parser version
+    plus extraction budgets) is part of the key, so bumping
+    ``PARSER_VERSION`` or changing a budget invalidates every entry without
+    a purge.
+    """
+
+    COLLECTION_NAME = "parsed_cv_cache"
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("collection_name", self.COLLECTION_NAME)
+        kwargs.setdefault("max_entries", int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "512")))
+        kwargs.setdefault("ttl_seconds", int(os.getenv("PARSE_CACHE_TTL_SECONDS", str(90 * 24 * 3600))))
+        kwargs.setdefault(
+            "enabled",
+            os.getenv("PARSE_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "y", "on"},
+        )
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def make_key(content_hash: str, parser_signature: str) -> str:
+        """Build the cache key for one document under one parser configuration."""
+        return f"{parser_signature}|{content_hash}"
+
+
+# Shared by every GeminiCVScreener instance in the process
+default_screening_cache = ScreeningCache()
+
+# Shared by every upload path via cv_screener.parse_service
+default_parse_cache = ParseCache()
@@ -0,0 +1,166 @@
+"""
+JD Context Cache
+================
+
+Registers a job description (plus the screening instructions) once as a
+Gemini cached context so that later per-CV calls only send the CV body.
+
+Contexts are keyed by (prompt template id/version, model name, SHA-256 of
+the JD text). A context is only created once the same key has been used
+``min_uses`` times, so one-off screenings never pay the cache creation
+cost. Contexts expire on their own after ``ttl_seconds`` and are deleted
+explicitly when a job's description is edited (see ``invalidate``).
+"""
+
+import logging
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from google.genai import types
+
+from .cache import sha256_text
+
+logger = logging.getLogger(__name__)
+
+
+class JDContextCache:
+    """
+    Tracks Gemini cached contexts for job descriptions.
+
+    Attributes:
+        ttl_seconds: Lifetime requested for each cached context
+        min_uses: Number of uses of a key before a context is created for it
+        min_tokens: Estimated prompt size below which caching is not attempted
+        enabled: When False no contexts are created
+    """
+
+    # Keys whose creation failed are not retried for this long
+    FAILURE_BACKOFF_SECONDS = 600
+
+    def __init__(
+        self,
+        ttl_seconds: int = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600")),
+        min_uses: int = int(os.getenv("GEMINI_CONTEXT_CACHE_MIN_USES", "2")),
+        min_tokens: int = int(os.getenv("GEMINI_CONTEXT_CACHE_MIN_TOKENS", "1024")),
+        enabled: bool = os.getenv("GEMINI_CONTEXT_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "y", "on"},
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.min_uses = min_uses
+        self.min_tokens = min_tokens
+        self.enabled = enabled
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._uses: Dict[str, int] = {}
+        # Only keys whose creation failed within FAILURE_BACKOFF_SECONDS
+        self._failed_until: Dict[str, datetime] = {}
+        # Creations in progress; concurrent callers for a key share one request
+        self._creating: Dict[str, "asyncio.Future"] = {}
+        self._stats = {"created": 0, "reused": 0, "skipped": 0, "failed": 0, "invalidated": 0}
+
+    @staticmethod
+    def make_key(template_id: str, template_version: int, model_name: str, job_description: str) -> str:
+        return f"{template_id}:v{template_version}|{model_name}|{sha256_text(job_description)}"
+
+    async def get_or_create(
+        self,
+        client: Any,
+        model_name: str,
+        key: str,
+        system_instruction: str,
+        estimated_tokens: int,
+    ) -> Optional[str]:
+        """
+        Return the cached context name for a key, creating it when worthwhile.
+        Returns None when the caller should send the full prompt inline.
+        """
+        if not self.enabled or client is None:
+            return None
+
+        now = datetime.utcnow()
+        entry = self._entries.get(key)
+        if entry and entry["expires_at"] > now:
+            self._stats["reused"] += 1
+            return entry["name"]
+
+        if len(self._uses) > 10000:
+            self._uses.clear()
+        self._uses[key] = self._uses.get(key, 0) + 1
+        if self._uses[key] < self.min_uses or estimated_tokens < self.min_tokens:
+            self._stats["skipped"] += 1
+            return None
+        failed_until = self._failed_until.get(key)
+        if failed_until is not None:
+            if failed_until > now:
+                return None
+            del self._failed_until[key]
+
+        creating = self._creating.get(key)
+        if creating is None:
+            creating = asyncio.ensure_future(self._create(client, model_name, key, system_instruction))
+            self._creating[key] = creating
+            creating.add_done_callback(lambda _: self._creating.pop(key, None))
+        return await asyncio.shield(creating)
+
+    async def _create(self, client: Any, model_name: str, key: str, system_instruction: str) -> Optional[str]:
+        now = datetime.utcnow()
+        try:
+            cached = await client.aio.caches.create(
+                model=model_name,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=system_instruction,
+                    display_name=f"jd-{key.rsplit('|', 1)[-1][:16]}",
+                    ttl=f"{self.ttl_seconds}s",
+                ),
+            )
+        except Exception as e:
+            self._stats["failed"] += 1
+            self._failed_until = {k: until for k, until in self._failed_until.items() if until > now}
+            self._failed_until[key] = now + timedelta(seconds=self.FAILURE_BACKOFF_SECONDS)
+            logger.warning(f"Could not create Gemini context cache, sending JD inline: {e}")
+            return None
+
+        # Contexts past their expiry are gone server-side; drop their entries
+        self._entries = {k: entry for k, entry in self._entries.items() if entry["expires_at"] > now}
+        # Stop using a context a little before the server expires it
+        self._entries[key] = {
+            "name": cached.name,
+            "jd_hash": key.rsplit("|", 1)[-1],
+            "expires_at": datetime.utcnow() + timedelta(seconds=max(self.ttl_seconds - 60, 0)),
+        }
+        self._stats["created"] += 1
+        logger.debug(f"Created Gemini context cache {cached.name} for {key.split('|', 1)[0]}")
+        return cached.name
+
+    def discard(self, name: str):
+        """Forget a context the server rejected (expired or deleted remotely)."""
+        for key, entry in list(self._entries.items()):
+            if entry["name"] == name:
+                del self._entries[key]
+
+    async def invalidate(self, client: Any, job_description: str) -> int:
+        """Delete every cached context built from a job description. Returns the number removed."""
+        jd_hash = sha256_text(job_description)
+        removed = 0
+        for key, entry in list(self._entries.items()):
+            if entry["jd_hash"] != jd_hash:
+                continue
+            del self._entries[key]
+            self._uses.pop(key, None)
+            self._failed_until.pop(key, None)
+            removed += 1
+            if client is None:
+                continue
+            try:
+                await client.aio.caches.delete(name=entry["name"])
+            except Exception as e:
+                logger.warning(f"Could not delete Gemini context cache {entry['name']}: {e}")
+        self._stats["invalidated"] += removed
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "active_contexts": len(self._entries), "enabled": self.enabled}
+
+
+# Shared by every GeminiCVScreener instance in the process
+default_jd_context_cache = JDContextCache()
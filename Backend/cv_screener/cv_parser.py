@@ -5,88 +5,313 @@ CV File Parser
 Utilities for extracting text content from various CV file formats.
 
 Supported Formats:
-- PDF (.pdf)
-- Microsoft Word (.docx, .doc)
+- PDF (.pdf) via a selectable backend (CV_PDF_BACKEND: pypdf2, pypdfium2, pdfminer)
+- Microsoft Word (.docx; legacy .doc is detected and rejected)
 - Plain Text (.txt)
 
-The parser automatically detects the file format and uses the appropriate
-method to extract text content while handling encoding issues gracefully.
+The parser detects the file format from its magic bytes and uses the
+appropriate method to extract text content while handling encoding issues
+gracefully. Paths, raw bytes and binary streams are all accepted, so
+uploads can be parsed in memory.
 
 Author: Interveuu Team
 Version: 1.0.0
 """
 
+import logging
+import io
 import os
-from typing import Optional, Callable
+import zipfile
+from typing import Optional, Callable, Union, BinaryIO, Iterator, Dict, Any
 
+logger = logging.getLogger(__name__)
 
-def parse_pdf(file_path: str) -> str:
+# Bump whenever extraction output changes; cached parse results from older versions are ignored
+PARSER_VERSION = "2"
+
+# Extraction budgets: the screening prompts only use the first few thousand tokens of a CV,
+# so long documents are read page by page and abandoned once either limit is reached (0 = unlimited)
+CV_PARSE_MAX_PAGES = int(os.getenv("CV_PARSE_MAX_PAGES", "20"))
+CV_PARSE_MAX_CHARS = int(os.getenv("CV_PARSE_MAX_CHARS", "40000"))
+
+# PDF text backend (see PDF_BACKENDS); pypdfium2 / pdfminer must be installed separately
+CV_PDF_BACKEND = os.getenv("CV_PDF_BACKEND", "pypdf2").lower()
+
+# Anything the parsers accept: a path, raw bytes, or a binary file-like object
+CVSource = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+# Magic numbers used for format sniffing
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+
+def _describe(source: CVSource, filename: Optional[str] = None) -> str:
+    """Name used in error messages."""
+    if isinstance(source, str):
+        return source
+    return filename or "<uploaded file>"
+
+
+def _as_stream(source: CVSource):
+    """Return something PyPDF2 / python-docx can open: a path or a seekable binary stream."""
+    if isinstance(source, str):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(bytes(source))
+    return source
+
+
+def _read_bytes(source: CVSource) -> bytes:
+    """Read the full content of a non-path source."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    data = source.read()
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+def detect_format(data: bytes) -> Optional[str]:
     """
-    Extract text from a PDF file.
+    Detect a CV's format from its leading bytes.
     
     Args:
-        file_path: Path to the PDF file
+        data: File content (only the first few KB are inspected for most formats)
         
     Returns:
-        Extracted text content
-        
-    Raises:
-        Exception: If PDF parsing fails
+        ".pdf", ".docx", ".doc" or ".txt", or None if the content looks binary
+        and unrecognised
     """
+    head = bytes(data[:1024])
+    
+    # Some generators emit junk before the PDF header; readers accept it within the first 1 KB
+    if PDF_MAGIC in head:
+        return ".pdf"
+    
+    if head.startswith(ZIP_MAGIC):
+        try:
+            with zipfile.ZipFile(io.BytesIO(bytes(data))) as archive:
+                if "word/document.xml" in archive.namelist():
+                    return ".docx"
+        except zipfile.BadZipFile:
+            pass
+        return None
+    
+    if head.startswith(OLE_MAGIC):
+        return ".doc"
+    
+    sample = bytes(data[:4096])
+    if b"\x00" in sample:
+        # UTF-16 text is the only NUL-bearing text we accept
+        if sample.startswith((b"\xff\xfe", b"\xfe\xff")):
+            return ".txt"
+        return None
+    return ".txt"
+
+
+def _pypdf2_pages(file_path: CVSource) -> Iterator[str]:
+    """PyPDF2 backend (pure Python, always available)."""
     try:
         from PyPDF2 import PdfReader
-        
-        reader = PdfReader(file_path)
-        text_parts = []
-        
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
-        
-        return "\n".join(text_parts).strip()
-        
     except ImportError:
         raise Exception("PyPDF2 not installed. Run: pip install PyPDF2")
+    
+    reader = PdfReader(_as_stream(file_path))
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def _pypdfium2_pages(file_path: CVSource) -> Iterator[str]:
+    """pypdfium2 backend (PDFium bindings; typically an order of magnitude faster than PyPDF2)."""
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        raise Exception("pypdfium2 not installed. Run: pip install pypdfium2")
+    
+    source = file_path if isinstance(file_path, str) else _read_bytes(file_path)
+    pdf = pdfium.PdfDocument(source)
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_range() or ""
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+
+def _pdfminer_pages(file_path: CVSource) -> Iterator[str]:
+    """pdfminer.six backend (pure Python, better reading order on multi-column layouts)."""
+    try:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+    except ImportError:
+        raise Exception("pdfminer.six not installed. Run: pip install pdfminer.six")
+    
+    for layout in extract_pages(_as_stream(file_path)):
+        yield "".join(
+            element.get_text() for element in layout if isinstance(element, LTTextContainer)
+        )
+
+
+# Registered PDF text backends: name -> function yielding page texts
+PDF_BACKENDS: Dict[str, Callable[[CVSource], Iterator[str]]] = {
+    "pypdf2": _pypdf2_pages,
+    "pypdfium2": _pypdfium2_pages,
+    "pdfminer": _pdfminer_pages,
+}
+
+
+def register_pdf_backend(name: str, pages_func: Callable[[CVSource], Iterator[str]]):
+    """Register an additional PDF backend selectable through CV_PDF_BACKEND."""
+    PDF_BACKENDS[name.lower()] = pages_func
+
+
+def iter_pdf_pages(file_path: CVSource, backend: Optional[str] = None) -> Iterator[str]:
+    """
+    Yield the text of a PDF one page at a time.
+    
+    Pages are only decoded as they are consumed, so a caller that stops
+    early never pays for the rest of the document.
+    
+    Args:
+        file_path: Path to the PDF file, or its content as bytes / a binary stream
+        backend: Name in PDF_BACKENDS (default CV_PDF_BACKEND)
+        
+    Yields:
+        Text of each page ("" for pages without extractable text)
+        
+    Raises:
+        ValueError: If the backend is unknown
+        Exception: If PDF parsing fails
+    """
+    name = (backend or CV_PDF_BACKEND).lower()
+    pages_func = PDF_BACKENDS.get(name)
+    if pages_func is None:
+        raise ValueError(
+            f"Unknown PDF backend '{name}'. Available backends: {', '.join(PDF_BACKENDS)}"
+        )
+    
+    try:
+        yield from pages_func(file_path)
     except Exception as e:
-        raise Exception(f"Error parsing PDF '{file_path}': {str(e)}")
+        raise Exception(f"Error parsing PDF '{_describe(file_path)}' with {name}: {str(e)}")
 
 
-def parse_docx(file_path: str) -> str:
+def _collect(
+    units: Iterator[str],
+    max_pages: int = 0,
+    max_chars: int = 0,
+    count_pages: bool = True,
+) -> Dict[str, Any]:
     """
-    Extract text from a Microsoft Word document.
+    Join streamed text units (pages or paragraphs) until a budget is reached.
+    
+    Returns:
+        Dictionary with text, pages_read, char_count, truncated and
+        truncated_by ("pages", "chars" or None)
+    """
+    parts = []
+    chars = 0
+    units_read = 0
+    truncated_by = None
+    
+    for unit in units:
+        if count_pages and max_pages and units_read >= max_pages:
+            truncated_by = "pages"
+            break
+        units_read += 1
+        unit = unit.strip()
+        if not unit:
+            continue
+        # Units are joined with a newline, which counts towards the budget
+        separator = 1 if parts else 0
+        if max_chars and chars + separator + len(unit) > max_chars:
+            remaining = max(max_chars - chars - separator, 0)
+            if remaining > 0:
+                # Cut on a word boundary where possible
+                cut = unit.rfind(" ", 0, remaining)
+                parts.append(unit[:cut if cut > remaining // 2 else remaining])
+            truncated_by = "chars"
+            break
+        parts.append(unit)
+        chars += separator + len(unit)
+    
+    text = "\n".join(parts).strip()
+    return {
+        "text": text,
+        "pages_read": units_read if count_pages else None,
+        "char_count": len(text),
+        "truncated": truncated_by is not None,
+        "truncated_by": truncated_by,
+    }
+
+
+def parse_pdf(file_path: CVSource) -> str:
+    """
+    Extract text from a PDF file.
+    
+    Reading stops once CV_PARSE_MAX_PAGES / CV_PARSE_MAX_CHARS is reached.
     
     Args:
-        file_path: Path to the DOCX/DOC file
+        file_path: Path to the PDF file, or its content as bytes / a binary stream
         
     Returns:
         Extracted text content
         
+    Raises:
+        Exception: If PDF parsing fails
+    """
+    return _collect(iter_pdf_pages(file_path), CV_PARSE_MAX_PAGES, CV_PARSE_MAX_CHARS)["text"]
+
+
+def iter_docx_paragraphs(file_path: CVSource) -> Iterator[str]:
+    """
+    Yield the non-empty paragraphs of a Word document.
+    
     Raises:
         Exception: If DOCX parsing fails
     """
     try:
         from docx import Document
-        
-        doc = Document(file_path)
-        paragraphs = [paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip()]
-        
-        return "\n".join(paragraphs).strip()
-        
     except ImportError:
         raise Exception("python-docx not installed. Run: pip install python-docx")
+    
+    try:
+        doc = Document(_as_stream(file_path))
+        for paragraph in doc.paragraphs:
+            if paragraph.text.strip():
+                yield paragraph.text
     except Exception as e:
-        raise Exception(f"Error parsing DOCX '{file_path}': {str(e)}")
+        raise Exception(f"Error parsing DOCX '{_describe(file_path)}': {str(e)}")
+
+
+def parse_docx(file_path: CVSource) -> str:
+    """
+    Extract text from a Microsoft Word document.
+    
+    Args:
+        file_path: Path to the DOCX file, or its content as bytes / a binary stream
+        
+    Returns:
+        Extracted text content
+        
+    Raises:
+        Exception: If DOCX parsing fails
+    """
+    return _collect(iter_docx_paragraphs(file_path), max_chars=CV_PARSE_MAX_CHARS, count_pages=False)["text"]
 
 
-def parse_txt(file_path: str) -> str:
+def parse_txt(file_path: CVSource) -> str:
     """
     Extract text from a plain text file.
     
     Attempts UTF-8 encoding first, falls back to Latin-1 if needed.
     
     Args:
-        file_path: Path to the TXT file
+        file_path: Path to the TXT file, or its content as bytes / a binary stream
         
     Returns:
         File content as string
@@ -94,36 +319,160 @@ def parse_txt(file_path: str) -> str:
     Raises:
         Exception: If file reading fails
     """
+    if isinstance(file_path, str):
+        with open(file_path, "rb") as f:
+            data = f.read()
+    else:
+        data = _read_bytes(file_path)
+    
+    if data.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return data.decode("utf-16").strip()
+    
     encodings = ["utf-8", "latin-1", "cp1252"]
     
     for encoding in encodings:
         try:
-            with open(file_path, "r", encoding=encoding) as f:
-                return f.read().strip()
+            return data.decode(encoding).strip()
         except UnicodeDecodeError:
             continue
     
-    raise Exception(f"Could not decode text file '{file_path}' with common encodings")
+    raise Exception(f"Could not decode text file '{_describe(file_path)}' with common encodings")
+
+
+def parse_doc(file_path: CVSource) -> str:
+    """
+    Legacy Word 97-2003 (.doc, OLE container) documents.
+    
+    python-docx only reads the Office Open XML format, so these are rejected
+    with a clear message instead of failing deep inside the DOCX parser.
+    """
+    raise ValueError(
+        f"Legacy Word .doc files are not supported ('{_describe(file_path)}'). "
+        "Please save the CV as PDF or DOCX and upload it again."
+    )
 
 
 # Supported file formats and their parser functions
 FILE_PARSERS = {
     ".pdf": parse_pdf,
     ".docx": parse_docx,
-    ".doc": parse_docx,
+    ".doc": parse_doc,
     ".txt": parse_txt,
 }
 
 
-def parse_cv_file(file_path: str) -> str:
+# Streaming readers used by parse_cv_document; formats without one are parsed whole
+_UNIT_READERS = {
+    ".pdf": iter_pdf_pages,
+    ".docx": iter_docx_paragraphs,
+}
+
+
+def parser_signature(max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> str:
+    """
+    Identify the parser configuration that produced a text.
+    
+    Used in cache keys so that changing the parser version, the PDF
+    backend or the extraction budgets never serves text produced under
+    other settings.
+    """
+    max_pages = CV_PARSE_MAX_PAGES if max_pages is None else max_pages
+    max_chars = CV_PARSE_MAX_CHARS if max_chars is None else max_chars
+    return f"v{PARSER_VERSION}:{CV_PDF_BACKEND}:p{max_pages}:c{max_chars}"
+
+
+def _resolve(file_path: CVSource, filename: Optional[str] = None):
+    """Return (source, format, extension) for a path or in-memory CV."""
+    if isinstance(file_path, str):
+        # Validate file exists
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"CV file not found: {file_path}")
+        with open(file_path, "rb") as f:
+            header = f.read(4096)
+        source: CVSource = file_path
+        # A ZIP header alone is not enough to tell DOCX apart; let detect_format inspect the archive
+        if header.startswith(ZIP_MAGIC):
+            with open(file_path, "rb") as f:
+                header = f.read()
+        name = file_path
+    else:
+        source = _read_bytes(file_path)
+        header = source
+        name = filename or ""
+    
+    # Get file extension
+    _, ext = os.path.splitext(name)
+    ext = ext.lower()
+    
+    # Content wins over the extension; the extension only helps when sniffing is inconclusive
+    detected = detect_format(header)
+    fmt = detected or ext
+    
+    if fmt not in FILE_PARSERS:
+        supported = ", ".join(FILE_PARSERS.keys())
+        raise ValueError(
+            f"Unsupported file format '{ext or 'unknown'}' for '{_describe(file_path, filename)}'. "
+            f"Supported formats: {supported}"
+        )
+    return source, fmt, ext
+
+
+def parse_cv_document(
+    file_path: CVSource,
+    filename: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Parse a CV within a page/character budget and report what was read.
+    
+    PDFs are read page by page and Word documents paragraph by paragraph;
+    extraction stops as soon as either budget is reached, so a 300-page
+    portfolio costs no more than its first few pages.
+    
+    Args:
+        file_path: Path to the CV file, or its content
+        filename: Original file name for in-memory input
+        max_pages: Page budget for PDFs (default CV_PARSE_MAX_PAGES, 0 = unlimited)
+        max_chars: Character budget (default CV_PARSE_MAX_CHARS, 0 = unlimited)
+        
+    Returns:
+        Dictionary with text, format, pages_read (PDF only), char_count,
+        truncated, truncated_by ("pages", "chars" or None) and parser
+    """
+    max_pages = CV_PARSE_MAX_PAGES if max_pages is None else max_pages
+    max_chars = CV_PARSE_MAX_CHARS if max_chars is None else max_chars
+    
+    source, fmt, _ = _resolve(file_path, filename)
+    reader = _UNIT_READERS.get(fmt)
+    if reader is not None:
+        document = _collect(reader(source), max_pages, max_chars, count_pages=(fmt == ".pdf"))
+    else:
+        document = _collect(iter([FILE_PARSERS[fmt](source)]), max_chars=max_chars, count_pages=False)
+    
+    document["format"] = fmt
+    document["parser"] = parser_signature(max_pages, max_chars)
+    if document["truncated"]:
+        logger.debug(
+            f"Truncated '{_describe(file_path, filename)}' by {document['truncated_by']} budget "
+            f"({document['char_count']} chars kept)"
+        )
+    return document
+
+
+def parse_cv_file(file_path: CVSource, filename: Optional[str] = None) -> str:
     """
     Parse a CV file and extract its text content.
     
-    Automatically detects the file format and uses the appropriate parser.
-    Supports PDF, DOCX, DOC, and TXT formats.
+    The format is detected from the content's magic bytes (PDF, ZIP/DOCX,
+    OLE/DOC, text); the file extension is only used as a fallback. Input
+    may be a path, raw bytes / memoryview, or a binary file-like object,
+    and in-memory input is parsed without touching disk. Output is bounded
+    by CV_PARSE_MAX_PAGES / CV_PARSE_MAX_CHARS (see parse_cv_document).
     
     Args:
-        file_path: Path to the CV file
+        file_path: Path to the CV file, or its content
+        filename: Original file name for in-memory input (error messages and fallback)
         
     Returns:
         Extracted text content from the CV
@@ -135,27 +484,7 @@ def parse_cv_file(file_path: str) -> str:
         
     Example:
         text = parse_cv_file("resume.pdf")
+        text = parse_cv_file(upload_bytes, filename="resume.docx")
         print(f"Extracted {len(text)} characters")
     """
-    # Validate file exists
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"CV file not found: {file_path}")
-    
-    # Get file extension
-    _, ext = os.path.splitext(file_path)
-    ext = ext.lower()
-    
-    # Get appropriate parser
-    parser_func = FILE_PARSERS.get(ext)
-    
-    if parser_func:
-        return parser_func(file_path)
-    
-    # Fallback: try as plain text
-    try:
-        return parse_txt(file_path)
-    except Exception:
-        supported = ", ".join(FILE_PARSERS.keys())
-        raise ValueError(
-            f"Unsupported file format '{ext}'. Supported formats: {supported}"
-        )
+    return parse_cv_document(file_path, filename)["text"]
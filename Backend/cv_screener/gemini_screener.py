@@ -6,8 +6,13 @@ AI-powered CV screening using Google Gemini 1.5 Flash model.
 
 This module provides intelligent CV analysis by comparing candidate resumes
 against job descriptions and generating detailed scoring and recommendations.
+
+All Gemini traffic goes through the SDK's native async interface (``client.aio``)
+on a single process-wide client, so in-flight calls share one pooled HTTP
+transport and do not occupy executor threads.
 """
 
+import logging
 import os
 import json
 import re
@@ -18,9 +23,81 @@ from google import genai
 from google.genai import types
 from dotenv import load_dotenv
 
+from .cache import ScreeningCache, default_screening_cache
+from .context_cache import JDContextCache, default_jd_context_cache
+
+logger = logging.getLogger(__name__)
+
 # Load environment variables
 load_dotenv()
 
+# Per-call deadline (seconds) enforced around every Gemini request
+GEMINI_CALL_TIMEOUT = float(os.getenv("GEMINI_CALL_TIMEOUT", "90"))
+
+# Connection pool limits for the shared async HTTP transport
+GEMINI_MAX_CONNECTIONS = int(os.getenv("GEMINI_MAX_CONNECTIONS", "100"))
+GEMINI_MAX_KEEPALIVE = int(os.getenv("GEMINI_MAX_KEEPALIVE", "20"))
+
+# Packed (multi-CV) weighted screening budgets
+PACK_INPUT_TOKEN_BUDGET = int(os.getenv("GEMINI_PACK_INPUT_TOKEN_BUDGET", "30000"))
+PACK_OUTPUT_TOKENS_PER_CV = int(os.getenv("GEMINI_PACK_OUTPUT_TOKENS_PER_CV", "700"))
+PACK_MAX_CVS = int(os.getenv("GEMINI_PACK_MAX_CVS", "8"))
+
+# Stands in for the CV section of a prompt when the JD part is served from a cached context
+CV_IN_USER_MESSAGE = "[Provided in the user message.]"
+
+# Rough characters-per-token ratio used to size packs without a tokenizer round trip
+CHARS_PER_TOKEN = 4
+
+_shared_clients: Dict[str, genai.Client] = {}
+_shared_screener: Optional["GeminiCVScreener"] = None
+
+
+def _http_options() -> types.HttpOptions:
+    """HTTP options for the shared client: transport timeout plus pooled async connections."""
+    timeout_ms = int(GEMINI_CALL_TIMEOUT * 1000)
+    try:
+        import httpx
+        return types.HttpOptions(
+            timeout=timeout_ms,
+            async_client_args={
+                "limits": httpx.Limits(
+                    max_connections=GEMINI_MAX_CONNECTIONS,
+                    max_keepalive_connections=GEMINI_MAX_KEEPALIVE,
+                )
+            },
+        )
+    except Exception as e:
+        # Older SDKs do not accept async_client_args; fall back to their default pool
+        logger.debug(f"Using default Gemini HTTP pool: {e}")
+        return types.HttpOptions(timeout=timeout_ms)
+
+
+def get_shared_client(api_key: str) -> genai.Client:
+    """Return the process-wide Gemini client for an API key, creating it on first use."""
+    client = _shared_clients.get(api_key)
+    if client is None:
+        client = genai.Client(api_key=api_key, http_options=_http_options())
+        _shared_clients[api_key] = client
+        print("[DEBUG] Gemini Client initialized successfully")
+
+        # Debug: List available models to help resolve 404 errors
+        try:
+            print("[DEBUG] Listing available Gemini models:")
+            for m in client.models.list():
+                print(f"  - {m.name}")
+        except Exception as e:
+            print(f"[DEBUG] Could not list models (this is normal for limited API keys): {e}")
+    return client
+
+
+def get_shared_screener() -> "GeminiCVScreener":
+    """Return the process-wide screener so every caller shares one client, pool and cache."""
+    global _shared_screener
+    if _shared_screener is None:
+        _shared_screener = GeminiCVScreener()
+    return _shared_screener
+
 
 class GeminiCVScreener:
     """
@@ -29,9 +106,28 @@ class GeminiCVScreener:
     
     # Primary model name - using 2.5 flash for stability
     MODEL_NAME = "gemini-2.5-flash"
+
+    # Bump a template's version whenever its prompt text changes so cached results are not reused
+    PROMPT_VERSIONS = {
+        "screening": 1,
+        "candidate_analysis": 1,
+        "master": 1,
+        "master_profile": 1,
+        "weighted": 1,
+        # Packed results share the "weighted" cache key: same rubric and output schema per CV.
+        # Bump both together.
+        "weighted_packed": 1,
+    }
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[ScreeningCache] = None,
+        context_cache: Optional[JDContextCache] = None
+    ):
         """Initialize the CV screener."""
+        self.cache = cache if cache is not None else default_screening_cache
+        self.context_cache = context_cache if context_cache is not None else default_jd_context_cache
         self.api_key = api_key or os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
         
         if not self.api_key:
@@ -39,12 +135,13 @@ class GeminiCVScreener:
             raise ValueError("GEMINI_API_KEY not found.")
         
         try:
-            self.client = genai.Client(api_key=self.api_key)
-            print("[DEBUG] Gemini Client initialized successfully")
+            self.client = get_shared_client(self.api_key)
         except Exception as e:
             print(f"[ERROR] Failed to initialize Gemini Client: {e}")
             self.client = None
         
+        self.call_timeout = GEMINI_CALL_TIMEOUT
+        
         # Configure generation settings
         self.generation_config = types.GenerateContentConfig(
             temperature=0.1,
@@ -52,16 +149,13 @@ class GeminiCVScreener:
             top_k=40,
             max_output_tokens=8192,
         )
-
-        # Debug: List available models to help resolve 404 errors
-        if self.client:
-            try:
-                print("[DEBUG] Listing available Gemini models:")
-                models = self.client.models.list()
-                for m in models:
-                    print(f"  - {m.name}")
-            except Exception as e:
-                print(f"[DEBUG] Could not list models (this is normal for limited API keys): {e}")
+        self.packed_generation_config = types.GenerateContentConfig(
+            temperature=0.1,
+            top_p=0.95,
+            top_k=40,
+            max_output_tokens=8192,
+            response_mime_type="application/json",
+        )
         
         self.screening_prompt = """
 You are an elite HR recruiter and career strategist. Analyze the provided CV against the Job Description.
@@ -167,6 +261,77 @@ Job Description:
 
 Parsed CV Data:
 {cv_content}
+"""
+
+        # Interview path: cv_extractor's profile fields and the master scores in one call on the raw CV text
+        self.master_profile_prompt = """
+You are an AI CV parsing and evaluation engine.
+
+Your task has two parts:
+1. Extract the candidate profile from the CV text.
+2. Evaluate the candidate strictly based on relevance to the provided job description.
+
+Use only the information in the CV.
+Do NOT invent information.
+Do NOT assume missing data.
+If a profile field is not found, use null for strings and an empty array [] for lists.
+
+Return ONLY valid JSON.
+Do NOT include explanation.
+Do NOT include markdown.
+Do NOT include extra text.
+
+Profile fields:
+- candidate_name: Full name of the candidate (string)
+- phone_number: Phone number (string, format as found)
+- email_address: Email address (string)
+- education: Educational qualifications with degree, institution, and year (list of strings)
+- projects: Projects with brief descriptions (list of strings)
+- skills: All technical and professional skills (list of strings)
+- experience: Total years of experience or description of work experience (string)
+- certifications: Professional certifications (list of strings)
+- summary: A brief professional summary, 2-3 sentences (string)
+
+Scoring Scale:
+0 = Not Relevant
+100 = Highly Relevant
+
+Scoring Criteria:
+- technical_score (40%)
+- experience_score (30%)
+- project_score (20%)
+- education_score (10%)
+
+Calculate overall_cv_score as weighted average.
+
+Return format:
+
+{{
+  "profile": {{
+    "candidate_name": string,
+    "phone_number": string,
+    "email_address": string,
+    "education": [string],
+    "projects": [string],
+    "skills": [string],
+    "experience": string,
+    "certifications": [string],
+    "summary": string
+  }},
+  "scores": {{
+    "technical_score": number,
+    "experience_score": number,
+    "project_score": number,
+    "education_score": number,
+    "overall_cv_score": number
+  }}
+}}
+
+Job Description:
+{job_description}
+
+CV Text:
+{cv_content}
 """
 
         self.weighted_screening_prompt = """
@@ -205,6 +370,48 @@ Return ONLY a valid JSON object.
     "recommendation": "Strongly Recommend / Recommend / Consider / Not Recommended",
     "summary": "2-3 sentences executive summary"
 }}
+"""
+
+        # Packed variant of weighted_screening_prompt: one JD copy, many CVs
+        self.packed_weighted_screening_prompt = """
+You are an elite HR recruiter and career strategist. Analyze EACH of the CVs below independently against the same Job Description.
+Score every candidate on each of the following criteria from 0 to 100. Also extract each candidate's name and email address from their CV.
+Do not compare candidates with each other. Return ONLY a valid JSON array.
+
+## JOB DESCRIPTION:
+{job_description}
+
+## CVs (each delimited by <<<CV id>>> and <<<END CV id>>>):
+{cv_blocks}
+
+## SCORING CRITERIA (score each 0-100):
+1. Professional Experience - Relevant work experience, job roles, duration, and career progression
+2. Projects and Achievements - Notable projects, accomplishments, awards, and measurable results
+3. Educational Qualifications - Degrees, academic performance, relevant coursework
+4. Certifications and Licenses - Professional certifications, industry licenses, accreditations
+5. Publications - Research papers, articles, conference presentations, patents
+6. Technical Skills - Programming languages, tools, frameworks, technical competencies relevant to the role
+7. Other Details - Soft skills, languages, volunteer work, extracurricular activities, cultural fit
+
+## OUTPUT FORMAT (Return ONLY a valid JSON array with exactly one object per CV id listed above: {cv_ids}):
+[
+    {{
+        "cv_id": "the id from the CV delimiter",
+        "candidate_name": "Full Name from CV",
+        "email": "email@example.com extracted from CV or empty string if not found",
+        "professional_experience": 0-100,
+        "projects_achievements": 0-100,
+        "educational_qualifications": 0-100,
+        "certifications_licenses": 0-100,
+        "publications": 0-100,
+        "technical_skills": 0-100,
+        "other_details": 0-100,
+        "strengths": ["list of 3-5 specific strengths"],
+        "weaknesses": ["list of 3-5 specific areas for improvement"],
+        "recommendation": "Strongly Recommend / Recommend / Consider / Not Recommended",
+        "summary": "2-3 sentences executive summary"
+    }}
+]
 """
 
     def _process_response(self, response: Any, file_name: str) -> Dict[str, Any]:
@@ -226,40 +433,140 @@ Return ONLY a valid JSON object.
                 else:
                     raise ValueError(f"Could not parse JSON: {result_text[:100]}")
             
-            # Defaults and normalization
-            result["file_name"] = file_name
-            result.setdefault("candidate_name", "Unknown")
-            result.setdefault("overall_score", 0)
-            result.setdefault("skills_match", 0)
-            result.setdefault("experience_match", 0)
-            result.setdefault("education_match", 0)
-            result.setdefault("strengths", [])
-            result.setdefault("weaknesses", [])
-            result.setdefault("recommendation", "Not Evaluated")
-            result.setdefault("summary", "No summary generated")
-            
-            return result
+            return self._normalize_result(result, file_name)
         except Exception as e:
             print(f"[ERROR] Failed to process Gemini response: {e}")
             raise e
 
-    async def _call_gemini(self, prompt: str, file_name: str) -> Dict[str, Any]:
-        """Call Gemini with fallback model support."""
+    def _normalize_result(self, result: Dict[str, Any], file_name: str) -> Dict[str, Any]:
+        """Apply defaults so every screening result has the same shape."""
+        result["file_name"] = file_name
+        result.setdefault("candidate_name", "Unknown")
+        result.setdefault("overall_score", 0)
+        result.setdefault("skills_match", 0)
+        result.setdefault("experience_match", 0)
+        result.setdefault("education_match", 0)
+        result.setdefault("strengths", [])
+        result.setdefault("weaknesses", [])
+        result.setdefault("recommendation", "Not Evaluated")
+        result.setdefault("summary", "No summary generated")
+        return result
+
+    def _process_packed_response(self, response: Any) -> List[Dict[str, Any]]:
+        """Parse a packed response into its list of per-CV result objects."""
+        result_text = (response.text or "").strip()
+        if result_text.startswith("```"):
+            result_text = re.sub(r'^```(?:json)?\s*\n?', '', result_text)
+            result_text = re.sub(r'\n?```\s*$', '', result_text)
+
+        try:
+            parsed = json.loads(result_text)
+        except json.JSONDecodeError:
+            json_match = re.search(r'\[[\s\S]*\]', result_text)
+            if not json_match:
+                raise ValueError(f"Could not parse JSON array: {result_text[:100]}")
+            parsed = json.loads(json_match.group())
+
+        if isinstance(parsed, dict):
+            parsed = parsed.get("results", parsed.get("candidates", []))
+        if not isinstance(parsed, list):
+            raise ValueError("Packed response is not a JSON array")
+        return [item for item in parsed if isinstance(item, dict)]
+
+    async def _generate(self, model: str, contents: Any, config: Optional[types.GenerateContentConfig] = None) -> Any:
+        """Issue one async Gemini request bounded by the per-call timeout."""
+        return await asyncio.wait_for(
+            self.client.aio.models.generate_content(
+                model=model,
+                contents=contents,
+                config=config
+            ),
+            timeout=self.call_timeout
+        )
+
+    async def generate_text(self, prompt: str) -> str:
+        """Run a free-form prompt and return the stripped response text."""
+        if not self.client:
+            raise RuntimeError("Gemini Client not initialized. Check API Key.")
+        response = await self._generate(self.MODEL_NAME, prompt)
+        return (response.text or "").strip()
+
+    async def _jd_context(
+        self,
+        template_id: str,
+        prompt_template: str,
+        job_description: str,
+        cv_fields: Dict[str, str]
+    ) -> Optional[str]:
+        """
+        Return a cached context holding the instructions and JD for a template, or None.
+        cv_fields maps the template's CV placeholders to the text shown in the cached part.
+        """
+        system_instruction = prompt_template.format(job_description=job_description, **cv_fields)
+        key = JDContextCache.make_key(
+            template_id, self.PROMPT_VERSIONS[template_id], self.MODEL_NAME, job_description
+        )
+        return await self.context_cache.get_or_create(
+            self.client, self.MODEL_NAME, key, system_instruction, self._estimate_tokens(system_instruction)
+        )
+
+    @staticmethod
+    def _section_heading(prompt_template: str, placeholder: str) -> str:
+        """
+        The line a template puts directly above a CV placeholder, e.g. "## CV CONTENT:".
+        The cached-context message reuses it so both paths word the CV section identically.
+        """
+        match = re.search(r"([^\n]*)\n\{" + placeholder + r"\}", prompt_template)
+        return match.group(1).strip() if match else ""
+
+    async def invalidate_jd_context(self, job_description: str) -> int:
+        """Drop cached contexts for a JD, e.g. after the job posting is edited."""
+        return await self.context_cache.invalidate(self.client, job_description)
+
+    async def _generate_with_context(
+        self,
+        context_name: str,
+        message: str,
+        config: types.GenerateContentConfig
+    ) -> Optional[Any]:
+        """Call Gemini against a cached context; returns None (and forgets the context) on failure."""
+        try:
+            return await self._generate(
+                self.MODEL_NAME,
+                message,
+                config.model_copy(update={"cached_content": context_name})
+            )
+        except asyncio.TimeoutError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cached context {context_name} unusable, sending full prompt: {e}")
+            self.context_cache.discard(context_name)
+            return None
+
+    async def _call_gemini(
+        self,
+        prompt: str,
+        file_name: str,
+        context_name: Optional[str] = None,
+        context_message: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Call Gemini with fallback model support.
+        When context_name is given, context_message is sent against that cached context
+        first; the full prompt is only used if the cached path fails.
+        """
         if not self.client:
             return self._error_response(file_name, "Gemini Client not initialized. Check API Key.")
 
-        loop = asyncio.get_event_loop()
         try:
+            if context_name and context_message:
+                response = await self._generate_with_context(context_name, context_message, self.generation_config)
+                if response is not None:
+                    return self._process_response(response, file_name)
+
             try:
                 print(f"[DEBUG] Attempting analysis with {self.MODEL_NAME}...")
-                response = await loop.run_in_executor(
-                    None,
-                    lambda: self.client.models.generate_content(
-                        model=self.MODEL_NAME,
-                        contents=prompt,
-                        config=self.generation_config
-                    )
-                )
+                response = await self._generate(self.MODEL_NAME, prompt, self.generation_config)
                 return self._process_response(response, file_name)
             except Exception as e:
                 error_str = str(e)
@@ -269,18 +576,14 @@ Return ONLY a valid JSON object.
                         if fallback == self.MODEL_NAME: continue
                         try:
                             print(f"[DEBUG] Trying fallback: {fallback}")
-                            response = await loop.run_in_executor(
-                                None,
-                                lambda: self.client.models.generate_content(
-                                    model=fallback,
-                                    contents=prompt,
-                                    config=self.generation_config
-                                )
-                            )
+                            response = await self._generate(fallback, prompt, self.generation_config)
                             return self._process_response(response, file_name)
-                        except:
+                        except Exception:
                             continue
                 raise e
+        except asyncio.TimeoutError:
+            logger.error(f"Gemini call timed out after {self.call_timeout}s for {file_name}")
+            return self._error_response(file_name, f"AI Analysis timed out after {self.call_timeout:.0f} seconds.")
         except Exception as e:
             error_msg = str(e)
             print(f"[ERROR] Gemini call failed: {error_msg}")
@@ -288,55 +591,304 @@ Return ONLY a valid JSON object.
                 return self._error_response(file_name, "Network Error: Cannot reach AI servers. Please check your internet/DNS settings.")
             return self._error_response(file_name, f"AI Analysis failed: {error_msg}")
 
-    async def screen_cv(self, job_description: str, cv_content: str, file_name: str) -> Dict[str, Any]:
-        """Screen a CV using Gemini (original generic prompt)."""
-        prompt = self.screening_prompt.format(
+    async def _screen_cached(
+        self,
+        template_id: str,
+        prompt_template: str,
+        job_description: str,
+        cv_content: str,
+        file_name: str,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Run a screening prompt through the result cache.
+        Error responses are never cached; pass use_cache=False to force a fresh call.
+        """
+        key = ScreeningCache.make_key(
+            template_id, self.PROMPT_VERSIONS[template_id], self.MODEL_NAME, job_description, cv_content
+        )
+        if use_cache:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                logger.debug(f"Screening cache hit ({template_id}) for {file_name}")
+                cached["file_name"] = file_name
+                return cached
+
+        prompt = prompt_template.format(
             job_description=job_description,
             cv_content=cv_content
         )
-        return await self._call_gemini(prompt, file_name)
+        context_name = await self._jd_context(
+            template_id, prompt_template, job_description, {"cv_content": CV_IN_USER_MESSAGE}
+        )
+        result = await self._call_gemini(
+            prompt,
+            file_name,
+            context_name=context_name,
+            context_message=f"{self._section_heading(prompt_template, 'cv_content')}\n{cv_content}".lstrip()
+        )
 
-    async def screen_cv_candidate(self, job_description: str, cv_content: str, file_name: str) -> Dict[str, Any]:
+        if result.get("candidate_name") != "Error During Analysis":
+            await self.cache.set(key, result, metadata={"template_id": template_id, "model_name": self.MODEL_NAME})
+        return result
+
+    async def screen_cv(self, job_description: str, cv_content: str, file_name: str, use_cache: bool = True) -> Dict[str, Any]:
+        """Screen a CV using Gemini (original generic prompt)."""
+        return await self._screen_cached(
+            "screening", self.screening_prompt, job_description, cv_content, file_name, use_cache
+        )
+
+    async def screen_cv_candidate(self, job_description: str, cv_content: str, file_name: str, use_cache: bool = True) -> Dict[str, Any]:
         """Screen a CV using the detailed candidate analysis prompt (JD is mandatory)."""
-        prompt = self.candidate_analysis_prompt.format(
-            job_description=job_description,
-            cv_content=cv_content
+        return await self._screen_cached(
+            "candidate_analysis", self.candidate_analysis_prompt, job_description, cv_content, file_name, use_cache
         )
-        return await self._call_gemini(prompt, file_name)
 
-    async def screen_cv_master(self, job_description: str, cv_content: str, file_name: str) -> Dict[str, Any]:
+    async def screen_cv_master(self, job_description: str, cv_content: str, file_name: str, use_cache: bool = True) -> Dict[str, Any]:
         """Screen a CV using the master screening prompt (Anti-Gravity)."""
-        prompt = self.master_screening_prompt.format(
-            job_description=job_description,
-            cv_content=cv_content
+        result = await self._screen_cached(
+            "master", self.master_screening_prompt, job_description, cv_content, file_name, use_cache
         )
-        result = await self._call_gemini(prompt, file_name)
-        
-        # Ensure the expected keys exist even if the model fails
+        return self.master_scores(result)
+
+    async def screen_cv_master_profile(self, job_description: str, cv_content: str, file_name: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Extract the structured CV profile and score it with the master rubric in a single call.
+
+        Args:
+            job_description: Job description text
+            cv_content: Raw CV text
+            file_name: Name used in logs and the result
+
+        Returns:
+            {"profile": {...}, "scores": {...}} where profile has the fields of
+            cv_extractor.extract_cv_information and scores those of screen_cv_master.
+            On failure "error" is set, the profile is empty and every score is 0;
+            this method does not raise.
+        """
+        try:
+            result = await self._screen_cached(
+                "master_profile", self.master_profile_prompt, job_description, cv_content, file_name, use_cache
+            )
+        except Exception as e:
+            logger.error(f"CV profile screening failed for {file_name}: {e}")
+            result = self._error_response(file_name, f"AI Analysis failed: {e}")
+
+        profile = result.get("profile")
+        if not isinstance(profile, dict):
+            profile = {}
+        combined = {
+            "profile": {
+                "candidate_name": profile.get("candidate_name"),
+                "phone_number": profile.get("phone_number"),
+                "email_address": profile.get("email_address"),
+                "education": profile.get("education") or [],
+                "projects": profile.get("projects") or [],
+                "skills": profile.get("skills") or [],
+                "experience": profile.get("experience"),
+                "certifications": profile.get("certifications") or [],
+                "summary": profile.get("summary")
+            },
+            "scores": self.master_scores(result.get("scores") if isinstance(result.get("scores"), dict) else {})
+        }
+        if result.get("candidate_name") == "Error During Analysis":
+            combined["error"] = result.get("summary")
+        return combined
+
+    @staticmethod
+    def master_scores(result: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Master score fields of a model result; missing or non-numeric scores are 0.
+        master_scores({}) is the all-zero shape used when a CV could not be scored.
+        """
         return {
-            "technical_score": float(result.get("technical_score", 0)),
-            "experience_score": float(result.get("experience_score", 0)),
-            "project_score": float(result.get("project_score", 0)),
-            "education_score": float(result.get("education_score", 0)),
-            "overall_cv_score": float(result.get("overall_cv_score", 0))
+            key: GeminiCVScreener._score(result.get(key, 0))
+            for key in ("technical_score", "experience_score", "project_score", "education_score", "overall_cv_score")
         }
 
-    async def screen_cv_weighted(self, job_description: str, cv_content: str, file_name: str, weightages: Dict[str, float]) -> Dict[str, Any]:
+    @staticmethod
+    def _score(value: Any) -> float:
+        """A numeric score, or 0.0 when the model returned null or text."""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return 0.0
+
+    async def screen_cv_weighted(self, job_description: str, cv_content: str, file_name: str, weightages: Dict[str, float], use_cache: bool = True) -> Dict[str, Any]:
         """
         Screen a CV using the weighted criteria prompt.
         Computes a weighted final score based on recruiter-defined percentages.
+        Sub-scores are cached independently of the weightages, so re-weighting is free.
         """
-        prompt = self.weighted_screening_prompt.format(
-            job_description=job_description,
-            cv_content=cv_content
+        result = await self._screen_cached(
+            "weighted", self.weighted_screening_prompt, job_description, cv_content, file_name, use_cache
         )
-        result = await self._call_gemini(prompt, file_name)
 
         # If error response, return as-is
         if result.get("candidate_name") == "Error During Analysis":
             return result
 
-        # Compute weighted score from sub-scores
+        return self._apply_weightages(result, weightages)
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Cheap token estimate used for pack sizing."""
+        return len(text or "") // CHARS_PER_TOKEN + 1
+
+    def _plan_packs(self, job_description: str, cvs: List[Dict[str, str]]) -> List[List[Dict[str, str]]]:
+        """
+        Greedily group CVs into packs that fit the input token budget
+        (one JD copy per pack) and the model's output token limit.
+        """
+        max_by_output = max(1, self.packed_generation_config.max_output_tokens // PACK_OUTPUT_TOKENS_PER_CV)
+        max_per_pack = max(1, min(PACK_MAX_CVS, max_by_output))
+        overhead = self._estimate_tokens(self.packed_weighted_screening_prompt) + self._estimate_tokens(job_description)
+        budget = max(PACK_INPUT_TOKEN_BUDGET - overhead, 0)
+
+        packs: List[List[Dict[str, str]]] = []
+        current: List[Dict[str, str]] = []
+        used = 0
+        for cv in cvs:
+            cost = self._estimate_tokens(cv["cv_content"])
+            if current and (used + cost > budget or len(current) >= max_per_pack):
+                packs.append(current)
+                current, used = [], 0
+            current.append(cv)
+            used += cost
+        if current:
+            packs.append(current)
+        return packs
+
+    async def _screen_pack(self, job_description: str, pack: List[Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Screen one pack in a single request. Returns raw (unweighted) results keyed by cv_id;
+        CVs missing from a malformed or partial response are simply absent.
+        """
+        cv_blocks = "\n\n".join(
+            f"<<<CV {cv['cv_id']}>>>\n{cv['cv_content']}\n<<<END CV {cv['cv_id']}>>>" for cv in pack
+        )
+        prompt = self.packed_weighted_screening_prompt.format(
+            job_description=job_description,
+            cv_blocks=cv_blocks,
+            cv_ids=", ".join(cv["cv_id"] for cv in pack)
+        )
+        by_id = {cv["cv_id"]: cv for cv in pack}
+
+        try:
+            logger.debug(f"Screening pack of {len(pack)} CVs with {self.MODEL_NAME}...")
+            response = None
+            context_name = await self._jd_context(
+                "weighted_packed",
+                self.packed_weighted_screening_prompt,
+                job_description,
+                {"cv_blocks": CV_IN_USER_MESSAGE, "cv_ids": "every CV id in the user message"}
+            )
+            if context_name:
+                response = await self._generate_with_context(
+                    context_name,
+                    f"{self._section_heading(self.packed_weighted_screening_prompt, 'cv_blocks')}\n{cv_blocks}\n\n"
+                    f"CV ids: {', '.join(by_id)}",
+                    self.packed_generation_config
+                )
+            if response is None:
+                response = await self._generate(self.MODEL_NAME, prompt, self.packed_generation_config)
+            items = self._process_packed_response(response)
+        except Exception as e:
+            logger.warning(f"Packed screening failed for {len(pack)} CVs, falling back to single calls: {e}")
+            return {}
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for item in items:
+            cv_id = str(item.pop("cv_id", ""))
+            if cv_id in by_id and cv_id not in results:
+                results[cv_id] = self._normalize_result(item, by_id[cv_id]["file_name"])
+        return results
+
+    async def screen_cvs_weighted_packed(
+        self,
+        job_description: str,
+        cvs: List[Dict[str, str]],
+        weightages: Dict[str, float],
+        use_cache: bool = True,
+        max_concurrency: int = 4
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Screen many CVs against one JD, packing several CVs per request.
+
+        Args:
+            job_description: The job description text (sent once per pack)
+            cvs: List of {"cv_id", "cv_content", "file_name"} dicts; cv_id must be unique
+            weightages: Recruiter-defined criteria percentages
+            use_cache: Consult and populate the screening result cache
+            max_concurrency: Maximum number of packs in flight
+
+        Returns:
+            Weighted screening results keyed by cv_id, one per input CV.
+            CVs a pack fails to return are re-screened with single-CV calls; a CV
+            that still fails gets an error response without affecting the others.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        keys = {
+            cv["cv_id"]: ScreeningCache.make_key(
+                "weighted", self.PROMPT_VERSIONS["weighted"], self.MODEL_NAME, job_description, cv["cv_content"]
+            )
+            for cv in cvs
+        }
+
+        pending = []
+        for cv in cvs:
+            try:
+                cached = await self.cache.get(keys[cv["cv_id"]]) if use_cache else None
+                if cached is not None:
+                    cached["file_name"] = cv["file_name"]
+                    results[cv["cv_id"]] = self._apply_weightages(cached, weightages)
+                    continue
+            except Exception as e:
+                logger.warning(f"Cached screening result unusable for {cv['file_name']}: {e}")
+            pending.append(cv)
+
+        if not self.client and pending:
+            for cv in pending:
+                results[cv["cv_id"]] = self._error_response(cv["file_name"], "Gemini Client not initialized. Check API Key.")
+            return results
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def finish_cv(cv: Dict[str, str], raw: Optional[Dict[str, Any]]):
+            """Weight (or re-screen) one CV; a failure only affects that CV."""
+            try:
+                if raw is None:
+                    # Fall back to a single-CV call for anything the pack did not return
+                    results[cv["cv_id"]] = await self.screen_cv_weighted(
+                        job_description, cv["cv_content"], cv["file_name"], weightages, use_cache=False
+                    )
+                    return
+                try:
+                    await self.cache.set(keys[cv["cv_id"]], raw, metadata={"template_id": "weighted", "model_name": self.MODEL_NAME})
+                except Exception as e:
+                    logger.warning(f"Could not cache screening result for {cv['file_name']}: {e}")
+                results[cv["cv_id"]] = self._apply_weightages(raw, weightages)
+            except Exception as e:
+                logger.error(f"Screening failed for {cv['file_name']}: {e}")
+                results[cv["cv_id"]] = self._error_response(cv["file_name"], f"AI Analysis failed: {e}")
+
+        async def run_pack(pack: List[Dict[str, str]]):
+            async with semaphore:
+                packed = await self._screen_pack(job_description, pack) if len(pack) > 1 else {}
+                for cv in pack:
+                    await finish_cv(cv, packed.get(cv["cv_id"]))
+
+        packs = self._plan_packs(job_description, pending)
+        if packs:
+            logger.info(f"Packed screening: {len(pending)} CVs in {len(packs)} request(s), {len(cvs) - len(pending)} cached")
+        await asyncio.gather(*(run_pack(pack) for pack in packs), return_exceptions=True)
+        for cv in cvs:
+            if cv["cv_id"] not in results:
+                results[cv["cv_id"]] = self._error_response(cv["file_name"], "AI Analysis failed: no result returned")
+        return results
+
+    def _apply_weightages(self, result: Dict[str, Any], weightages: Dict[str, float]) -> Dict[str, Any]:
+        """Compute the weighted overall score from the criteria sub-scores."""
         criteria_keys = [
             "professional_experience", "projects_achievements",
             "educational_qualifications", "certifications_licenses",
@@ -344,9 +896,10 @@ Return ONLY a valid JSON object.
         ]
         weighted_score = 0.0
         for key in criteria_keys:
-            sub_score = float(result.get(key, 0))
-            weight = float(weightages.get(key, 0))
-            weighted_score += sub_score * (weight / 100.0)
+            # Models sometimes answer null or "N/A" for a criterion; count it as 0
+            result[key] = self._score(result.get(key, 0))
+            weight = self._score(weightages.get(key, 0))
+            weighted_score += result[key] * (weight / 100.0)
 
         result["overall_score"] = round(weighted_score, 2)
         result["weightages_applied"] = weightages
@@ -376,17 +929,10 @@ Return ONLY a valid JSON object.
         prompt = f"Compare these candidates for the role: {job_description[:500]}\nCandidates: {json.dumps(ranked[:5])}"
         
         try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.client.models.generate_content(
-                    model=self.MODEL_NAME,
-                    contents=prompt
-                )
-            )
+            comparison_summary = await self.generate_text(prompt)
             return {
                 "ranked_candidates": ranked,
-                "comparison_summary": response.text.strip(),
+                "comparison_summary": comparison_summary,
                 "top_recommendation": ranked[0]
             }
         except Exception as e:
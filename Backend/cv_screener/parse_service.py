@@ -0,0 +1,330 @@
+"""
+CV Parsing Service
+==================
+
+Runs the CPU-bound CV parsers (PyPDF2 / python-docx) in a process pool so
+that a large document never stalls the event loop serving WebSocket
+interviews. Results are cached by content hash (see ``cache.ParseCache``),
+so a resume uploaded to many jobs is only parsed once.
+
+Usage Example:
+    from cv_screener.parse_service import parse_cv_bytes, parse_many
+
+    text = await parse_cv_bytes(data, "resume.pdf")
+    doc = await parse_cv_document_bytes(data, "resume.pdf")  # text + truncation metadata
+    texts = await parse_many([(data1, "a.pdf"), (data2, "b.docx")])
+
+Configuration (environment):
+- CV_PARSE_WORKERS: Pool size (0 parses in a thread instead of a process pool)
+- CV_PARSE_TIMEOUT: Per-document parse time limit in seconds (time queued for a worker is not counted)
+- CV_PARSE_MAX_BYTES: Largest accepted upload
+- CV_PARSE_MEMORY_MB: Address space a worker may grow by while parsing (POSIX only)
+"""
+
+import logging
+import asyncio
+import multiprocessing
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .cache import ParseCache, default_parse_cache, sha256_bytes
+from .cv_parser import parse_cv_document, parser_signature
+
+logger = logging.getLogger(__name__)
+
+CV_PARSE_WORKERS = int(os.getenv("CV_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+CV_PARSE_TIMEOUT = float(os.getenv("CV_PARSE_TIMEOUT", "30"))
+CV_PARSE_MAX_BYTES = int(os.getenv("CV_PARSE_MAX_BYTES", str(20 * 1024 * 1024)))
+CV_PARSE_MEMORY_MB = int(os.getenv("CV_PARSE_MEMORY_MB", "1024"))
+
+# Extra time the parent waits past CV_PARSE_TIMEOUT before killing a worker stuck in native code
+KILL_GRACE_SECONDS = 5
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+# One submission per worker, so a document's timeout never includes time spent queued
+_slots: Optional[asyncio.Semaphore] = None
+
+# Worker processes started by the pool (terminated when a parse overruns its hard deadline)
+_workers: "weakref.WeakSet" = weakref.WeakSet()
+
+# Parses currently running, by cache key, so concurrent uploads of one file share a single parse
+_inflight: Dict[str, "asyncio.Future"] = {}
+
+
+class CVParseTimeout(Exception):
+    """Raised when a document takes longer than CV_PARSE_TIMEOUT to parse."""
+
+
+class _ParseDeadline(BaseException):
+    """Raised inside a worker by its own timer; a BaseException so parser error wrapping cannot swallow it."""
+
+
+_base_context = multiprocessing.get_context()
+
+
+class _WorkerProcess(_base_context.Process):
+    """Pool worker that registers itself so a stuck one can be terminated."""
+
+    def start(self):
+        super().start()
+        _workers.add(self)
+
+
+class _WorkerContext(type(_base_context)):
+    Process = _WorkerProcess
+
+
+def _current_address_space() -> int:
+    """Virtual memory size of this process in bytes (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _init_worker(memory_mb: int):
+    """
+    Cap the worker's address space so a pathological document cannot exhaust the host.
+
+    Workers are forked from the loaded API process and inherit its mappings, so
+    the cap is memory_mb above the size the worker starts at, not an absolute value.
+    """
+    if memory_mb <= 0:
+        return
+    try:
+        import resource
+        limit = _current_address_space() + memory_mb * 1024 * 1024
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        # Not available on Windows or inside some sandboxes
+        pass
+
+
+def _on_deadline(signum, frame):
+    raise _ParseDeadline()
+
+
+def _parse_in_worker(data: bytes, filename: str, timeout: float = 0) -> Dict[str, Any]:
+    """
+    Worker entry point: parse raw document bytes in memory in the pool process.
+
+    With a timeout, the worker interrupts its own parse (POSIX interval timer),
+    so an overrunning document fails alone without recycling the pool.
+    """
+    timer = None
+    if timeout > 0:
+        try:
+            import signal
+            signal.signal(signal.SIGALRM, _on_deadline)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+            timer = signal
+        except (ImportError, AttributeError, ValueError):
+            # No SIGALRM on Windows, or not in the main thread (thread fallback)
+            timer = None
+    try:
+        return parse_cv_document(data, filename=filename)
+    except _ParseDeadline:
+        raise CVParseTimeout(f"Parsing '{filename}' exceeded {timeout:.0f}s")
+    finally:
+        if timer is not None:
+            timer.setitimer(timer.ITIMER_REAL, 0)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=CV_PARSE_WORKERS,
+            mp_context=_WorkerContext(),
+            initializer=_init_worker,
+            initargs=(CV_PARSE_MEMORY_MB,),
+        )
+    return _pool
+
+
+def _reset_pool(kill: bool = False):
+    """Discard the current pool; with kill=True its workers are terminated (used after a timeout)."""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is None:
+        return
+    if kill:
+        # ProcessPoolExecutor cannot cancel running work, so stop the stuck worker directly
+        for process in list(_workers):
+            try:
+                if process.is_alive():
+                    process.terminate()
+            except Exception:
+                pass
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def parse_cv_bytes(
+    data: Union[bytes, bytearray, memoryview],
+    filename: str,
+    cache: Optional[ParseCache] = None,
+) -> str:
+    """
+    Extract text from an uploaded CV without blocking the event loop.
+
+    Text is bounded by CV_PARSE_MAX_PAGES / CV_PARSE_MAX_CHARS; use
+    parse_cv_document_bytes to find out whether it was truncated.
+
+    Args:
+        data: Raw file content
+        filename: Original file name (format is sniffed from the content; the
+            extension is only a fallback)
+        cache: Parse cache to consult (defaults to the shared one)
+
+    Returns:
+        Extracted text content
+
+    Raises:
+        ValueError: If the document exceeds CV_PARSE_MAX_BYTES
+        CVParseTimeout: If parsing exceeds CV_PARSE_TIMEOUT
+        Exception: If parsing fails
+    """
+    document = await parse_cv_document_bytes(data, filename, cache)
+    return document["text"]
+
+
+async def parse_cv_document_bytes(
+    data: Union[bytes, bytearray, memoryview],
+    filename: str,
+    cache: Optional[ParseCache] = None,
+) -> Dict[str, Any]:
+    """
+    Parse an uploaded CV off the event loop and return text plus metadata.
+
+    Args:
+        data: Raw file content
+        filename: Original file name (format is sniffed from the content; the
+            extension is only a fallback)
+        cache: Parse cache to consult (defaults to the shared one)
+
+    Returns:
+        Dictionary from cv_parser.parse_cv_document (text, format,
+        pages_read, char_count, truncated, truncated_by, parser)
+
+    Raises:
+        ValueError: If the document exceeds CV_PARSE_MAX_BYTES
+        CVParseTimeout: If parsing exceeds CV_PARSE_TIMEOUT
+        Exception: If parsing fails
+    """
+    data = bytes(data)
+    if len(data) > CV_PARSE_MAX_BYTES:
+        raise ValueError(
+            f"CV file '{filename}' is too large ({len(data)} bytes, limit {CV_PARSE_MAX_BYTES})"
+        )
+
+    cache = cache if cache is not None else default_parse_cache
+    content_hash = sha256_bytes(data)
+    signature = parser_signature()
+    key = cache.make_key(content_hash, signature)
+
+    cached = await cache.get(key)
+    if cached is not None:
+        return cached
+
+    pending = _inflight.get(key)
+    if pending is not None:
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise
+            # The request that started the parse went away; parse for ourselves
+            return await parse_cv_document_bytes(data, filename, cache)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        document = await _parse_uncached(data, filename)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark retrieved so a failure nobody else awaited is not reported as unhandled
+        future.exception()
+        raise
+    else:
+        future.set_result(document)
+    finally:
+        _inflight.pop(key, None)
+
+    # Failed parses are never cached, so a fixed parser gets another chance
+    await cache.set(
+        key,
+        document,
+        metadata={"parser": signature, "content_hash": content_hash, "size": len(data)},
+    )
+    return document
+
+
+async def _parse_uncached(data: bytes, filename: str) -> Dict[str, Any]:
+    """Run the parser in the pool (or a thread when CV_PARSE_WORKERS=0)."""
+    if CV_PARSE_WORKERS <= 0:
+        try:
+            return await asyncio.wait_for(
+                asyncio.to_thread(_parse_in_worker, data, filename), timeout=CV_PARSE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            raise CVParseTimeout(f"Parsing '{filename}' exceeded {CV_PARSE_TIMEOUT:.0f}s")
+
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(CV_PARSE_WORKERS)
+
+    for attempt in range(2):
+        async with _slots:
+            pool = _get_pool()
+            try:
+                # The worker stops itself at CV_PARSE_TIMEOUT; the pool is only recycled if it cannot
+                future = pool.submit(_parse_in_worker, data, filename, CV_PARSE_TIMEOUT)
+                return await asyncio.wait_for(
+                    asyncio.wrap_future(future), timeout=CV_PARSE_TIMEOUT + KILL_GRACE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Parsing '{filename}' did not stop after {CV_PARSE_TIMEOUT}s, recycling parse pool")
+                if _pool is pool:
+                    _reset_pool(kill=True)
+                raise CVParseTimeout(f"Parsing '{filename}' exceeded {CV_PARSE_TIMEOUT:.0f}s")
+            except BrokenProcessPool:
+                # A worker died (memory cap, or the pool was recycled under us); retry once on a fresh pool
+                if _pool is pool:
+                    _reset_pool()
+                if attempt == 1:
+                    raise Exception(f"Error parsing '{filename}': parser process crashed")
+    raise Exception(f"Error parsing '{filename}'")
+
+
+async def parse_many(
+    documents: Sequence[Tuple[Union[bytes, bytearray, memoryview], str]],
+    with_metadata: bool = False,
+) -> List[Union[str, Dict[str, Any], BaseException]]:
+    """
+    Parse many documents in parallel across the pool's cores.
+
+    Returns one entry per input, in order: the extracted text (or, with
+    with_metadata=True, the parse_cv_document_bytes dictionary), or the
+    exception raised for that document.
+    """
+    parse = parse_cv_document_bytes if with_metadata else parse_cv_bytes
+    return await asyncio.gather(
+        *(parse(data, filename) for data, filename in documents),
+        return_exceptions=True,
+    )
+
+
+def shutdown_parse_pool():
+    """Stop the worker processes (called on application shutdown)."""
+    _reset_pool()
@@ -211,6 +211,19 @@ class DatabaseManager:
                 "deadline", background=True
             )
 
+            # Interview transcript messages and answer evaluations, read per session and kind in seq order
+            await self.db.interview_turns.create_index(
+                [("session_id", 1), ("kind", 1), ("seq", 1)], background=True
+            )
+
+            # Screening result cache — entries expire at their own expires_at
+            await self.db.screening_cache.create_index(
+                "expires_at", expireAfterSeconds=0, background=True
+            )
+            await self.db.parsed_cv_cache.create_index(
+                "expires_at", expireAfterSeconds=0, background=True
+            )
+
             print("- Database indexes created successfully")
         except Exception as e:
             print(f"Warning: Could not create some indexes: {e}")
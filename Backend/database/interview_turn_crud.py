@@ -0,0 +1,64 @@
+"""
+Interview Turn CRUD Operations
+
+Transcript messages and answer evaluations live in the append-only
+``interview_turns`` collection (one document per item, indexed by
+session_id + seq) instead of arrays on the interview_sessions document.
+
+Document ids are deterministic (``{session_id}:{kind}:{seq}``), so a bulk
+insert retried after a partial failure never duplicates a turn.
+"""
+
+from typing import Any, Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
+
+TURN_MESSAGE = "message"
+TURN_EVALUATION = "evaluation"
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+async def insert_turns(db: AsyncIOMotorDatabase, session_id: str, kind: str, items: List[Dict[str, Any]]) -> int:
+    """
+    Append turns of one kind with a single bulk insert. Every item must carry its seq.
+
+    Returns:
+        Number of newly inserted turns (already stored ones are skipped)
+    """
+    if not items:
+        return 0
+    docs = [
+        {"_id": f"{session_id}:{kind}:{item['seq']}", "session_id": session_id, "kind": kind, **item}
+        for item in items
+    ]
+    try:
+        result = await db.interview_turns.insert_many(docs, ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY_ERROR for error in errors):
+            raise
+        return e.details.get("nInserted", 0)
+
+
+async def get_recent_messages(db: AsyncIOMotorDatabase, session_id: str, limit: int) -> List[Dict[str, Any]]:
+    """Last ``limit`` transcript messages of a session, oldest first."""
+    cursor = db.interview_turns.find(
+        {"session_id": session_id, "kind": TURN_MESSAGE},
+        {"_id": 0, "session_id": 0, "kind": 0},
+    ).sort("seq", -1).limit(limit)
+    messages = await cursor.to_list(length=limit)
+    messages.reverse()
+    return messages
+
+
+async def get_evaluations(db: AsyncIOMotorDatabase, session_id: str) -> List[Dict[str, Any]]:
+    """Every stored answer evaluation of a session, in answer order."""
+    cursor = db.interview_turns.find(
+        {"session_id": session_id, "kind": TURN_EVALUATION},
+        {"_id": 0, "session_id": 0, "kind": 0},
+    ).sort("seq", 1)
+    return await cursor.to_list(length=None)
+
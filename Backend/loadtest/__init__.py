@@ -0,0 +1,15 @@
+"""
+Interview Load Test
+===================
+
+Offline capacity testing of the voice interview WebSocket.
+
+Modules:
+- standins: Local replacements for LLMService, STTService and TTSService
+  with configurable latency, injected into InterviewService
+- run: Simulated candidates against /ws/interview/{session_id}, producing
+  a capacity curve of concurrent sessions vs p95 turn latency
+
+Usage Example:
+    python -m loadtest.run --levels 1 5 10 25 --turns 4
+"""
@@ -0,0 +1,363 @@
+"""
+Interview Capacity Test
+=======================
+
+Starts the API in-process with the offline stand-ins (see ``standins``),
+then opens N simulated candidates against ``/ws/interview/{session_id}`` for
+each concurrency level and reports a capacity curve.
+
+Each candidate negotiates streamed audio, starts the interview and answers
+``--turns`` questions with scripted ``text_data`` (or binary ``audio_data``
+frames with ``--input audio``), pausing ``--think-ms`` between turns.
+Measured per level:
+- turn latency (answer sent -> response_complete), TTFT and TTFA as seen by the client
+- audio gaps: how long playback would stall between consecutive sentences
+- server event-loop lag (a 50 ms ticker on the server's loop)
+- process RSS (server and clients share the process)
+- server-side TTFA p95 from the latency tracer
+
+MongoDB must be reachable (MONGODB_URL); sessions are created directly
+through InterviewService and removed after each level.
+
+Usage Example:
+    python -m loadtest.run
+    python -m loadtest.run --levels 1 10 50 100 --turns 3 --input audio
+    python -m loadtest.run --json capacity.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+LOADTEST_JOB_ID = "loadtest"
+
+
+def rss_mb() -> Optional[float]:
+    """Current resident set size of this process (None where it cannot be read)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        # POSIX only (not on Windows)
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic timer fires on the loop it runs on."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, (loop.time() - expected) * 1000))
+
+    async def start(self):
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> List[float]:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        return self.samples
+
+
+class ServerThread:
+    """Runs the FastAPI app with uvicorn on its own event loop in a thread."""
+
+    def __init__(self, port: int):
+        import uvicorn
+
+        os.environ["INTERVIEW_STANDINS"] = "true"
+        from main import app
+
+        self.config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+        self.server = uvicorn.Server(self.config)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.server.serve())
+
+    def start(self, timeout: float = 60):
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("API server failed to start (is MongoDB reachable?)")
+            time.sleep(0.05)
+
+    async def call(self, coro):
+        """Run a coroutine on the server's loop and await its result from another loop."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def stop(self):
+        self.server.should_exit = True
+        self._thread.join(timeout=30)
+
+
+async def create_sessions(count: int) -> List[str]:
+    from main import get_interview_service
+    from services.interview_service import InterviewServiceContext
+    from loadtest.standins import CANDIDATE_ANSWERS
+
+    service = get_interview_service()
+    session_ids = []
+    for index in range(count):
+        context = InterviewServiceContext(
+            candidate_name=f"Load Test {index}",
+            candidate_cv_json={"summary": CANDIDATE_ANSWERS[0], "skills": ["Python", "FastAPI", "PostgreSQL", "Redis"]},
+            job_description="Backend engineer building Python APIs.",
+            required_skills=["Python", "FastAPI", "MongoDB"],
+            recruiter_extra_instructions="",
+        )
+        session_ids.append(await service.initialize_session(context, LOADTEST_JOB_ID, f"loadtest-{index}"))
+    return session_ids
+
+
+async def remove_sessions(session_ids: List[str]):
+    from main import get_interview_service
+
+    service = get_interview_service()
+    for session_id in session_ids:
+        await service.sessions.evict(session_id)
+    await service.db.interview_sessions.delete_many({"job_id": LOADTEST_JOB_ID})
+    await service.db.interview_turns.delete_many({"session_id": {"$in": session_ids}})
+
+
+class Candidate:
+    """One simulated candidate on its own WebSocket."""
+
+    def __init__(self, url: str, input_mode: str, turns: int, think_ms: float):
+        self.url = url
+        self.input_mode = input_mode
+        self.turns = turns
+        self.think_ms = think_ms
+        self.results: List[Dict[str, Any]] = []
+        self.errors: List[str] = []
+        self._frame_seq = 0
+
+    async def run(self, start_delay: float):
+        import websockets
+
+        await asyncio.sleep(start_delay)
+        try:
+            async with websockets.connect(self.url, max_size=None) as ws:
+                await ws.send(json.dumps({"type": "client_config", "payload": {"audio_streaming": True, "binary_audio": True}}))
+                await self._receive_until(ws, "client_config_ack")
+                # The greeting counts as a turn (no candidate input, INIT prompt)
+                self.results.append(await self._turn(ws, json.dumps({"type": "start_interview"}), "start"))
+                for _ in range(self.turns):
+                    await asyncio.sleep(self.think_ms / 1000 * random.uniform(0.8, 1.2))
+                    self.results.append(await self._turn(ws, self._answer(), self.input_mode))
+        except Exception as e:
+            self.errors.append(f"{type(e).__name__}: {e}")
+
+    def _answer(self):
+        if self.input_mode == "audio":
+            from api.audio_frames import FLAG_FINAL, FRAME_AUDIO_IN, encode_frame
+
+            self._frame_seq += 1
+            # Placeholder utterance; the stand-in STT ignores the content
+            return encode_frame(FRAME_AUDIO_IN, self._frame_seq, self._frame_seq, bytes(16000), FLAG_FINAL)
+        return json.dumps({"type": "text_data", "payload": "Here is my answer to the question."})
+
+    async def _receive_until(self, ws, message_type: str):
+        while True:
+            message = await ws.recv()
+            if isinstance(message, str) and json.loads(message).get("type") == message_type:
+                return
+
+    async def _turn(self, ws, outgoing, kind: str) -> Dict[str, Any]:
+        from api.audio_frames import FLAG_FINAL, decode_frame
+        from services.tts_pipeline import TTS_MP3_BYTES_PER_SECOND
+
+        sent_at = time.perf_counter()
+        await ws.send(outgoing)
+        first_token = first_audio = None
+        sentence_started = None
+        sentence_bytes = 0
+        playback_ends = None
+        gaps: List[float] = []
+
+        while True:
+            message = await ws.recv()
+            now = time.perf_counter()
+            if isinstance(message, bytes):
+                _, flags, _, _, payload = decode_frame(message)
+                if len(payload):
+                    if first_audio is None:
+                        first_audio = now
+                    if sentence_started is None:
+                        sentence_started = now
+                    sentence_bytes += len(payload)
+                if flags & FLAG_FINAL and sentence_started is not None:
+                    # Sentences play back to back; a gap is time the client sat with nothing to play
+                    if playback_ends is not None:
+                        gaps.append(max(0.0, sentence_started - playback_ends) * 1000)
+                    start = max(sentence_started, playback_ends or sentence_started)
+                    playback_ends = start + sentence_bytes / TTS_MP3_BYTES_PER_SECOND
+                    sentence_started = None
+                    sentence_bytes = 0
+                continue
+
+            message_type = json.loads(message).get("type")
+            if message_type == "text_chunk" and first_token is None:
+                first_token = now
+            elif message_type == "response_complete":
+                break
+
+        def elapsed(at):
+            return round((at - sent_at) * 1000, 1) if at is not None else None
+
+        return {
+            "kind": kind,
+            "turn_ms": elapsed(time.perf_counter()),
+            "ttft_ms": elapsed(first_token),
+            "ttfa_ms": elapsed(first_audio),
+            "gaps_ms": gaps,
+        }
+
+
+async def run_level(server: ServerThread, port: int, sessions: int, args) -> Dict[str, Any]:
+    from services.latency_tracer import default_tracer, percentile
+
+    default_tracer.reset()
+    session_ids = await server.call(create_sessions(sessions))
+    monitor = LoopLagMonitor()
+    await server.call(monitor.start())
+
+    candidates = [
+        Candidate(f"ws://127.0.0.1:{port}/ws/interview/{session_id}", args.input, args.turns, args.think_ms)
+        for session_id in session_ids
+    ]
+    started = time.perf_counter()
+    await asyncio.gather(*(c.run(random.uniform(0, args.ramp_ms / 1000)) for c in candidates))
+    duration = time.perf_counter() - started
+
+    lag = sorted(await server.call(monitor.stop()))
+    server_stats = default_tracer.stats()
+    await server.call(remove_sessions(session_ids))
+
+    # Answer turns only; the greeting has no candidate input and is reported separately
+    answers = [r for c in candidates for r in c.results if r["kind"] != "start"]
+    greetings = [r for c in candidates for r in c.results if r["kind"] == "start"]
+
+    def p(values, pct):
+        values = sorted(v for v in values if v is not None)
+        return percentile(values, pct)
+
+    gaps = [g for r in answers for g in r["gaps_ms"]]
+    return {
+        "sessions": sessions,
+        "turns": len(answers),
+        "errors": sum(len(c.errors) for c in candidates),
+        "duration_s": round(duration, 1),
+        "turn_p50_ms": p([r["turn_ms"] for r in answers], 50),
+        "turn_p95_ms": p([r["turn_ms"] for r in answers], 95),
+        "turn_p99_ms": p([r["turn_ms"] for r in answers], 99),
+        "ttft_p95_ms": p([r["ttft_ms"] for r in answers], 95),
+        "ttfa_p50_ms": p([r["ttfa_ms"] for r in answers], 50),
+        "ttfa_p95_ms": p([r["ttfa_ms"] for r in answers], 95),
+        "greeting_ttfa_p95_ms": p([r["ttfa_ms"] for r in greetings], 95),
+        "gap_p95_ms": p(gaps, 95),
+        "gap_max_ms": max(gaps) if gaps else None,
+        "loop_lag_p95_ms": round(percentile(lag, 95), 1) if lag else None,
+        "loop_lag_max_ms": round(lag[-1], 1) if lag else None,
+        "server_ttfa_p95_ms": server_stats["ttfa_ms"]["p95"],
+        "rss_mb": rss_mb(),
+        "peak_rss_mb": peak_rss_mb(),
+        "error_samples": [e for c in candidates for e in c.errors][:5],
+    }
+
+
+def _fmt(value) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.0f}" if isinstance(value, float) else str(value)
+
+
+def print_curve(rows: List[Dict[str, Any]], out):
+    columns = [
+        ("sessions", "sessions"), ("turns", "turns"), ("errors", "err"),
+        ("turn_p50_ms", "turn p50"), ("turn_p95_ms", "turn p95"), ("ttfa_p95_ms", "TTFA p95"),
+        ("gap_p95_ms", "gap p95"), ("loop_lag_p95_ms", "lag p95"), ("loop_lag_max_ms", "lag max"), ("rss_mb", "RSS MB"),
+    ]
+    print("\nCapacity curve (latencies in ms):\n", file=out)
+    print("".join(f"{title:>10}" for _, title in columns), file=out)
+    print("-" * 10 * len(columns), file=out)
+    for row in rows:
+        print("".join(f"{_fmt(row[key]):>10}" for key, _ in columns), file=out)
+        for error in row["error_samples"]:
+            print(f"    error: {error}", file=out)
+
+
+def main(argv: Sequence[str] = None):
+    parser = argparse.ArgumentParser(description="Load test the voice interview WebSocket with offline stand-ins")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 5, 10, 25, 50], help="Concurrent sessions per level")
+    parser.add_argument("--turns", type=int, default=4, help="Candidate answers per session")
+    parser.add_argument("--think-ms", type=float, default=1500, help="Pause before each answer")
+    parser.add_argument("--ramp-ms", type=float, default=2000, help="Sessions start at random offsets within this window")
+    parser.add_argument("--input", choices=["text", "audio"], default="text", help="Send text_data or binary audio frames")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true", help="Keep the server's per-turn logs")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+
+    out = sys.stdout
+    server = ServerThread(args.port)
+    server.start()
+    rows = []
+    try:
+        for sessions in args.levels:
+            print(f"Running {sessions} concurrent session(s)...", file=out, flush=True)
+            if not args.verbose:
+                sys.stdout = open(os.devnull, "w")
+            try:
+                rows.append(asyncio.run(run_level(server, args.port, sessions, args)))
+            finally:
+                if sys.stdout is not out:
+                    sys.stdout.close()
+                    sys.stdout = out
+    finally:
+        server.stop()
+
+    print_curve(rows, out)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"turns": args.turns, "think_ms": args.think_ms, "input": args.input, "levels": rows}, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Service Stand-ins
+=================
+
+Local, deterministic replacements for the Groq LLM, Groq Whisper and Edge
+TTS clients. They keep the real services' interfaces (and latency-tracer
+marks) but only sleep, so the interview pipeline can be load tested offline.
+
+Latencies are configured with environment variables (milliseconds):
+- LOADTEST_LLM_TTFT_MS / LOADTEST_LLM_TOKEN_MS: first token / per token
+- LOADTEST_LLM_JSON_MS: non-streaming calls (evaluations, summaries)
+- LOADTEST_STT_MS: per transcription
+- LOADTEST_TTS_FIRST_CHUNK_MS: per sentence before its first audio chunk
+- LOADTEST_TTS_SPEED: synthesis speed as a multiple of real time
+"""
+
+import asyncio
+import itertools
+import json
+import os
+from typing import AsyncGenerator, Dict, List
+
+from services import latency_tracer
+from services.llm_service import LLMService
+from services.stt_service import STTService
+from services.tts_cache import TTSPhraseCache
+from services.tts_pipeline import TTS_MP3_BYTES_PER_SECOND
+from services.tts_service import TTSService
+
+LOADTEST_LLM_TTFT_MS = float(os.getenv("LOADTEST_LLM_TTFT_MS", "350"))
+LOADTEST_LLM_TOKEN_MS = float(os.getenv("LOADTEST_LLM_TOKEN_MS", "15"))
+LOADTEST_LLM_JSON_MS = float(os.getenv("LOADTEST_LLM_JSON_MS", "600"))
+LOADTEST_STT_MS = float(os.getenv("LOADTEST_STT_MS", "300"))
+LOADTEST_TTS_FIRST_CHUNK_MS = float(os.getenv("LOADTEST_TTS_FIRST_CHUNK_MS", "200"))
+LOADTEST_TTS_SPEED = float(os.getenv("LOADTEST_TTS_SPEED", "8"))
+
+# Interviewer replies; none of them contains a closing phrase, so sessions never finalize
+INTERVIEWER_REPLIES = [
+    "Thanks for walking me through that. It sounds like you owned the design end to end, "
+    "which is great to hear. How did you decide between a relational database and a document store for that service?",
+    "That makes sense, and the trade-off you describe is a common one. Let's go a bit deeper. "
+    "Can you explain how you would find and fix a memory leak in a long-running Python process?",
+    "Good. I appreciate the concrete example, e.g. the profiling step you mentioned. "
+    "Now, tell me about a time you disagreed with a teammate on a technical decision. What happened?",
+    "Interesting. Let's switch to system design for a moment. How would you design a rate limiter "
+    "for an API that serves about 3.5 thousand requests per second across several regions?",
+]
+
+CANDIDATE_ANSWERS = [
+    "I built the backend for our ordering system using FastAPI and PostgreSQL, and I handled the deployment on Kubernetes.",
+    "I would start with tracemalloc snapshots to compare allocations over time and then look for caches that never evict.",
+    "We disagreed about adopting GraphQL. I wrote a short comparison, we ran a spike for a week and agreed to stay with REST.",
+    "I would use a token bucket per client kept in Redis, with a local cache in each region to avoid a round trip per request.",
+]
+
+STANDIN_SCORES = {"technical_accuracy": 7.0, "depth_of_explanation": 6.0, "clarity": 8.0, "confidence_level": 7.0}
+
+# Average spoken English is about 2.5 words per second
+_WORDS_PER_SECOND = 2.5
+_TTS_CHUNK_BYTES = 2880
+
+
+class StandInLLMService(LLMService):
+    """LLMService that streams canned replies at a configured token rate."""
+
+    def __init__(self, ttft_ms: float = LOADTEST_LLM_TTFT_MS, token_ms: float = LOADTEST_LLM_TOKEN_MS, json_ms: float = LOADTEST_LLM_JSON_MS):
+        # The Groq client is never created
+        self.model = "stand-in"
+        self.summary_model = "stand-in"
+        self.ttft_ms = ttft_ms
+        self.token_ms = token_ms
+        self.json_ms = json_ms
+        self._replies = itertools.cycle(INTERVIEWER_REPLIES)
+
+    async def generate_response(self, prompt: str, history: List[Dict[str, str]] = None) -> AsyncGenerator[str, None]:
+        with latency_tracer.span("llm"):
+            await asyncio.sleep(self.ttft_ms / 1000)
+            words = next(self._replies).split(" ")
+            for index, word in enumerate(words):
+                if index:
+                    await asyncio.sleep(self.token_ms / 1000)
+                latency_tracer.mark("llm_first_token")
+                yield word if index == 0 else " " + word
+
+    async def generate_json_response(self, prompt: str) -> str:
+        await asyncio.sleep(self.json_ms / 1000)
+        return json.dumps(STANDIN_SCORES)
+
+    async def evaluate_answers_batch(self, pairs: List[Dict[str, str]]) -> List[Dict[str, float]]:
+        # One call per batch, like the real service
+        await asyncio.sleep(self.json_ms / 1000)
+        return [dict(STANDIN_SCORES) for _ in pairs]
+
+    async def generate_summary(self, prompt: str, max_tokens: int = 512) -> str:
+        await asyncio.sleep(self.json_ms / 1000)
+        return "The candidate described backend work with FastAPI and PostgreSQL and answered debugging and design questions."
+
+
+class StandInSTTService(STTService):
+    """STTService that returns scripted candidate answers after a fixed delay."""
+
+    def __init__(self, latency_ms: float = LOADTEST_STT_MS):
+        self.latency_ms = latency_ms
+        self._semaphore = asyncio.Semaphore(1_000_000)
+        self._answers = itertools.cycle(CANDIDATE_ANSWERS)
+
+    async def transcribe(self, audio_bytes: bytes, file_name: str = "audio.webm") -> str:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return next(self._answers)
+
+    async def transcribe_utterance(self, audio_bytes: bytes, file_name: str = "audio.webm") -> str:
+        # The harness sends placeholder audio, so voice activity detection is skipped
+        return await self.transcribe(audio_bytes, file_name)
+
+
+class StandInTTSService(TTSService):
+    """TTSService producing MP3-sized placeholder audio faster than real time."""
+
+    def __init__(self, first_chunk_ms: float = LOADTEST_TTS_FIRST_CHUNK_MS, speed: float = LOADTEST_TTS_SPEED):
+        super().__init__(voice="stand-in", cache=TTSPhraseCache(enabled=False))
+        self.first_chunk_ms = first_chunk_ms
+        self.speed = speed
+
+    async def stream_speech(self, text: str) -> AsyncGenerator[bytes, None]:
+        duration = max(0.5, len(text.split()) / _WORDS_PER_SECOND)
+        remaining = int(duration * TTS_MP3_BYTES_PER_SECOND)
+        chunk_seconds = _TTS_CHUNK_BYTES / TTS_MP3_BYTES_PER_SECOND
+        await asyncio.sleep(self.first_chunk_ms / 1000)
+        first = True
+        while remaining > 0:
+            if not first:
+                await asyncio.sleep(chunk_seconds / self.speed)
+            first = False
+            size = min(_TTS_CHUNK_BYTES, remaining)
+            remaining -= size
+            yield b"\xff\xf3" + bytes(size - 2)
+
+
+def create_standin_services() -> Dict[str, object]:
+    """Keyword arguments for InterviewService(db, **create_standin_services())."""
+    return {
+        "llm_service": StandInLLMService(),
+        "stt_service": StandInSTTService(),
+        "tts_service": StandInTTSService(),
+    }
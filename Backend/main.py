@@ -83,6 +83,20 @@ async def startup_event():
         except Exception as e:
             print(f"Superuser initialization failed: {e}")
 
+        # Pre-render recurring interviewer phrases into the TTS cache (off the startup path)
+        if os.getenv("TTS_PREWARM", "false").lower() in {"1", "true", "yes", "y", "on"}:
+            import asyncio
+            from agents.interview_agent.prompts import STOCK_PHRASES
+
+            async def prewarm_tts():
+                try:
+                    rendered = await get_interview_service().tts_service.prewarm(STOCK_PHRASES)
+                    print(f"- TTS cache pre-warmed ({rendered} new phrase(s))")
+                except Exception as e:
+                    print(f"TTS pre-warm failed: {e}")
+
+            asyncio.create_task(prewarm_tts())
+
         # Auto-close expired job postings
         try:
             from database.job_posting_crud import close_expired_jobs
@@ -105,6 +119,16 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Close database connection on shutdown."""
+    from cv_screener.parse_service import shutdown_parse_pool
+    shutdown_parse_pool()
+    # Persist any interview transcript writes still queued in memory
+    if _interview_service is not None:
+        await _interview_service.sessions.close()
+    # Let the latency trace writer finish the turns still queued for the JSONL file
+    import asyncio
+    from services.latency_tracer import default_tracer
+    if default_tracer.exporter is not None:
+        await asyncio.to_thread(default_tracer.exporter.close)
     await db_manager.disconnect()
 
 # Singleton service for interview orchestration
@@ -114,7 +138,12 @@ _interview_service = None
 def get_interview_service() -> InterviewService:
     global _interview_service
     if _interview_service is None:
-        _interview_service = InterviewService(db_manager.db)
+        if os.getenv("INTERVIEW_STANDINS", "false").lower() in {"1", "true", "yes", "y", "on"}:
+            # Offline LLM/STT/TTS stand-ins, used by the load-test harness
+            from loadtest.standins import create_standin_services
+            _interview_service = InterviewService(db_manager.db, **create_standin_services())
+        else:
+            _interview_service = InterviewService(db_manager.db)
     return _interview_service
 
 @app.get("/")
@@ -0,0 +1,257 @@
+"""
+Conversation Memory
+===================
+
+Keeps the interviewer prompt a bounded size however long the interview runs.
+
+Each turn's prompt is built from:
+- the system prompt, with the candidate CV compacted and the job
+  description trimmed to their own sub-budgets once per session
+- a rolling summary of every turn older than the recent window
+- the most recent turns verbatim, oldest dropped first if over budget
+  (the latest question and answer are always kept)
+
+Older turns are folded into the summary by a background task between
+turns (using the small summary model), so summarization never sits on the
+path to the first token. Token counts are estimated (about four characters
+per token), which is close enough for budgeting and needs no tokenizer.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+MEMORY_PROMPT_TOKEN_BUDGET = int(os.getenv("MEMORY_PROMPT_TOKEN_BUDGET", "3500"))
+MEMORY_RECENT_TURNS = int(os.getenv("MEMORY_RECENT_TURNS", "6"))
+MEMORY_SUMMARY_BATCH = int(os.getenv("MEMORY_SUMMARY_BATCH", "4"))
+MEMORY_SUMMARY_TOKENS = int(os.getenv("MEMORY_SUMMARY_TOKENS", "400"))
+MEMORY_CV_TOKENS = int(os.getenv("MEMORY_CV_TOKENS", "1200"))
+MEMORY_JD_TOKENS = int(os.getenv("MEMORY_JD_TOKENS", "800"))
+MEMORY_TURN_TOKENS = int(os.getenv("MEMORY_TURN_TOKENS", "400"))
+
+CHARS_PER_TOKEN = 4
+
+# Messages that are never dropped from the prompt: the last question and the answer to it
+LATEST_EXCHANGE = 2
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a piece of text."""
+    return (len(text or "") + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, marking the cut."""
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:limit].rstrip() + " …"
+
+
+def _prune(value: Any) -> Any:
+    """Drop empty fields and collapse whitespace."""
+    if isinstance(value, dict):
+        pruned = {key: _prune(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if item not in (None, "", [], {})}
+    if isinstance(value, list):
+        pruned = [_prune(item) for item in value]
+        return [item for item in pruned if item not in (None, "", [], {})]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def _shorten(value: Any, max_chars: int, max_items: int) -> Any:
+    if isinstance(value, dict):
+        return {key: _shorten(item, max_chars, max_items) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_shorten(item, max_chars, max_items) for item in value[:max_items]]
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars].rstrip() + "…"
+    return value
+
+
+def compact_cv_json(cv_json: Dict[str, Any], max_tokens: int = MEMORY_CV_TOKENS) -> str:
+    """
+    Serialize the extracted CV for the prompt within a token budget.
+
+    Empty fields and indentation are removed first; long strings and lists
+    are then shortened step by step until the JSON fits.
+    """
+    pruned = _prune(cv_json or {})
+    text = json.dumps(pruned, separators=(",", ":"), ensure_ascii=False, default=str)
+    for max_chars, max_items in ((400, 12), (200, 8), (120, 5), (60, 3)):
+        if estimate_tokens(text) <= max_tokens:
+            return text
+        text = json.dumps(_shorten(pruned, max_chars, max_items), separators=(",", ":"), ensure_ascii=False, default=str)
+    return truncate_tokens(text, max_tokens)
+
+
+def _render_turns(turns: List[dict], max_tokens: int) -> str:
+    lines = []
+    for message in turns:
+        speaker = "Candidate" if message.get("role") == "candidate" else "Interviewer"
+        lines.append(f"{speaker}: {truncate_tokens(message.get('content', ''), max_tokens)}")
+    return "\n".join(lines)
+
+
+def _seq(message: dict, index: int) -> int:
+    return message.get("seq", index)
+
+
+def _next_seq(transcript: List[dict]) -> int:
+    return _seq(transcript[-1], len(transcript) - 1) + 1 if transcript else 0
+
+
+def _messages_between(transcript: List[dict], start: int, end: Optional[int] = None) -> List[dict]:
+    """Messages with start <= seq < end (seq falls back to the list position)."""
+    return [
+        message for index, message in enumerate(transcript)
+        if _seq(message, index) >= start and (end is None or _seq(message, index) < end)
+    ]
+
+
+class ConversationMemory:
+    """
+    Rolling prompt memory of one interview session.
+
+    Attributes:
+        summary: Running summary of the messages with seq < summarized_upto
+        summarized_upto: Number of transcript messages folded into the summary
+
+    Transcript messages carry their ``seq`` (position in the full interview),
+    so the transcript passed in may be just the most recent messages.
+    """
+
+    def __init__(
+        self,
+        summary: str = "",
+        summarized_upto: int = 0,
+        token_budget: int = MEMORY_PROMPT_TOKEN_BUDGET,
+        recent_turns: int = MEMORY_RECENT_TURNS,
+    ):
+        self.summary = summary
+        self.summarized_upto = summarized_upto
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self._cv_text: Optional[str] = None
+        self._jd_text: Optional[str] = None
+        self._overflow = False
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_doc(cls, doc: Optional[Dict[str, Any]]) -> "ConversationMemory":
+        doc = doc or {}
+        return cls(summary=doc.get("summary", ""), summarized_upto=doc.get("summarized_upto", 0))
+
+    def to_doc(self) -> Dict[str, Any]:
+        return {"summary": self.summary, "summarized_upto": self.summarized_upto}
+
+    def cv_text(self, cv_json: Dict[str, Any]) -> str:
+        """The compacted CV, computed on first use and reused for the session."""
+        if self._cv_text is None:
+            self._cv_text = compact_cv_json(cv_json)
+        return self._cv_text
+
+    def jd_text(self, job_description: str) -> str:
+        """The job description cut to MEMORY_JD_TOKENS, computed on first use."""
+        if self._jd_text is None:
+            self._jd_text = truncate_tokens(job_description or "", MEMORY_JD_TOKENS)
+        return self._jd_text
+
+    def reset_cv(self):
+        """Drop the compacted CV so the next turn rebuilds it (the CV profile was replaced)."""
+        self._cv_text = None
+
+    def build_history(self, system_prompt: str, transcript: List[dict], prompt_input: str = "") -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+        """
+        Assemble the chat messages for the next LLM call.
+
+        Returns:
+            (history, stats) where stats holds the estimated token counts
+        """
+        self.summarized_upto = min(self.summarized_upto, _next_seq(transcript))
+        if self.summary:
+            system_prompt = f"{system_prompt}\nINTERVIEW SO FAR (summary of earlier turns):\n{self.summary}\n"
+        system_tokens = estimate_tokens(system_prompt)
+        input_tokens = estimate_tokens(prompt_input)
+
+        turns = []
+        for message in _messages_between(transcript, self.summarized_upto):
+            role = "user" if message["role"] == "candidate" else "assistant"
+            turns.append({"role": role, "content": truncate_tokens(message["content"], MEMORY_TURN_TOKENS)})
+
+        # Newest turns win; anything that does not fit waits for the next summary.
+        # The latest exchange is kept even over budget, or the model would lose the thread.
+        remaining = self.token_budget - system_tokens - input_tokens
+        kept: List[Dict[str, str]] = []
+        turn_tokens = 0
+        for message in reversed(turns):
+            tokens = estimate_tokens(message["content"])
+            if turn_tokens + tokens > remaining and len(kept) >= LATEST_EXCHANGE:
+                break
+            kept.append(message)
+            turn_tokens += tokens
+        kept.reverse()
+        dropped = len(turns) - len(kept)
+        self._overflow = dropped > 0
+
+        stats = {
+            "prompt_tokens": system_tokens + turn_tokens + input_tokens,
+            "system_tokens": system_tokens,
+            "summary_tokens": estimate_tokens(self.summary),
+            "turn_tokens": turn_tokens,
+            "turns": len(kept),
+            "dropped_turns": dropped,
+            "summarized_upto": self.summarized_upto,
+            "budget": self.token_budget,
+        }
+        return [{"role": "system", "content": system_prompt}] + kept, stats
+
+    def schedule_summary(self, transcript: List[dict], llm_service, on_update: Optional[Callable[["ConversationMemory"], None]] = None):
+        """
+        Fold turns older than the recent window into the summary, in the background.
+
+        Runs once MEMORY_SUMMARY_BATCH turns have piled up beyond the window,
+        or immediately if the last prompt had to drop turns.
+        """
+        if self._task is not None and not self._task.done():
+            return
+        upto = _next_seq(transcript) - self.recent_turns
+        pending = upto - self.summarized_upto
+        if pending <= 0 or (pending < MEMORY_SUMMARY_BATCH and not self._overflow):
+            return
+        turns = _messages_between(transcript, self.summarized_upto, upto)
+        self._task = asyncio.create_task(self._summarize(turns, upto, llm_service, on_update))
+
+    async def _summarize(self, turns: List[dict], upto: int, llm_service, on_update):
+        from agents.interview_agent.prompts import CONVERSATION_SUMMARY_PROMPT
+
+        started = time.perf_counter()
+        prompt = CONVERSATION_SUMMARY_PROMPT.format(
+            summary=self.summary or "(none yet)",
+            turns=_render_turns(turns, MEMORY_TURN_TOKENS * 2),
+            max_words=MEMORY_SUMMARY_TOKENS * 3 // 4,
+        )
+        try:
+            summary = await llm_service.generate_summary(prompt, max_tokens=MEMORY_SUMMARY_TOKENS)
+        except Exception as e:
+            print(f"[WARNING] Conversation summary failed, keeping recent turns only: {e}")
+            return
+        if not summary:
+            return
+        self.summary = truncate_tokens(summary, MEMORY_SUMMARY_TOKENS)
+        self.summarized_upto = upto
+        self._overflow = False
+        print(
+            f"[MEMORY] summarized {len(turns)} messages upto={upto} "
+            f"summary_tokens={estimate_tokens(self.summary)} took={(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        if on_update is not None:
+            on_update(self)
+
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
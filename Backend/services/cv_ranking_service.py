@@ -6,15 +6,16 @@ Integrates with existing CV screener to rank candidates
 import base64
 import io
 from typing import List, Dict, Any
-from cv_screener.gemini_screener import GeminiCVScreener
-from cv_screener.cv_parser import parse_cv_file
+from cv_screener.gemini_screener import get_shared_screener
+from cv_screener.cv_parser import detect_format
+from cv_screener.parse_service import parse_cv_bytes
 
 
 class CVRankingService:
     """Service to screen and rank multiple CVs against a job description."""
     
     def __init__(self):
-        self.screener = GeminiCVScreener()
+        self.screener = get_shared_screener()
     
     def decode_base64_file(self, base64_string: str) -> bytes:
         """Decode base64 string to bytes."""
@@ -45,24 +46,15 @@ class CVRankingService:
                 # Decode CV file
                 cv_bytes = self.decode_base64_file(cv_base64)
                 
-                # Save to temporary file
-                import tempfile
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                    tmp_file.write(cv_bytes)
-                    tmp_file_path = tmp_file.name
-                
-                # Parse CV from temporary file
-                cv_text = parse_cv_file(tmp_file_path)
-                
-                # Clean up temporary file
-                import os
-                os.unlink(tmp_file_path)
+                # Parse CV in the parsing process pool (format is sniffed from the bytes)
+                file_name = f"Candidate_{idx+1}{detect_format(cv_bytes) or '.pdf'}"
+                cv_text = await parse_cv_bytes(cv_bytes, file_name)
                 
                 # Screen CV against job description
                 screening_result = await self.screener.screen_cv(
                     job_description=job_description,
                     cv_content=cv_text,
-                    file_name=f"Candidate_{idx+1}.pdf"
+                    file_name=file_name
                 )
                 
                 # Extract candidate name from CV text (simple extraction)
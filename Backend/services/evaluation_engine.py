@@ -0,0 +1,156 @@
+"""
+Answer Evaluation Engine
+========================
+
+Batched, bounded scoring of candidate answers.
+
+Answers used to spawn one unbounded background task each, with its own
+Groq JSON call and its own ``$push``. Question/answer pairs are now queued
+per session and scored together:
+- a batch is sent every ``batch_size`` answers, and whatever is left when
+  the interview reaches wrap-up
+- one multi-item prompt per batch (``LLMService.evaluate_answers_batch``)
+- one bulk insert into ``interview_turns`` per batch, keyed by the seq of
+  the answer each evaluation scores
+- batches wait in one process-wide queue served by at most
+  ``max_concurrency`` worker tasks, so a burst of sessions never piles up
+  one task per batch
+- a failed batch is retried ``EVAL_RETRIES`` times; if it still fails,
+  its answers are stored with an ``error`` and no scores, so they are
+  visible and left out of the averages instead of silently missing
+
+``drain(session_id)`` sends the remainder and waits for every batch of the
+session, so the final report never races a pending evaluation.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Set, Tuple
+
+from database.interview_turn_crud import TURN_EVALUATION, insert_turns
+
+EVAL_BATCH_SIZE = max(1, int(os.getenv("EVAL_BATCH_SIZE", "3")))
+EVAL_MAX_CONCURRENCY = max(1, int(os.getenv("EVAL_MAX_CONCURRENCY", "4")))
+EVAL_RETRIES = max(0, int(os.getenv("EVAL_RETRIES", "1")))
+EVAL_RETRY_DELAY_SECONDS = float(os.getenv("EVAL_RETRY_DELAY_SECONDS", "2"))
+
+
+class EvaluationEngine:
+    """
+    Per-session queues of answers awaiting evaluation.
+
+    Attributes:
+        batch_size: Answers per evaluation call
+        max_concurrency: Worker tasks (evaluation calls in flight) across all sessions
+        retries: Extra attempts for a batch whose call or insert failed
+    """
+
+    def __init__(
+        self,
+        db,
+        llm_service,
+        batch_size: int = EVAL_BATCH_SIZE,
+        max_concurrency: int = EVAL_MAX_CONCURRENCY,
+        retries: int = EVAL_RETRIES,
+    ):
+        self.db = db
+        self.llm_service = llm_service
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self._queues: Dict[str, List[Dict[str, Any]]] = {}
+        self._batches: Deque[Tuple[str, List[Dict[str, Any]], asyncio.Future]] = deque()
+        self._workers: Set[asyncio.Task] = set()
+        self._pending: Dict[str, Set[asyncio.Future]] = {}
+        self._stats = {"answers": 0, "batches": 0, "llm_calls": 0, "retries": 0, "errors": 0, "failed_answers": 0}
+
+    def submit(self, session_id: str, question: str, answer: str, seq: int):
+        """Queue one question/answer pair (seq of the answer message); a full batch is sent right away."""
+        queue = self._queues.setdefault(session_id, [])
+        queue.append({"seq": seq, "question": question, "answer": answer, "timestamp": datetime.utcnow()})
+        self._stats["answers"] += 1
+        if len(queue) >= self.batch_size:
+            self.flush(session_id)
+
+    def flush(self, session_id: str):
+        """Send whatever is queued for a session without waiting for it (e.g. at wrap-up)."""
+        items = self._queues.pop(session_id, None)
+        if not items:
+            return
+        done = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(session_id, set())
+        pending.add(done)
+        done.add_done_callback(lambda f: self._forget(session_id, f))
+        self._batches.append((session_id, items, done))
+        if len(self._workers) < self.max_concurrency:
+            self._workers.add(asyncio.create_task(self._work()))
+
+    def _forget(self, session_id: str, done: asyncio.Future):
+        pending = self._pending.get(session_id)
+        if pending is not None:
+            pending.discard(done)
+            if not pending:
+                self._pending.pop(session_id, None)
+
+    async def _work(self):
+        """Evaluate queued batches until none are left."""
+        try:
+            while self._batches:
+                session_id, items, done = self._batches.popleft()
+                try:
+                    await self._evaluate(session_id, items)
+                finally:
+                    if not done.done():
+                        done.set_result(None)
+        finally:
+            # Leaves the set before flush() can see the queue empty, so a new batch always gets a worker
+            self._workers.discard(asyncio.current_task())
+
+    async def drain(self, session_id: str):
+        """Send the remainder and wait until every evaluation of the session is stored."""
+        self.flush(session_id)
+        pending = list(self._pending.get(session_id, ()))
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _evaluate(self, session_id: str, items: List[Dict[str, Any]]):
+        started = time.perf_counter()
+        pairs = [{"question": item["question"], "answer": item["answer"]} for item in items]
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._stats["retries"] += 1
+                await asyncio.sleep(EVAL_RETRY_DELAY_SECONDS * attempt)
+            try:
+                self._stats["llm_calls"] += 1
+                scores = await self.llm_service.evaluate_answers_batch(pairs)
+                await insert_turns(
+                    self.db, session_id, TURN_EVALUATION,
+                    [{**item, "scores": item_scores} for item, item_scores in zip(items, scores)]
+                )
+                self._stats["batches"] += 1
+                print(f"[EVAL] session={session_id} answers={len(items)} took={(time.perf_counter() - started) * 1000:.0f}ms")
+                return
+            except Exception as e:
+                self._stats["errors"] += 1
+                print(f"Error in background evaluation (attempt {attempt + 1}/{self.retries + 1}): {e}")
+
+        # Keep a record of the answers that could not be scored
+        self._stats["failed_answers"] += len(items)
+        try:
+            await insert_turns(
+                self.db, session_id, TURN_EVALUATION,
+                [{**item, "error": "evaluation failed"} for item in items]
+            )
+        except Exception as e:
+            print(f"[WARNING] session={session_id} could not record {len(items)} failed evaluations: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "queued_answers": sum(len(queue) for queue in self._queues.values()),
+            "batches_waiting": len(self._batches),
+            "workers": len(self._workers),
+        }
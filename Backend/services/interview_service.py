@@ -14,24 +14,36 @@ from agents.interview_agent.prompts import INTERVIEWER_SYSTEM_PROMPT, STAGE_INST
 from services.llm_service import LLMService 
 from services.stt_service import STTService
 from services.tts_service import TTSService
+from services.session_store import SessionStore
+from services.conversation_memory import ConversationMemory
+from services.evaluation_engine import EvaluationEngine
+from services import latency_tracer
+from database.interview_turn_crud import get_evaluations
 
 
 class InterviewServiceContext:
-    def __init__(self, candidate_name: str, candidate_cv_json: dict, job_description: str, required_skills: list, recruiter_extra_instructions: str, is_demo: bool = False):
+    def __init__(self, candidate_name: str, candidate_cv_json: dict, job_description: str, required_skills: list, recruiter_extra_instructions: str, is_demo: bool = False, memory: Optional[ConversationMemory] = None):
         self.candidate_name = candidate_name
         self.candidate_cv_json = candidate_cv_json
         self.job_description = job_description
         self.required_skills = required_skills
         self.recruiter_extra_instructions = recruiter_extra_instructions
         self.is_demo = is_demo
+        # Rolling summary and compacted CV used to build each turn's prompt
+        self.memory = memory or ConversationMemory()
 
 
 class InterviewService:
-    def __init__(self, db):
+    def __init__(self, db, llm_service: Optional[LLMService] = None, stt_service: Optional[STTService] = None, tts_service: Optional[TTSService] = None):
         self.db = db
-        self.llm_service = LLMService()
-        self.stt_service = STTService()
-        self.tts_service = TTSService()
+        # Injectable so the load-test harness can run against local stand-ins
+        self.llm_service = llm_service or LLMService()
+        self.stt_service = stt_service or STTService()
+        self.tts_service = tts_service or TTSService()
+        # Hydrated sessions live here between turns; writes are flushed to Mongo in the background
+        self.sessions = SessionStore(db, hydrate=self._hydrate)
+        # Answers are scored in batches in the background, bounded across all sessions
+        self.evaluations = EvaluationEngine(db, self.llm_service)
 
     async def initialize_session(self, context: InterviewServiceContext, job_id: str, candidate_id: str) -> str:
         session_id = str(uuid.uuid4())
@@ -47,7 +59,6 @@ class InterviewService:
             "session_id": session_id,
             "job_id": job_id,
             "candidate_id": candidate_id,
-            "transcript": [],
             "technical_score": 0,
             "behavioral_score": 0,
             "confidence_score": 0,
@@ -68,17 +79,18 @@ class InterviewService:
                 "skills_covered": session_state.skills_covered
             }
         })
+        self.sessions.add(session_id, session_state, context, {"job_id": job_id, "candidate_id": candidate_id})
         
         return session_id
 
-    async def get_session(self, session_id: str) -> Optional[tuple[InterviewState, InterviewServiceContext]]:
-        doc = await self.db.interview_sessions.find_one({"session_id": session_id})
-        if not doc:
-            return None
-            
+    @staticmethod
+    def _hydrate(doc: dict, transcript: List[dict]) -> tuple[InterviewState, InterviewServiceContext]:
+        """
+        Build the in-memory state and context from an interview_sessions
+        document and its most recent transcript messages.
+        """
         context_data = doc.get("context", {})
         state_overrides = doc.get("state_overrides", {})
-        transcript = doc.get("transcript", [])
         
         context = InterviewServiceContext(
             candidate_name=context_data.get("candidate_name", "Unknown"),
@@ -86,7 +98,8 @@ class InterviewService:
             job_description=context_data.get("job_description", ""),
             required_skills=context_data.get("required_skills", []),
             recruiter_extra_instructions=context_data.get("recruiter_extra_instructions", ""),
-            is_demo=context_data.get("is_demo", False)
+            is_demo=context_data.get("is_demo", False),
+            memory=ConversationMemory.from_doc(doc.get("memory"))
         )
         
         session = InterviewState(
@@ -95,13 +108,42 @@ class InterviewService:
             stage=InterviewStage(state_overrides.get("stage", "introduction")),
             transcript=transcript,
             skills_covered=state_overrides.get("skills_covered", []),
-            current_difficulty=state_overrides.get("current_difficulty", "medium")
+            current_difficulty=state_overrides.get("current_difficulty", "medium"),
+            # Older sessions did not store the counter; their transcript was loaded in full
+            interviewer_turns=state_overrides.get(
+                "interviewer_turns",
+                len([x for x in transcript if x["role"] == "interviewer"])
+            )
         )
         
         return session, context
 
+    async def get_session(self, session_id: str) -> Optional[tuple[InterviewState, InterviewServiceContext]]:
+        # Served from the session store; only the first access in this process reads Mongo
+        entry = await self.sessions.get(session_id)
+        if entry is None:
+            return None
+        return entry.state, entry.context
+
+    async def update_cv_profile(self, session_id: str, cv_json: dict):
+        """
+        Replace the structured CV of a running session, e.g. once background
+        extraction finishes after the interview has already started.
+        """
+        entry = self.sessions.peek(session_id)
+        if entry is None:
+            await self.db.interview_sessions.update_one(
+                {"session_id": session_id},
+                {"$set": {"context.candidate_cv_json": cv_json}}
+            )
+            return
+        entry.context.candidate_cv_json = cv_json
+        entry.context.memory.reset_cv()
+        self.sessions.set_fields(session_id, {"context.candidate_cv_json": cv_json})
+
     async def process_input(self, session_id: str, user_input: str) -> AsyncGenerator[str, None]:
-        session_data = await self.get_session(session_id)
+        with latency_tracer.span("get_session"):
+            session_data = await self.get_session(session_id)
         
         if not session_data:
             yield "Error: Session not found."
@@ -111,16 +153,13 @@ class InterviewService:
 
         # 1. Update Transcript with User Input
         if user_input.strip() != "INIT":
-            session.transcript.append({"role": "candidate", "content": user_input})
+            message = {"role": "candidate", "content": user_input, "timestamp": datetime.utcnow()}
+            session.transcript.append(message)
             
-            # Save to DB asynchronously (fire and forget or await)
-            await self.db.interview_sessions.update_one(
-                {"session_id": session_id},
-                {"$push": {"transcript": {"role": "candidate", "content": user_input, "timestamp": datetime.utcnow()}}}
-            )
+            # Queued for the session store's background flush
+            answer_seq = self.sessions.append_transcript(session_id, message)
 
-            # Fire off background evaluation for the previous question and current answer
-            import asyncio
+            # Queue the previous question and this answer for batched background evaluation
             
             # Get the last AI question
             last_question = ""
@@ -129,27 +168,13 @@ class InterviewService:
                     last_question = msg["content"]
                     break
                     
-            if last_question:
-                async def evaluate_and_store(q: str, a: str, s_id: str):
-                    try:
-                        eval_scores = await self.llm_service.evaluate_answer_groq(q, a)
-                        await self.db.interview_sessions.update_one(
-                            {"session_id": s_id},
-                            {"$push": {"answer_evaluations": {
-                                "question": q,
-                                "answer": a,
-                                "scores": eval_scores,
-                                "timestamp": datetime.utcnow()
-                            }}}
-                        )
-                    except Exception as e:
-                        print(f"Error in background evaluation: {e}")
-                
-                asyncio.create_task(evaluate_and_store(last_question, user_input, session_id))
+            if last_question and answer_seq is not None:
+                self.evaluations.submit(session_id, last_question, user_input, answer_seq)
         
         # 2. Determine Stage & Instructions
         current_stage = session.stage
-        interaction_count = len([x for x in session.transcript if x["role"] == "interviewer"])
+        # Only the latest messages are in memory, so the interviewer turns are counted separately
+        interaction_count = session.interviewer_turns
 
         # Simple Stage Transition Logic
         is_demo = getattr(context, "is_demo", False)
@@ -164,21 +189,25 @@ class InterviewService:
         elif current_stage == InterviewStage.CORE and interaction_count > target_wrapup_start:
             session.stage = InterviewStage.WRAPUP
 
+        # No more batches will fill up once the interview is wrapping up
+        if session.stage == InterviewStage.WRAPUP:
+            self.evaluations.flush(session_id)
+
         stage_instructions = STAGE_INSTRUCTIONS.get(session.stage.value, "")
 
         # 3. Construct History
-        history = []
+        memory = context.memory
         
         # Define context-dependent string replacements
         extra_instr = context.recruiter_extra_instructions
-        cv_json_val = json.dumps(context.candidate_cv_json, indent=2)
+        cv_json_val = memory.cv_text(context.candidate_cv_json)
         if is_demo:
             cv_json_val = "Note: This is a demo interview. The user has not provided a CV. Do NOT ask about projects from the CV."
             extra_instr += " IMPORTANT: DO NOT attempt to ask about any CV projects. Keep questions general."
 
         # Add System Prompt with the new context
         system_prompt = INTERVIEWER_SYSTEM_PROMPT.format(
-            job_description=context.job_description,
+            job_description=memory.jd_text(context.job_description),
             required_skills=", ".join(context.required_skills) if context.required_skills else "Not specified",
             extra_instructions=extra_instr,
             candidate_name=context.candidate_name,
@@ -186,17 +215,21 @@ class InterviewService:
             stage=session.stage.value,
             stage_instructions=stage_instructions
         )
-        history.append({"role": "system", "content": system_prompt})
 
-        # Add Chat History
-        for msg in session.transcript[-10:]:
-             role = "user" if msg["role"] == "candidate" else "assistant"
-             history.append({"role": role, "content": msg["content"]})
+        # If user_input was INIT, request the AI to initiate the intro instead of simulating candidate readiness.
+        prompt_input = "Please initiate the interview. Welcome me and follow your introduction instructions." if user_input == "INIT" else user_input
+
+        # Summary of older turns + recent turns, within the prompt token budget
+        history, token_stats = memory.build_history(system_prompt, session.transcript, prompt_input)
+        print(
+            f"[MEMORY] session={session_id} prompt_tokens={token_stats['prompt_tokens']}/{token_stats['budget']} "
+            f"system={token_stats['system_tokens']} summary={token_stats['summary_tokens']} "
+            f"turns={token_stats['turns']} ({token_stats['turn_tokens']} tokens, dropped {token_stats['dropped_turns']}) "
+            f"summarized_upto={token_stats['summarized_upto']}"
+        )
 
         # 4. Generate AI Response
         ai_response_chunks = []
-        # If user_input was INIT, request the AI to initiate the intro instead of simulating candidate readiness.
-        prompt_input = "Please initiate the interview. Welcome me and follow your introduction instructions." if user_input == "INIT" else user_input
         
         try:
             async for chunk in self.llm_service.generate_response(prompt_input, history=history):
@@ -210,7 +243,9 @@ class InterviewService:
             full_response = "".join(ai_response_chunks)
             if full_response.strip():
                 # 5. Update Transcript with AI Response
-                session.transcript.append({"role": "interviewer", "content": full_response})
+                message = {"role": "interviewer", "content": full_response, "timestamp": datetime.utcnow()}
+                session.transcript.append(message)
+                session.interviewer_turns += 1
                 
                 # Determine if finished based on LLM output
                 response_lower = full_response.lower()
@@ -223,29 +258,24 @@ class InterviewService:
                     "interview concluded"
                 ]):
                     session.stage = InterviewStage.FINISHED
-                    
-                import asyncio
+                    self.evaluations.flush(session_id)
                 
-                async def safe_db_update(sid, resp, stage_val):
-                    try:
-                        await self.db.interview_sessions.update_one(
-                            {"session_id": sid},
-                            {
-                                "$push": {"transcript": {"role": "interviewer", "content": resp, "timestamp": datetime.utcnow()}},
-                                "$set": {
-                                    "state_overrides.stage": stage_val
-                                }
-                            },
-                            upsert=False
-                        )
-                    except Exception as e:
-                        print(f"Error in safe DB update: {e}")
+                # Queued in memory, so the update survives task cancellation without a DB round trip
+                self.sessions.append_transcript(session_id, message)
+                self.sessions.set_fields(session_id, {
+                    "state_overrides.stage": session.stage.value,
+                    "state_overrides.interviewer_turns": session.interviewer_turns
+                })
 
-                # Using create_task to ensure DB update survives task cancellation
-                asyncio.create_task(safe_db_update(session_id, full_response, session.stage.value))
+                # Fold older turns into the summary before the candidate's next answer arrives
+                memory.schedule_summary(
+                    session.transcript,
+                    self.llm_service,
+                    on_update=lambda m: self.sessions.set_fields(session_id, {"memory": m.to_doc()})
+                )
 
     async def transcribe_audio(self, audio_bytes: bytes) -> str:
-        return await self.stt_service.transcribe(audio_bytes)
+        return await self.stt_service.transcribe_utterance(audio_bytes)
         
     async def generate_speech(self, text: str) -> Optional[bytes]:
         return await self.tts_service.generate_speech(text)
@@ -259,19 +289,29 @@ class InterviewService:
             return
         session, context = session_data
         
+        # Persist the queued transcript and wait for outstanding answer evaluations before reading them
+        await self.sessions.flush(session_id)
+        await self.evaluations.drain(session_id)
+        
         # 1. Calculate Scores from Evaluations
-        session_doc = await self.db.interview_sessions.find_one({"session_id": session_id})
-        evaluations = session_doc.get("answer_evaluations", [])
+        session_doc = await self.db.interview_sessions.find_one(
+            {"session_id": session_id},
+            {"answer_evaluations": 1, "status": 1, "candidate_id": 1, "job_id": 1}
+        )
+        # Sessions started before interview_turns keep their evaluations on the document
+        evaluations = session_doc.get("answer_evaluations", []) + await get_evaluations(self.db, session_id)
+        # Answers whose evaluation failed are recorded without scores and left out of the averages
+        scored = [ev for ev in evaluations if not ev.get("error")]
         
         tech_acc_sum = 0
         depth_sum = 0
         clarity_sum = 0
         conf_sum = 0
         
-        total_evals = len(evaluations)
+        total_evals = len(scored)
         
         if total_evals > 0:
-            for ev in evaluations:
+            for ev in scored:
                 scores = ev.get("scores", {})
                 tech_acc_sum += scores.get("technical_accuracy", 0)
                 depth_sum += scores.get("depth_of_explanation", 0)
@@ -305,7 +345,7 @@ class InterviewService:
             interview_score -= 15
             
         # Target questions is roughly 5-7 based on the flow. If they answered less than 3, penalized.
-        if total_evals < 3:
+        if len(evaluations) < 3:
             interview_score -= 10
             
         interview_score = max(0, min(100, interview_score))
@@ -328,7 +368,7 @@ class InterviewService:
         
         # 4. Generate Feedback using Gemini (NOT GROQ here)
         from agents.interview_agent.prompts import FINAL_FEEDBACK_REPORT_PROMPT
-        from cv_screener.gemini_screener import GeminiCVScreener
+        from cv_screener.gemini_screener import get_shared_screener
         
         feedback_prompt = FINAL_FEEDBACK_REPORT_PROMPT.format(
             cv_score=cv_score,
@@ -339,19 +379,9 @@ class InterviewService:
             status=status
         )
         
-        screener = GeminiCVScreener()
         # Using a raw call because the prompt is direct text 
         try:
-            import asyncio
-            loop = asyncio.get_event_loop()
-            res = await loop.run_in_executor(
-                None,
-                lambda: screener.client.models.generate_content(
-                    model=screener.MODEL_NAME,
-                    contents=feedback_prompt
-                )
-            )
-            feedback_report = res.text.strip()
+            feedback_report = await get_shared_screener().generate_text(feedback_prompt)
         except Exception as e:
             print(f"Error generating feedback report: {e}")
             feedback_report = "System encountered an error generating the detailed feedback report."
@@ -420,6 +450,10 @@ class InterviewService:
             detailed_analysis=feedback_report,
             recommendations="Ensure to review candidate's actual answers in the transcript if needed."
         )
+        
+        # The interview is over; free the cached session
+        context.memory.cancel()
+        await self.sessions.evict(session_id)
 
         return {
             "score": final_score,
@@ -0,0 +1,262 @@
+"""
+Latency Tracer
+==============
+
+Per-turn span tracing for the voice interview pipeline.
+
+A turn starts when the candidate's utterance (or text) reaches the server
+and ends when the last interviewer audio chunk has been sent. The active
+turn is carried in a context variable, so the STT, session, LLM and TTS
+layers record into it without passing it around; tasks created during the
+turn inherit it automatically.
+
+Recorded per turn (milliseconds from the start of the turn):
+- spans: stt, get_session, llm (request to last token)
+- marks: llm_first_token, tts_first_sentence (first sentence handed to TTS),
+  tts_first_audio, tts_last_audio
+
+Finished turns are kept in a rolling window from which p50/p95/p99 and a
+bucket histogram of time-to-first-token (TTFT) and time-to-first-audio
+(TTFA) are served to the superuser dashboard. Setting LATENCY_TRACE_FILE
+also appends them to a local JSONL file, rotated at LATENCY_TRACE_MAX_MB.
+"""
+
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+LATENCY_TRACE_ENABLED = os.getenv("LATENCY_TRACE_ENABLED", "true").lower() in {"1", "true", "yes", "y", "on"}
+# Empty disables the JSONL export; the in-memory window is always kept
+LATENCY_TRACE_FILE = os.getenv("LATENCY_TRACE_FILE", "")
+LATENCY_TRACE_MAX_MB = float(os.getenv("LATENCY_TRACE_MAX_MB", "50"))
+LATENCY_TRACE_WINDOW = int(os.getenv("LATENCY_TRACE_WINDOW", "2000"))
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended
+HISTOGRAM_BUCKETS_MS = [100, 250, 500, 750, 1000, 1500, 2000, 3000, 5000]
+
+_current_turn: contextvars.ContextVar[Optional["TurnTrace"]] = contextvars.ContextVar("latency_turn", default=None)
+
+
+class TurnTrace:
+    """Timings of one candidate -> interviewer turn."""
+
+    def __init__(self, session_id: str, source: str):
+        self.session_id = session_id
+        self.turn_id = uuid.uuid4().hex[:12]
+        self.source = source
+        self.started_at = time.perf_counter()
+        self.wall_started_at = datetime.utcnow()
+        self.spans: List[Dict[str, Any]] = []
+        self.marks: Dict[str, float] = {}
+        self.finished = False
+
+    def _offset_ms(self, at: Optional[float] = None) -> float:
+        return round(((at if at is not None else time.perf_counter()) - self.started_at) * 1000, 1)
+
+    def mark(self, name: str):
+        """Record a point in time; only the first occurrence counts."""
+        if name not in self.marks:
+            self.marks[name] = self._offset_ms()
+
+    @contextmanager
+    def span(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.spans.append({
+                "name": name,
+                "start_ms": self._offset_ms(started),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            })
+
+    def to_record(self, status: str) -> Dict[str, Any]:
+        return {
+            "turn_id": self.turn_id,
+            "session_id": self.session_id,
+            "source": self.source,
+            "status": status,
+            "started_at": self.wall_started_at.isoformat() + "Z",
+            "total_ms": self._offset_ms(),
+            "ttft_ms": self.marks.get("llm_first_token"),
+            "ttfa_ms": self.marks.get("tts_first_audio"),
+            "spans": self.spans,
+            "marks": self.marks,
+        }
+
+
+class JSONLExporter:
+    """
+    Appends finished turns to a local JSONL file off the event loop.
+
+    Writes go through the exporter's own single writer thread, in order, so
+    slow disk never holds up the default executor that other blocking work
+    (file reads, the TTS cache) shares.
+
+    Once the file reaches max_bytes it is renamed to ``<path>.1`` (replacing
+    the previous one), so at most two files' worth of turns are kept on disk.
+    """
+
+    def __init__(self, path: str = LATENCY_TRACE_FILE, max_bytes: int = int(LATENCY_TRACE_MAX_MB * 1024 * 1024)):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="latency-trace")
+
+    def _rotate(self):
+        try:
+            if os.path.getsize(self.path) >= self.max_bytes:
+                os.replace(self.path, self.path + ".1")
+        except FileNotFoundError:
+            pass
+
+    def _write(self, line: str):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            if self.max_bytes > 0:
+                self._rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def _write_logged(self, line: str):
+        try:
+            self._write(line)
+        except OSError as e:
+            print(f"[WARNING] Latency trace write failed: {e}")
+
+    def export(self, record: Dict[str, Any]):
+        line = json.dumps(record, default=str)
+        try:
+            self._executor.submit(self._write_logged, line)
+        except RuntimeError:
+            # Already closed (application shutdown)
+            self._write_logged(line)
+
+    def close(self):
+        """Finish the queued writes and stop the writer thread."""
+        self._executor.shutdown(wait=True)
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(values: List[float]) -> Dict[str, Any]:
+    """Count, mean, max, p50/p95/p99 and bucket histogram of latencies in ms."""
+    ordered = sorted(values)
+    buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+    for value in ordered:
+        index = next((i for i, bound in enumerate(HISTOGRAM_BUCKETS_MS) if value <= bound), len(HISTOGRAM_BUCKETS_MS))
+        buckets[index] += 1
+    labels = [f"<={bound}" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}"]
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 1) if ordered else None,
+        "max": ordered[-1] if ordered else None,
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "histogram": dict(zip(labels, buckets)),
+    }
+
+
+class LatencyTracer:
+    """
+    Starts and finishes turn traces and aggregates them.
+
+    Attributes:
+        exporter: Where finished turns are written (None disables the file)
+        window: Number of recent turns kept for percentiles
+    """
+
+    def __init__(self, exporter: Optional[JSONLExporter] = None, window: int = LATENCY_TRACE_WINDOW, enabled: bool = LATENCY_TRACE_ENABLED):
+        self.exporter = exporter
+        self.enabled = enabled
+        self._recent: "deque[Dict[str, Any]]" = deque(maxlen=window)
+
+    def start_turn(self, session_id: str, source: str) -> Optional[TurnTrace]:
+        """Begin a turn and make it the current one for this task and its children."""
+        if not self.enabled:
+            return None
+        turn = TurnTrace(session_id, source)
+        _current_turn.set(turn)
+        return turn
+
+    def finish_turn(self, turn: Optional[TurnTrace], status: str = "ok"):
+        if turn is None or turn.finished:
+            return
+        turn.finished = True
+        record = turn.to_record(status)
+        self._recent.append(record)
+        if self.exporter is not None:
+            try:
+                self.exporter.export(record)
+            except Exception as e:
+                print(f"[WARNING] Latency trace export failed: {e}")
+        print(
+            f"[LATENCY] session={turn.session_id} turn={turn.turn_id} status={status} "
+            f"ttft={record['ttft_ms']}ms ttfa={record['ttfa_ms']}ms total={record['total_ms']}ms"
+        )
+
+    def stats(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        records = [r for r in self._recent if session_id is None or r["session_id"] == session_id]
+        completed = [r for r in records if r["status"] == "ok"]
+        span_totals: Dict[str, List[float]] = {}
+        for record in completed:
+            for span in record["spans"]:
+                span_totals.setdefault(span["name"], []).append(span["duration_ms"])
+        return {
+            "turns": len(records),
+            "interrupted": sum(1 for r in records if r["status"] != "ok"),
+            "ttft_ms": summarize([r["ttft_ms"] for r in completed if r["ttft_ms"] is not None]),
+            "ttfa_ms": summarize([r["ttfa_ms"] for r in completed if r["ttfa_ms"] is not None]),
+            "total_ms": summarize([r["total_ms"] for r in completed]),
+            "spans_ms": {name: summarize(values) for name, values in span_totals.items()},
+        }
+
+    def reset(self):
+        """Forget the aggregated turns (e.g. between load-test levels)."""
+        self._recent.clear()
+
+    def recent(self, session_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        records = [r for r in self._recent if session_id is None or r["session_id"] == session_id]
+        return records[-limit:]
+
+
+def current_turn() -> Optional[TurnTrace]:
+    return _current_turn.get()
+
+
+def mark(name: str):
+    """Record a point in the current turn, if any."""
+    turn = _current_turn.get()
+    if turn is not None:
+        turn.mark(name)
+
+
+@contextmanager
+def span(name: str):
+    """Time a block within the current turn, if any."""
+    turn = _current_turn.get()
+    if turn is None:
+        yield None
+        return
+    with turn.span(name):
+        yield turn
+
+
+# Shared by the WebSocket routes and the superuser dashboard
+default_tracer = LatencyTracer(exporter=JSONLExporter() if LATENCY_TRACE_FILE else None)
@@ -3,6 +3,8 @@ from groq import AsyncGroq
 from typing import List, Dict, AsyncGenerator
 from dotenv import load_dotenv
 
+from services import latency_tracer
+
 # Ensure environment variables are loaded
 load_dotenv()
 
@@ -14,6 +16,8 @@ class LLMService:
         
         self.client = AsyncGroq(api_key=self.api_key)
         self.model = "llama-3.3-70b-versatile" # Powerful and free on Groq
+        # Small, fast model for background housekeeping such as conversation summaries
+        self.summary_model = os.getenv("LLM_SUMMARY_MODEL", "llama-3.1-8b-instant")
 
     async def generate_response(self, prompt: str, history: List[Dict[str, str]] = None) -> AsyncGenerator[str, None]:
         """
@@ -38,17 +42,20 @@ class LLMService:
         # Simpler approach: treat prompt as the latest user message or system message?
         messages.append({"role": "user", "content": prompt})
 
-        stream = await self.client.chat.completions.create(
-            messages=messages,
-            model=self.model,
-            stream=True,
-            temperature=0.6
-        )
-        
-        async for chunk in stream:
-            content = chunk.choices[0].delta.content
-            if content:
-                yield content
+        # Request to last token; the first token is marked separately (TTFT)
+        with latency_tracer.span("llm"):
+            stream = await self.client.chat.completions.create(
+                messages=messages,
+                model=self.model,
+                stream=True,
+                temperature=0.6
+            )
+            
+            async for chunk in stream:
+                content = chunk.choices[0].delta.content
+                if content:
+                    latency_tracer.mark("llm_first_token")
+                    yield content
 
     async def generate_json_response(self, prompt: str) -> str:
         """
@@ -61,6 +68,18 @@ class LLMService:
         )
         return completion.choices[0].message.content
 
+    async def generate_summary(self, prompt: str, max_tokens: int = 512) -> str:
+        """
+        Generates a short plain-text completion with the summary model (non-streaming).
+        """
+        completion = await self.client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=self.summary_model,
+            temperature=0.2,
+            max_tokens=max_tokens
+        )
+        return (completion.choices[0].message.content or "").strip()
+
     async def evaluate_answer_groq(self, question: str, answer: str) -> Dict[str, float]:
         from agents.interview_agent.prompts import INTERVIEW_ANSWER_EVALUATION_PROMPT
         import json
@@ -84,3 +103,38 @@ class LLMService:
                 "confidence_level": 0
             }
 
+    async def evaluate_answers_batch(self, pairs: List[Dict[str, str]]) -> List[Dict[str, float]]:
+        """
+        Evaluates several question/answer pairs in one JSON call.
+        Returns one score dict per pair, in order; pairs the model skipped score 0.
+        Raises if the call fails or returns invalid JSON, so the caller can retry.
+        """
+        from agents.interview_agent.prompts import INTERVIEW_BATCH_EVALUATION_PROMPT
+        import json
+
+        items = "\n\n".join(
+            f"[{index}]\nQuestion:\n{pair['question']}\n\nCandidate Answer:\n{pair['answer']}"
+            for index, pair in enumerate(pairs)
+        )
+        prompt = INTERVIEW_BATCH_EVALUATION_PROMPT.format(items=items)
+        empty = {
+            "technical_accuracy": 0,
+            "depth_of_explanation": 0,
+            "clarity": 0,
+            "confidence_level": 0
+        }
+        res_str = await self.generate_json_response(prompt)
+        entries = json.loads(res_str).get("evaluations", [])
+
+        results = [dict(empty) for _ in pairs]
+        for position, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                continue
+            index = entry.get("index", position)
+            if not isinstance(index, int) or not 0 <= index < len(pairs):
+                continue
+            try:
+                results[index] = {key: float(entry.get(key, 0)) for key in empty}
+            except (TypeError, ValueError):
+                pass
+        return results
@@ -0,0 +1,138 @@
+"""
+Sentence Segmenter
+==================
+
+Incremental sentence splitter for the LLM -> TTS bridge.
+
+Tokens are fed as they stream in; only text not yet examined is scanned,
+and a sentence is released as soon as its boundary is certain. A period is
+not a boundary when it belongs to:
+- a number ("3.5", "v2.0")
+- a known abbreviation ("e.g.", "Dr.", "etc.") or a single-letter initial
+- an ellipsis or punctuation run that has not finished yet
+
+Fast first utterance: until the first sentence of a response has been
+released, the segmenter may also cut at a clause boundary (",", ";", ":",
+dash) once ``first_clause_words`` words have accumulated, so TTS can start
+on "Great question, ..." without waiting for the full sentence.
+"""
+
+import os
+from typing import List
+
+TTS_FAST_FIRST_WORDS = int(os.getenv("TTS_FAST_FIRST_WORDS", "6"))
+
+TERMINATORS = ".!?"
+CLAUSE_MARKS = ",;:"
+CLOSERS = "\"')]}’”"
+
+ABBREVIATIONS = {
+    "e.g", "i.e", "etc", "vs", "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st",
+    "inc", "ltd", "corp", "approx", "dept", "fig", "vol", "jan",
+    "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+    "a.m", "p.m", "u.s", "u.k", "ph.d", "b.sc", "m.sc",
+}
+
+
+class SentenceSegmenter:
+    """
+    Stateful splitter; create one per response.
+
+    Attributes:
+        first_clause_words: Words needed before a clause boundary may end the
+            first utterance (0 disables the fast first utterance)
+        min_chars: Shorter pieces are merged into the following sentence
+    """
+
+    def __init__(self, first_clause_words: int = TTS_FAST_FIRST_WORDS, min_chars: int = 4):
+        self.first_clause_words = first_clause_words
+        self.min_chars = min_chars
+        self._buffer = ""
+        self._scan = 0          # next index of _buffer to examine
+        self._emitted_any = False
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text; returns the sentences completed by it."""
+        self._buffer += text
+        sentences = []
+        start = 0
+        i = self._scan
+        n = len(self._buffer)
+
+        while i < n:
+            char = self._buffer[i]
+            if char in TERMINATORS:
+                end = self._boundary_end(i)
+                if end is None:
+                    # Cannot decide until more text arrives
+                    break
+                if end > 0:
+                    start = self._take(start, end, sentences)
+                    i = end
+                    continue
+            elif (char in CLAUSE_MARKS or char in "—–") and self._fast_first_pending():
+                if i + 1 >= n:
+                    break
+                if self._buffer[i + 1].isspace() and len(self._buffer[start:i].split()) >= self.first_clause_words:
+                    start = self._take(start, i + 1, sentences)
+            i += 1
+
+        self._buffer = self._buffer[start:]
+        self._scan = max(i - start, 0)
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever text is left at the end of the response."""
+        rest = self._buffer.strip()
+        self._buffer = ""
+        self._scan = 0
+        return [rest] if rest else []
+
+    def _take(self, start: int, end: int, sentences: List[str]) -> int:
+        """Release buffer[start:end] unless it is too short to speak on its own."""
+        sentence = self._buffer[start:end].strip()
+        if len(sentence) < self.min_chars:
+            return start
+        sentences.append(sentence)
+        self._emitted_any = True
+        return end
+
+    def _boundary_end(self, i: int):
+        """
+        Decide whether the terminator at i ends a sentence.
+
+        Returns the index just past the sentence (including closing quotes),
+        0 if it is not a boundary, or None if more text is needed.
+        """
+        buffer = self._buffer
+        n = len(buffer)
+        j = i
+        while j < n and buffer[j] in TERMINATORS:
+            j += 1
+        while j < n and buffer[j] in CLOSERS:
+            j += 1
+        if j >= n:
+            return None
+        if not buffer[j].isspace():
+            # "3.5", "e.g.x", "file.py" - not a sentence end
+            return 0
+        if buffer[i] == "." and j == i + 1 and self._is_abbreviation(i):
+            return 0
+        return j
+
+    def _is_abbreviation(self, i: int) -> bool:
+        """True if the period at i closes an abbreviation or an initial."""
+        k = i
+        while k > 0 and not self._buffer[k - 1].isspace() and self._buffer[k - 1] not in "(\"'":
+            k -= 1
+        word = self._buffer[k:i].lower()
+        if not word:
+            return False
+        if word in ABBREVIATIONS:
+            return True
+        # Single-letter initials such as "J. Smith"
+        return len(word) == 1 and word.isalpha()
+
+    def _fast_first_pending(self) -> bool:
+        """True while a clause boundary may still end the first utterance."""
+        return not self._emitted_any and self.first_clause_words > 0
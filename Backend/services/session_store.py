@@ -0,0 +1,247 @@
+"""
+Interview Session Store
+========================
+
+Per-process, write-behind cache of hydrated interview sessions.
+
+The interview loop used to re-read the whole ``interview_sessions``
+document (transcript, context, CV JSON) several times per turn. Sessions
+are now loaded once, kept in memory while the interview is live, and
+mutations are queued and flushed to MongoDB by a background task:
+- transcript messages get a per-session seq and are written to the
+  append-only ``interview_turns`` collection with one bulk insert
+- field updates are merged into one ``$set`` on the session document
+
+A load reads the session document plus only the last
+``SESSION_TRANSCRIPT_TAIL`` messages; older context comes from the
+conversation summary. Sessions created before ``interview_turns`` existed
+keep their ``transcript`` array, which is read as the first messages.
+
+Idle sessions are flushed and evicted after ``idle_ttl`` seconds. The
+cache is per process, which matches how interviews are served: the
+WebSocket (and the REST fallbacks) for a session stay on one worker.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from database.interview_turn_crud import TURN_MESSAGE, get_recent_messages, insert_turns
+
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "1.0"))
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "1800"))
+SESSION_TRANSCRIPT_TAIL = int(os.getenv("SESSION_TRANSCRIPT_TAIL", "40"))
+
+
+class SessionEntry:
+    """A hydrated session plus the writes not yet persisted."""
+
+    def __init__(self, session_id: str, state: Any, context: Any, meta: Dict[str, Any], next_seq: int = 0):
+        self.session_id = session_id
+        self.state = state
+        self.context = context
+        # Immutable document fields that callers need without a read (job_id, candidate_id, ...)
+        self.meta = meta
+        # seq of the next transcript message
+        self.next_seq = next_seq
+        self.pending_push: List[dict] = []
+        self.pending_set: Dict[str, Any] = {}
+        self.last_access = time.monotonic()
+        # One flush at a time, so an older $set can never land after a newer one
+        self.flush_lock = asyncio.Lock()
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.pending_push or self.pending_set)
+
+
+class SessionStore:
+    """
+    Write-behind session cache.
+
+    Attributes:
+        flush_interval: Seconds between background flushes
+        idle_ttl: Seconds without access after which a session is evicted
+    """
+
+    def __init__(
+        self,
+        db,
+        hydrate: Callable[[dict, List[dict]], tuple],
+        flush_interval: float = SESSION_FLUSH_INTERVAL,
+        idle_ttl: float = SESSION_IDLE_TTL,
+        transcript_tail: int = SESSION_TRANSCRIPT_TAIL,
+    ):
+        self.db = db
+        self._hydrate = hydrate
+        self.flush_interval = flush_interval
+        self.idle_ttl = idle_ttl
+        self.transcript_tail = transcript_tail
+        self._entries: Dict[str, SessionEntry] = {}
+        self._loading: Dict[str, Awaitable] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._stats = {"hits": 0, "loads": 0, "flushes": 0, "flushed_entries": 0, "evictions": 0, "errors": 0}
+
+    # ---- reads -------------------------------------------------------------
+
+    async def get(self, session_id: str) -> Optional[SessionEntry]:
+        """Return the cached session, loading it from MongoDB on first use."""
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            entry.last_access = time.monotonic()
+            self._stats["hits"] += 1
+            return entry
+
+        # Concurrent first accesses share one read
+        loading = self._loading.get(session_id)
+        if loading is None:
+            loading = asyncio.ensure_future(self._load(session_id))
+            self._loading[session_id] = loading
+            loading.add_done_callback(lambda _: self._loading.pop(session_id, None))
+        return await asyncio.shield(loading)
+
+    def peek(self, session_id: str) -> Optional[SessionEntry]:
+        """Return the session if it is loaded in this process, without reading MongoDB."""
+        return self._entries.get(session_id)
+
+    async def _load(self, session_id: str) -> Optional[SessionEntry]:
+        doc = await self.db.interview_sessions.find_one(
+            {"session_id": session_id},
+            # Evaluations and the report are only needed at finalisation
+            {"answer_evaluations": 0},
+        )
+        if not doc:
+            return None
+        self._stats["loads"] += 1
+
+        # Legacy sessions keep their first messages in the document array
+        legacy = [{**message, "seq": index} for index, message in enumerate(doc.pop("transcript", None) or [])]
+        recent = await get_recent_messages(self.db, session_id, self.transcript_tail)
+        messages = (legacy + recent)[-self.transcript_tail:]
+        next_seq = max(len(legacy), messages[-1]["seq"] + 1 if messages else 0)
+
+        state, context = self._hydrate(doc, messages)
+        meta = {key: doc.get(key) for key in ("job_id", "candidate_id", "created_at")}
+        return self.add(session_id, state, context, meta, next_seq=next_seq)
+
+    def add(self, session_id: str, state: Any, context: Any, meta: Optional[Dict[str, Any]] = None, next_seq: int = 0) -> SessionEntry:
+        """Register a session that is already persisted (e.g. right after insert)."""
+        existing = self._entries.get(session_id)
+        if existing is not None:
+            return existing
+        entry = SessionEntry(session_id, state, context, meta or {}, next_seq=next_seq)
+        self._entries[session_id] = entry
+        self._ensure_flusher()
+        return entry
+
+    # ---- writes ------------------------------------------------------------
+
+    def append_transcript(self, session_id: str, message: dict) -> Optional[int]:
+        """
+        Queue a transcript message (the caller has already appended it to state.transcript).
+
+        Returns:
+            The seq assigned to the message (also stored in it), or None if the session is not loaded
+        """
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        message["seq"] = entry.next_seq
+        entry.next_seq += 1
+        entry.pending_push.append(message)
+        entry.last_access = time.monotonic()
+        self._ensure_flusher()
+        return message["seq"]
+
+    def set_fields(self, session_id: str, fields: Dict[str, Any]):
+        """Queue a $set of document fields; later values for a field win."""
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return
+        entry.pending_set.update(fields)
+        entry.last_access = time.monotonic()
+        self._ensure_flusher()
+
+    async def flush(self, session_id: Optional[str] = None):
+        """Persist queued writes for one session, or for every session."""
+        if session_id is not None:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                await self._flush_entry(entry)
+            return
+        await asyncio.gather(*(self._flush_entry(e) for e in list(self._entries.values()) if e.dirty))
+
+    async def _flush_entry(self, entry: SessionEntry):
+        # The background flusher, finalize and eviction may flush the same session concurrently
+        async with entry.flush_lock:
+            if not entry.dirty:
+                return
+            # Take ownership of the queued writes before awaiting so new writes queue up behind them
+            pushes, entry.pending_push = entry.pending_push, []
+            sets, entry.pending_set = entry.pending_set, {}
+            try:
+                # Turn ids are deterministic, so retrying after a partial insert is safe
+                await insert_turns(self.db, entry.session_id, TURN_MESSAGE, pushes)
+                self._stats["flushed_entries"] += len(pushes)
+                pushes = []
+                if sets:
+                    await self.db.interview_sessions.update_one({"session_id": entry.session_id}, {"$set": sets})
+                self._stats["flushes"] += 1
+            except Exception as e:
+                self._stats["errors"] += 1
+                print(f"[WARNING] Session {entry.session_id} flush failed, will retry: {e}")
+                # Put the writes back in front, keeping transcript order
+                entry.pending_push = pushes + entry.pending_push
+                entry.pending_set = {**sets, **entry.pending_set}
+
+    async def evict(self, session_id: str):
+        """Flush and drop a session from memory."""
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return
+        await self._flush_entry(entry)
+        if not entry.dirty:
+            self._entries.pop(session_id, None)
+            self._stats["evictions"] += 1
+
+    # ---- background flusher -----------------------------------------------
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and not self._flusher.done():
+            return
+        try:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+        except RuntimeError:
+            # No running loop (e.g. called from sync code); the next async access starts it
+            self._flusher = None
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                now = time.monotonic()
+                for session_id, entry in list(self._entries.items()):
+                    if now - entry.last_access > self.idle_ttl:
+                        await self.evict(session_id)
+            except Exception as e:
+                print(f"[WARNING] Session flusher error: {e}")
+
+    async def close(self):
+        """Stop the flusher and persist everything (called on shutdown)."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "active_sessions": len(self._entries),
+            "dirty_sessions": sum(1 for e in self._entries.values() if e.dirty),
+        }
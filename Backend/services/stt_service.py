@@ -1,6 +1,31 @@
 import os
-from groq import Groq
 import io
+import asyncio
+import time
+import wave
+from typing import Awaitable, Callable, List, Optional
+
+import httpx
+import numpy as np
+from groq import AsyncGroq
+
+from services.vad import VAD_TARGET_RATE, downmix_resample, prepare_utterance, trim_silence
+
+# Shared HTTP pool and concurrency cap for Whisper calls
+STT_MAX_CONNECTIONS = int(os.getenv("STT_MAX_CONNECTIONS", "20"))
+STT_MAX_CONCURRENCY = max(1, int(os.getenv("STT_MAX_CONCURRENCY", "8")))
+STT_TIMEOUT = float(os.getenv("STT_TIMEOUT", "30"))
+
+# Streaming segmentation (16-bit PCM input)
+STT_SEGMENT_SILENCE_MS = int(os.getenv("STT_SEGMENT_SILENCE_MS", "500"))
+STT_SILENCE_RMS = float(os.getenv("STT_SILENCE_RMS", "500"))
+STT_MAX_SEGMENT_SECONDS = float(os.getenv("STT_MAX_SEGMENT_SECONDS", "15"))
+# PCM sample rates a streaming client may announce
+STT_SAMPLE_RATES = (8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000)
+STT_DEFAULT_SAMPLE_RATE = 16000
+
+STT_MODEL = "whisper-large-v3-turbo" # Fast and accurate
+
 
 class STTService:
     def __init__(self):
@@ -8,27 +33,202 @@ class STTService:
         if not self.api_key:
             # Fallback or allow lazy loading if user hasn't set it yet
              print("GROQ_API_KEY environment variable not set")
-        self.client = Groq(api_key=self.api_key)
+        # Async client on a pooled HTTP transport: transcription never blocks the event loop
+        self.client = AsyncGroq(
+            api_key=self.api_key,
+            http_client=httpx.AsyncClient(
+                timeout=STT_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=STT_MAX_CONNECTIONS,
+                    max_keepalive_connections=STT_MAX_CONNECTIONS
+                )
+            )
+        )
+        self._semaphore = asyncio.Semaphore(STT_MAX_CONCURRENCY)
 
-    async def transcribe(self, audio_bytes: bytes) -> str:
+    async def transcribe(self, audio_bytes: bytes, file_name: str = "audio.webm") -> str:
         """
         Transcribes audio bytes to text using Groq (Whisper).
+        The file name's extension tells Groq the container format.
         """
         try:
-            # Create a file-like object
-            audio_file = io.BytesIO(audio_bytes)
-            audio_file.name = "audio.webm" # Necessary for Groq to detect type
-
-            transcription = self.client.audio.transcriptions.create(
-                file=(audio_file.name, audio_file.read()),
-                model="whisper-large-v3-turbo", # Fast and accurate
-                response_format="json",
-                language="en",
-                temperature=0.0
-            )
+            async with self._semaphore:
+                transcription = await self.client.audio.transcriptions.create(
+                    file=(file_name, audio_bytes),
+                    model=STT_MODEL,
+                    response_format="json",
+                    language="en",
+                    temperature=0.0
+                )
             return transcription.text
         except Exception as e:
             import traceback
             traceback.print_exc()
             print(f"STT Error: {e}")
             return ""
+
+    async def transcribe_utterance(self, audio_bytes: bytes, file_name: str = "audio.webm") -> str:
+        """
+        Transcribes one complete candidate utterance after voice activity
+        detection; silent utterances never reach Whisper.
+        """
+        prepared = await prepare_utterance(audio_bytes, file_name)
+        if not prepared["speech"]:
+            return ""
+        return await self.transcribe(prepared["audio"], file_name=prepared["file_name"])
+
+    def streaming(self, sample_rate: int = 16000, on_partial=None) -> "StreamingTranscriber":
+        """Start an incremental transcription of one utterance (see StreamingTranscriber)."""
+        return StreamingTranscriber(self, sample_rate=sample_rate, on_partial=on_partial)
+
+
+def pcm16_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """Wrap mono 16-bit little-endian PCM in a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class StreamingTranscriber:
+    """
+    Transcribes one utterance while it is still being spoken.
+
+    Audio arrives as mono 16-bit PCM chunks via ``feed``. Whenever the
+    speaker pauses for ``silence_ms`` (or a segment reaches
+    ``max_segment_seconds``) the segment is cut and sent to Whisper in the
+    background, so by the time ``finish`` is called only the last segment
+    is still in flight. ``on_partial`` receives the transcript of every
+    segment finished so far, in order.
+    """
+
+    FRAME_MS = 20
+
+    def __init__(
+        self,
+        stt: STTService,
+        sample_rate: int = 16000,
+        on_partial: Optional[Callable[[str], Awaitable[None]]] = None,
+        silence_ms: int = STT_SEGMENT_SILENCE_MS,
+        silence_rms: float = STT_SILENCE_RMS,
+        max_segment_seconds: float = STT_MAX_SEGMENT_SECONDS,
+    ):
+        self.stt = stt
+        self.sample_rate = sample_rate
+        self.on_partial = on_partial
+        self.silence_rms = silence_rms
+        self._frame_bytes = sample_rate * self.FRAME_MS // 1000 * 2
+        self._silence_frames = max(1, silence_ms // self.FRAME_MS)
+        self._max_segment_bytes = int(max_segment_seconds * sample_rate) * 2
+
+        self._buffer = bytearray()      # current segment
+        self._scanned = 0               # bytes of _buffer already classified
+        self._heard_speech = False
+        self._trailing_silence = 0      # consecutive silent frames at the end of _buffer
+        self._tasks: List[asyncio.Task] = []
+        self._texts: List[Optional[str]] = []
+        self._emitted = 0
+        self._bytes_in = 0
+        self._bytes_out = 0
+        self._started_at = time.perf_counter()
+
+    def feed(self, pcm: bytes):
+        """
+        Add audio; cuts and dispatches a segment at each detected pause.
+
+        Chunks need not hold whole samples: only whole frames are scanned, and
+        a trailing partial sample is carried over until the next chunk.
+        """
+        self._buffer.extend(pcm)
+        usable = len(self._buffer) - (len(self._buffer) - self._scanned) % self._frame_bytes
+        if usable <= self._scanned:
+            return
+
+        frames = np.frombuffer(bytes(self._buffer[self._scanned:usable]), dtype="<i2").astype(np.float32)
+        frames = frames.reshape(-1, self._frame_bytes // 2)
+        silent = np.sqrt(np.mean(frames * frames, axis=1)) < self.silence_rms
+
+        for index, is_silent in enumerate(silent):
+            end = self._scanned + (index + 1) * self._frame_bytes
+            if is_silent:
+                self._trailing_silence += 1
+            else:
+                self._heard_speech = True
+                self._trailing_silence = 0
+            paused = self._heard_speech and self._trailing_silence >= self._silence_frames
+            if paused or end >= self._max_segment_bytes:
+                self._cut(end)
+                self._scanned = 0
+                # Re-scan whatever followed the cut point
+                if self._buffer:
+                    self.feed(b"")
+                return
+        self._scanned = usable
+
+    def _cut(self, end: int):
+        segment, self._buffer = bytes(self._buffer[:end]), self._buffer[end:]
+        speech = self._heard_speech
+        self._heard_speech = False
+        self._trailing_silence = 0
+        if speech:
+            self._dispatch(segment)
+
+    def _dispatch(self, segment: bytes):
+        # Trim the pause edges and send 16 kHz audio whatever rate the client captured at
+        segment = segment[: len(segment) - len(segment) % 2]
+        samples = np.frombuffer(segment, dtype="<i2").astype(np.float32) / 32768.0
+        samples = trim_silence(downmix_resample(samples, self.sample_rate))
+        if samples is None:
+            return
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+        self._bytes_in += len(segment)
+        self._bytes_out += len(pcm)
+        index = len(self._texts)
+        self._texts.append(None)
+        self._tasks.append(asyncio.create_task(self._transcribe_segment(index, pcm)))
+
+    async def _transcribe_segment(self, index: int, pcm: bytes):
+        text = await self.stt.transcribe(pcm16_to_wav(pcm, VAD_TARGET_RATE), file_name=f"segment_{index}.wav")
+        self._texts[index] = (text or "").strip()
+        # Report the longest finished prefix so partials never skip a segment
+        ready = 0
+        while ready < len(self._texts) and self._texts[ready] is not None:
+            ready += 1
+        if ready > self._emitted and self.on_partial is not None:
+            self._emitted = ready
+            try:
+                await self.on_partial(self._join(self._texts[:ready]))
+            except Exception as e:
+                print(f"STT partial callback error: {e}")
+
+    @staticmethod
+    def _join(texts) -> str:
+        return " ".join(t for t in texts if t)
+
+    async def finish(self) -> str:
+        """Flush the last segment and return the full transcript."""
+        finish_started = time.perf_counter()
+        # Drop a dangling half sample the client never completed
+        if len(self._buffer) % 2:
+            del self._buffer[-1]
+        if self._buffer:
+            self.feed(b"")
+            if self._heard_speech:
+                self._cut(len(self._buffer))
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        transcript = self._join(self._texts)
+        print(
+            f"[STT] segments={len(self._texts)} pcm_bytes {self._bytes_in}->{self._bytes_out} "
+            f"utterance={(finish_started - self._started_at) * 1000:.0f}ms "
+            f"final_wait={(time.perf_counter() - finish_started) * 1000:.0f}ms"
+        )
+        return transcript
+
+    def cancel(self):
+        """Abandon the utterance (connection closed)."""
+        for task in self._tasks:
+            task.cancel()
@@ -0,0 +1,214 @@
+"""
+TTS Phrase Cache
+================
+
+Content-addressed cache of synthesized interviewer audio.
+
+Greetings, transitions and closing lines repeat across every interview,
+so their MP3s are kept instead of being re-synthesized by Edge TTS. Keys
+are SHA-256 of (voice, normalized sentence text). One-off LLM sentences
+are not worth keeping: a clip is only admitted once the same sentence has
+been rendered TTS_CACHE_MIN_RENDERS times, unless it is stored explicitly
+(the stock phrases pre-rendered at startup). Two tiers:
+- an in-memory LRU of the hottest clips
+- a size-bounded LRU directory on local disk (file mtime is the recency,
+  so the order survives restarts)
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "y", "on"}
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "uploads/tts_cache")
+TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", "200"))
+TTS_CACHE_MEMORY_ENTRIES = int(os.getenv("TTS_CACHE_MEMORY_ENTRIES", "256"))
+TTS_CACHE_MIN_RENDERS = max(1, int(os.getenv("TTS_CACHE_MIN_RENDERS", "2")))
+
+# Sentences rendered but not yet admitted; oldest are forgotten beyond this
+_RENDER_COUNTS_MAX = 4096
+
+_QUOTES = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"', "–": "-", "—": "-"})
+
+
+def normalize_phrase(text: str) -> str:
+    """Canonical form of a sentence for cache lookups (spacing and typography only; wording is kept)."""
+    text = unicodedata.normalize("NFKC", text or "").translate(_QUOTES)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class TTSPhraseCache:
+    """
+    Two-tier (memory + disk) LRU of synthesized audio.
+
+    Attributes:
+        directory: Where clips are stored on disk
+        max_bytes: Disk budget; least recently used clips are deleted beyond it
+        memory_entries: Number of clips kept in memory
+        min_renders: Renders of a sentence before its clip is admitted
+    """
+
+    def __init__(
+        self,
+        directory: str = TTS_CACHE_DIR,
+        max_bytes: int = int(TTS_CACHE_MAX_MB * 1024 * 1024),
+        memory_entries: int = TTS_CACHE_MEMORY_ENTRIES,
+        enabled: bool = TTS_CACHE_ENABLED,
+        min_renders: int = TTS_CACHE_MIN_RENDERS,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.enabled = enabled
+        self.min_renders = min_renders
+        self._renders: "OrderedDict[str, int]" = OrderedDict()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._disk: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._disk_bytes = 0
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0, "not_admitted": 0}
+
+    @staticmethod
+    def make_key(voice: str, text: str) -> str:
+        return hashlib.sha256(f"{voice}|{normalize_phrase(text)}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def _scan(self):
+        """Index the clips already on disk, least recently used first."""
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".mp3"):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._loaded = True
+
+    async def _ensure_loaded(self):
+        if not self._loaded:
+            async with self._lock:
+                if not self._loaded:
+                    await asyncio.to_thread(self._scan)
+
+    def _remember(self, key: str, audio: bytes):
+        self._memory[key] = audio
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, voice: str, text: str) -> Optional[bytes]:
+        """Return cached audio for a sentence, or None."""
+        if not self.enabled:
+            return None
+        key = self.make_key(voice, text)
+
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            return audio
+
+        await self._ensure_loaded()
+        if key in self._disk:
+            try:
+                audio = await asyncio.to_thread(self._read_and_touch, key)
+            except OSError:
+                self._forget(key)
+                audio = None
+            if audio:
+                self._disk.move_to_end(key)
+                self._remember(key, audio)
+                self._stats["disk_hits"] += 1
+                return audio
+
+        self._stats["misses"] += 1
+        return None
+
+    def _read_and_touch(self, key: str) -> bytes:
+        path = self._path(key)
+        with open(path, "rb") as f:
+            audio = f.read()
+        # mtime doubles as the LRU timestamp across restarts
+        os.utime(path, None)
+        return audio
+
+    def _forget(self, key: str):
+        size = self._disk.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    def _admit(self, key: str) -> bool:
+        """Count a render of a sentence; True once it has recurred often enough to keep."""
+        count = self._renders.pop(key, 0) + 1
+        if count >= self.min_renders:
+            return True
+        self._renders[key] = count
+        while len(self._renders) > _RENDER_COUNTS_MAX:
+            self._renders.popitem(last=False)
+        return False
+
+    async def set(self, voice: str, text: str, audio: bytes, force: bool = False):
+        """
+        Store a clip in both tiers, evicting old clips beyond the disk budget.
+        Without force, the clip is only kept once the sentence has been
+        rendered min_renders times.
+        """
+        if not self.enabled or not audio:
+            return
+        key = self.make_key(voice, text)
+        if force:
+            self._renders.pop(key, None)
+        elif not self._admit(key):
+            self._stats["not_admitted"] += 1
+            return
+        self._remember(key, audio)
+        await self._ensure_loaded()
+        try:
+            await asyncio.to_thread(self._write, key, audio)
+        except OSError as e:
+            print(f"[WARNING] TTS cache write failed: {e}")
+            return
+        self._forget(key)
+        self._disk[key] = len(audio)
+        self._disk_bytes += len(audio)
+        self._stats["writes"] += 1
+
+        evicted = []
+        while self._disk_bytes > self.max_bytes and len(self._disk) > 1:
+            old_key, _ = next(iter(self._disk.items()))
+            self._forget(old_key)
+            evicted.append(old_key)
+        if evicted:
+            self._stats["evictions"] += len(evicted)
+            await asyncio.to_thread(self._delete, evicted)
+
+    def _write(self, key: str, audio: bytes):
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(audio)
+        os.replace(temp_path, path)
+
+    def _delete(self, keys):
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "memory_entries": len(self._memory), "disk_entries": len(self._disk), "disk_bytes": self._disk_bytes}
+
+
+# Shared by every TTSService in the process
+default_tts_cache = TTSPhraseCache()
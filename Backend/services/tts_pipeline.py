@@ -0,0 +1,157 @@
+"""
+TTS Pipeline
+============
+
+Synthesizes the sentences of an interviewer response concurrently while
+emitting the audio strictly in sentence order.
+
+Sentence N+1 is already being rendered while sentence N plays, so the gap
+between sentences no longer grows with the time it takes to build each
+MP3. Audio is consumed as a stream: chunks of the sentence at the head of
+the queue are forwarded as soon as TTS produces them, while chunks of
+later sentences are held until it is their turn. ``cancel()`` stops every
+pending synthesis at once (used when the candidate interrupts).
+
+Each pipeline logs its latency profile when it finishes:
+- ttfa: time from the start of the turn to the first audio chunk sent
+- gap: per sentence, how long the client would wait after the previous
+  clip finished playing (estimated from the MP3 size) before the next
+  sentence's first chunk arrived
+
+Set TTS_PIPELINE_CONCURRENCY=1 to reproduce the old one-at-a-time
+behaviour for comparison.
+"""
+
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+from services import latency_tracer
+
+TTS_PIPELINE_CONCURRENCY = max(1, int(os.getenv("TTS_PIPELINE_CONCURRENCY", "3")))
+
+# Edge TTS default output is 24 kHz / 48 kbit/s mono MP3
+TTS_MP3_BYTES_PER_SECOND = 48000 / 8
+
+
+class TTSPipeline:
+    """
+    Ordered, bounded-concurrency TTS for one interviewer response.
+
+    Attributes:
+        stream: Callable returning an async iterator of audio chunks for a sentence
+        on_chunk: Coroutine sending (seq, sentence, chunk index, chunk) to the client
+        on_end: Coroutine called with (seq, sentence, chunk count) once a sentence is fully sent
+        concurrency: Maximum number of sentences synthesized at once
+    """
+
+    def __init__(
+        self,
+        stream: Callable[[str], AsyncIterator[bytes]],
+        on_chunk: Callable[[int, str, int, bytes], Awaitable[None]],
+        on_end: Optional[Callable[[int, str, int], Awaitable[None]]] = None,
+        concurrency: int = TTS_PIPELINE_CONCURRENCY,
+        started_at: Optional[float] = None,
+        label: str = "",
+    ):
+        self.stream = stream
+        self.on_chunk = on_chunk
+        self.on_end = on_end
+        self.concurrency = concurrency
+        self.label = label
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._pending: "asyncio.Queue[Optional[tuple]]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._seq = 0
+        self._emitter = asyncio.create_task(self._emit_in_order())
+
+        # Latency measurements
+        self._started_at = started_at if started_at is not None else time.perf_counter()
+        self._first_audio_at: Optional[float] = None
+        self._playback_ends_at: Optional[float] = None
+        self._gaps: List[float] = []
+
+    async def _produce(self, text: str, chunks: asyncio.Queue):
+        try:
+            async with self._semaphore:
+                async for chunk in self.stream(text):
+                    if chunk:
+                        chunks.put_nowait(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"TTS Worker Error: {e}")
+        finally:
+            # End-of-sentence marker
+            chunks.put_nowait(None)
+
+    def submit(self, text: str):
+        """Start synthesizing a sentence; its audio is emitted after every earlier sentence."""
+        chunks: asyncio.Queue = asyncio.Queue()
+        latency_tracer.mark("tts_first_sentence")
+        self._tasks.append(asyncio.create_task(self._produce(text, chunks)))
+        self._pending.put_nowait((self._seq, text, chunks))
+        self._seq += 1
+
+    async def _emit_in_order(self):
+        while True:
+            item = await self._pending.get()
+            if item is None:
+                return
+            seq, text, chunks = item
+
+            index = 0
+            size = 0
+            sentence_started_at = None
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                if index == 0:
+                    sentence_started_at = time.perf_counter()
+                    if self._first_audio_at is None:
+                        self._first_audio_at = sentence_started_at
+                        latency_tracer.mark("tts_first_audio")
+                    elif self._playback_ends_at is not None:
+                        self._gaps.append(max(0.0, sentence_started_at - self._playback_ends_at))
+                await self.on_chunk(seq, text, index, chunk)
+                index += 1
+                size += len(chunk)
+
+            if index == 0:
+                continue
+            if self.on_end is not None:
+                await self.on_end(seq, text, index)
+            start = max(sentence_started_at, self._playback_ends_at or sentence_started_at)
+            self._playback_ends_at = start + size / TTS_MP3_BYTES_PER_SECOND
+
+    async def finish(self):
+        """Wait until every submitted sentence has been emitted."""
+        self._pending.put_nowait(None)
+        try:
+            await self._emitter
+            latency_tracer.mark("tts_last_audio")
+        finally:
+            self._log_latency()
+
+    def cancel(self):
+        """Drop all pending synthesis and stop emitting (candidate interrupted)."""
+        for task in self._tasks:
+            task.cancel()
+        self._emitter.cancel()
+
+    def _log_latency(self):
+        if self._first_audio_at is None:
+            return
+        ttfa_ms = (self._first_audio_at - self._started_at) * 1000
+        gap_summary = ""
+        if self._gaps:
+            gap_summary = (
+                f" gap_mean={sum(self._gaps) / len(self._gaps) * 1000:.0f}ms"
+                f" gap_max={max(self._gaps) * 1000:.0f}ms"
+            )
+        print(
+            f"[TTS] {self.label} sentences={self._seq} concurrency={self.concurrency} "
+            f"ttfa={ttfa_ms:.0f}ms{gap_summary}"
+        )
@@ -1,23 +1,67 @@
 import edge_tts
 import io
+import asyncio
+from typing import AsyncGenerator, Iterable
+
+from services.tts_cache import TTSPhraseCache, default_tts_cache
 
 class TTSService:
-    def __init__(self, voice="en-US-AndrewNeural"): # "en-US-AriaNeural" is another good option
+    def __init__(self, voice="en-US-AndrewNeural", cache: TTSPhraseCache = None): # "en-US-AriaNeural" is another good option
         self.voice = voice
+        self.cache = cache if cache is not None else default_tts_cache
 
-    async def generate_speech(self, text: str) -> bytes:
+    async def stream_speech(self, text: str, store: bool = False) -> AsyncGenerator[bytes, None]:
         """
-        Generates TTS audio bytes (MP3) for the given text using Edge TTS.
+        Yields MP3 audio chunks for the given text as Edge TTS produces them,
+        so playback can start before the whole sentence is rendered.
+        Recurring phrases are served from the phrase cache in one chunk;
+        store=True caches the render even if the sentence is new.
         """
+        cached = await self.cache.get(self.voice, text)
+        if cached:
+            yield cached
+            return
+
+        audio_buffer = io.BytesIO()
         try:
             communicate = edge_tts.Communicate(text, self.voice)
-            # Create an in-memory byte stream
-            audio_buffer = io.BytesIO()
             async for chunk in communicate.stream():
                 if chunk["type"] == "audio":
                     audio_buffer.write(chunk["data"])
-            
-            return audio_buffer.getvalue()
+                    yield chunk["data"]
         except Exception as e:
             print(f"TTS Error: {e}")
-            return None
+            return
+        
+        # Only complete renders are cached
+        await self.cache.set(self.voice, text, audio_buffer.getvalue(), force=store)
+
+    async def generate_speech(self, text: str, store: bool = False) -> bytes:
+        """
+        Generates TTS audio bytes (MP3) for the given text using Edge TTS.
+        """
+        # Create an in-memory byte stream
+        audio_buffer = io.BytesIO()
+        async for chunk in self.stream_speech(text, store=store):
+            audio_buffer.write(chunk)
+        
+        return audio_buffer.getvalue() or None
+
+    async def prewarm(self, phrases: Iterable[str], concurrency: int = 4) -> int:
+        """
+        Synthesizes phrases missing from the cache (startup job). Returns the
+        number of phrases rendered.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        rendered = 0
+
+        async def warm(phrase: str):
+            nonlocal rendered
+            async with semaphore:
+                if await self.cache.get(self.voice, phrase):
+                    return
+                if await self.generate_speech(phrase, store=True):
+                    rendered += 1
+
+        await asyncio.gather(*(warm(phrase) for phrase in phrases))
+        return rendered
@@ -0,0 +1,198 @@
+"""
+Voice Activity Detection
+========================
+
+Prepares candidate audio for Whisper: decodes the browser's webm/opus
+payload, finds speech with vectorized NumPy frame features (log energy
+and zero-crossing rate), trims leading/trailing silence, shortens long
+pauses and re-encodes the result as 16 kHz mono Opus.
+
+Utterances without speech are dropped before any STT call is made.
+
+Decoding and re-encoding use an ``ffmpeg`` subprocess; when ffmpeg is not
+installed the original audio is passed through unchanged.
+"""
+
+import asyncio
+import os
+import shutil
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() in {"1", "true", "yes", "y", "on"}
+VAD_TARGET_RATE = 16000
+VAD_FRAME_MS = 20
+VAD_PAD_MS = int(os.getenv("VAD_PAD_MS", "200"))              # Kept around each speech region
+VAD_MAX_PAUSE_MS = int(os.getenv("VAD_MAX_PAUSE_MS", "600"))  # Longer pauses are shortened to this
+VAD_MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", "250"))
+VAD_ENERGY_MARGIN_DB = float(os.getenv("VAD_ENERGY_MARGIN_DB", "12"))
+VAD_MIN_ENERGY_DB = float(os.getenv("VAD_MIN_ENERGY_DB", "-50"))
+# Frames louder than this are speech regardless of the noise floor (AGC'd or tightly cut clips have none)
+VAD_SPEECH_ENERGY_DB = float(os.getenv("VAD_SPEECH_ENERGY_DB", "-35"))
+VAD_OPUS_BITRATE = os.getenv("VAD_OPUS_BITRATE", "24k")
+
+_FFMPEG = shutil.which("ffmpeg")
+
+
+async def _ffmpeg(args, data: bytes) -> bytes:
+    """Run ffmpeg reading stdin and writing stdout."""
+    process = await asyncio.create_subprocess_exec(
+        _FFMPEG, "-hide_banner", "-loglevel", "error", *args,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    out, err = await process.communicate(data)
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {err.decode(errors='ignore').strip()[:200]}")
+    return out
+
+
+async def decode_to_pcm(audio_bytes: bytes) -> np.ndarray:
+    """Decode any container ffmpeg understands to float32 mono samples at 16 kHz."""
+    raw = await _ffmpeg(["-i", "pipe:0", "-f", "f32le", "-ac", "1", "-ar", str(VAD_TARGET_RATE), "pipe:1"], audio_bytes)
+    return np.frombuffer(raw, dtype="<f4")
+
+
+async def encode_opus(samples: np.ndarray) -> bytes:
+    """Encode float32 mono 16 kHz samples as Ogg/Opus."""
+    return await _ffmpeg(
+        ["-f", "f32le", "-ar", str(VAD_TARGET_RATE), "-ac", "1", "-i", "pipe:0",
+         "-c:a", "libopus", "-b:a", VAD_OPUS_BITRATE, "-application", "voip", "-f", "ogg", "pipe:1"],
+        samples.astype("<f4").tobytes(),
+    )
+
+
+def downmix_resample(samples: np.ndarray, sample_rate: int, channels: int = 1) -> np.ndarray:
+    """
+    Convert interleaved samples to mono at VAD_TARGET_RATE.
+
+    Uses linear interpolation, which is adequate for speech going to Whisper.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    if sample_rate == VAD_TARGET_RATE or len(samples) == 0:
+        return samples
+    duration = len(samples) / sample_rate
+    target_length = int(duration * VAD_TARGET_RATE)
+    positions = np.linspace(0, len(samples) - 1, num=target_length, dtype=np.float64)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def frame_features(samples: np.ndarray, frame_len: int):
+    """Per-frame log energy (dBFS) and zero-crossing rate, fully vectorized."""
+    frame_count = len(samples) // frame_len
+    if frame_count == 0:
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+    frames = samples[: frame_count * frame_len].reshape(frame_count, frame_len)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    energy_db = 20 * np.log10(np.maximum(rms, 1e-10))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_len - 1)
+    return energy_db, zcr
+
+
+def speech_mask(energy_db: np.ndarray, zcr: np.ndarray) -> np.ndarray:
+    """
+    Classify frames as speech.
+
+    Voiced speech is loud relative to the utterance's noise floor, or above
+    VAD_SPEECH_ENERGY_DB outright (a clip with no pauses has no floor to
+    measure); quieter frames with a high zero-crossing rate (fricatives such
+    as "s", "f") count as speech when they sit next to voiced frames.
+    """
+    if len(energy_db) == 0:
+        return np.zeros(0, dtype=bool)
+    noise_floor = np.percentile(energy_db, 10)
+    threshold = max(noise_floor + VAD_ENERGY_MARGIN_DB, VAD_MIN_ENERGY_DB)
+    voiced = (energy_db > threshold) | (energy_db > VAD_SPEECH_ENERGY_DB)
+    unvoiced = (energy_db > threshold - VAD_ENERGY_MARGIN_DB / 2) & (zcr > 0.25)
+    # Unvoiced frames only count within 3 frames of voiced speech
+    near_voiced = np.convolve(voiced.astype(np.int8), np.ones(7, dtype=np.int8), mode="same") > 0
+    return voiced | (unvoiced & near_voiced)
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int = VAD_TARGET_RATE) -> Optional[np.ndarray]:
+    """
+    Remove leading/trailing silence and shorten long pauses.
+
+    Returns:
+        The trimmed samples, or None if the audio contains no speech
+    """
+    frame_len = sample_rate * VAD_FRAME_MS // 1000
+    energy_db, zcr = frame_features(samples, frame_len)
+    mask = speech_mask(energy_db, zcr)
+    if mask.sum() * VAD_FRAME_MS < VAD_MIN_SPEECH_MS:
+        return None
+
+    # Pad speech regions, then cap every remaining silent run at VAD_MAX_PAUSE_MS
+    pad = max(1, VAD_PAD_MS // VAD_FRAME_MS)
+    keep = np.convolve(mask.astype(np.int8), np.ones(2 * pad + 1, dtype=np.int8), mode="same") > 0
+    max_pause = max(1, VAD_MAX_PAUSE_MS // VAD_FRAME_MS)
+    index = np.arange(len(keep))
+    last_kept = np.maximum.accumulate(np.where(keep, index, -1))
+    position_in_pause = index - last_kept - 1
+    keep |= (~keep) & (last_kept >= 0) & (position_in_pause < max_pause)
+    # Drop leading/trailing silence entirely
+    speech_frames = np.flatnonzero(mask)
+    first = max(speech_frames[0] - pad, 0)
+    last = min(speech_frames[-1] + pad, len(keep) - 1)
+    keep[:first] = False
+    keep[last + 1:] = False
+
+    frames = samples[: len(keep) * frame_len].reshape(len(keep), frame_len)
+    return frames[keep].reshape(-1)
+
+
+async def prepare_utterance(audio_bytes: bytes, file_name: str = "audio.webm") -> Dict[str, Any]:
+    """
+    Run VAD on one candidate utterance.
+
+    Returns:
+        Dictionary with speech (False means skip STT), audio / file_name to
+        send to Whisper, and per-turn metrics: input_bytes, output_bytes,
+        bytes_saved, input_ms, output_ms, audio_ms_saved, vad_ms
+    """
+    started = time.perf_counter()
+    result = {
+        "speech": True,
+        "audio": audio_bytes,
+        "file_name": file_name,
+        "input_bytes": len(audio_bytes),
+        "output_bytes": len(audio_bytes),
+    }
+    if not VAD_ENABLED or _FFMPEG is None or not audio_bytes:
+        return result
+
+    try:
+        samples = await decode_to_pcm(audio_bytes)
+        trimmed = trim_silence(samples)
+        input_ms = len(samples) * 1000 // VAD_TARGET_RATE
+        if trimmed is None:
+            result.update({"speech": False, "audio": b"", "output_bytes": 0, "output_ms": 0})
+        else:
+            output_ms = len(trimmed) * 1000 // VAD_TARGET_RATE
+            encoded = await encode_opus(trimmed)
+            # Whisper cost and latency follow duration; keep the original if trimming bought nothing
+            if output_ms < input_ms or len(encoded) < len(audio_bytes):
+                result.update({"audio": encoded, "file_name": "audio.ogg", "output_bytes": len(encoded)})
+            else:
+                output_ms = input_ms
+            result["output_ms"] = output_ms
+        result["input_ms"] = input_ms
+    except Exception as e:
+        print(f"VAD skipped, sending original audio: {e}")
+        return result
+
+    result["bytes_saved"] = result["input_bytes"] - result["output_bytes"]
+    result["audio_ms_saved"] = result["input_ms"] - result["output_ms"]
+    result["vad_ms"] = round((time.perf_counter() - started) * 1000)
+    print(
+        f"[VAD] speech={result['speech']} bytes {result['input_bytes']}->{result['output_bytes']} "
+        f"(saved {result['bytes_saved']}) audio {result['input_ms']}->{result['output_ms']}ms "
+        f"(saved {result['audio_ms_saved']}ms) vad={result['vad_ms']}ms"
+    )
+    return result